@@ -4,7 +4,8 @@
 
 # Geometry primitives
 from .geometry import (
-    Sphere, Plane, Box, Cylinder, Torus, Triangle, Square, Primitive,
+    Sphere, Plane, Box, Cylinder, Torus, Triangle, Square, Quad, Heightfield, SphereCloud, Primitive,
+    SDFPrimitive, SDFSphere, SDFBox, SDFTorus, SDFUnion, SDFSmoothUnion,
 )
 
 # Math
@@ -16,7 +17,8 @@ from .math import (
 # Scene & animation setup
 from .scene import (
     Scene, Camera, Object, PinholeCamera,
-    AmbientLight, PointLight, SpotLight, DirectionalLight, PointLightFalloff,
+    AmbientLight, PointLight, SpotLight, DirectionalLight, PointLightFalloff, RectAreaLight, SphereAreaLight,
+    EnvironmentLight,
     Animator, AnimationSetup, EaseType, Easing, linear, ease_in_out,
 )
 
@@ -30,16 +32,16 @@ from .material import (
 
 # Shaders for rendering, debugging, and educational purposes
 from .shading import (
-    BlinnPhongShader,
+    BlinnPhongShader, ManyLightShader, LightCullingShader,
     # other shaders for debugging and education
     DepthShader, NormalShader, DiffShader, DotProductShader, MaskMethod,
 )
 
 # Rendering algorithms and utilities for rendering and post-processing
 from .render import (
-    LinearRenderLoop, RecursiveIntegrator, MultiProcessRowRenderLoop,
+    LinearRenderLoop, RecursiveIntegrator, IterativeIntegrator, WavefrontIntegrator, MultiProcessRowRenderLoop,
     # configs and utilities for rendering and post-processing
-    RenderConfig, PreviewConfig, PostProcessConfig, ProgressDisplay
+    RenderConfig, PreviewConfig, PostProcessConfig, ToneMapping, ProgressDisplay, AOV, RenderCache
 )
 
 # Input/output utilities, including resolution handling and Jupyter notebook display functions PickleManager for saving/loading scenes, and libraries for colors, materials, and lights
@@ -51,22 +53,24 @@ from .io import (
 
 __all__ = [
     # Geometry primitive classes
-    "Sphere", "Plane", "Box", "Torus", "Triangle", "Square", "Primitive", "Cylinder",
+    "Sphere", "Plane", "Box", "Torus", "Triangle", "Square", "Quad", "Heightfield", "SphereCloud", "Primitive", "Cylinder",
+    "SDFPrimitive", "SDFSphere", "SDFBox", "SDFTorus", "SDFUnion", "SDFSmoothUnion",
     # Math
     "Vertex", "Vector",
     # Scene & animation
     "Scene", "Camera", "Object", "PinholeCamera",
-    "AmbientLight", "PointLight", "SpotLight", "DirectionalLight", "PointLightFalloff",
+    "AmbientLight", "PointLight", "SpotLight", "DirectionalLight", "PointLightFalloff", "RectAreaLight", "SphereAreaLight",
+    "EnvironmentLight",
     "Animator", "AnimationSetup", "EaseType", "Easing", "linear", "ease_in_out",
     # Materials & textures
     "Color", "PhongMaterial", "RockMaterial", "CheckerMaterial", "MarbleMaterial",
     "PerlinNoise", "FBMNoise", "TurbulenceNoise", "VoronoiNoise",
     # Shading
-    "BlinnPhongShader",
+    "BlinnPhongShader", "ManyLightShader", "LightCullingShader",
     "DepthShader", "NormalShader", "DiffShader", "DotProductShader", "MaskMethod",
     # Rendering
-    "LinearRenderLoop", "RecursiveIntegrator", "MultiProcessRowRenderLoop",
-    "RenderConfig", "PreviewConfig", "PostProcessConfig", "ProgressDisplay",
+    "LinearRenderLoop", "RecursiveIntegrator", "IterativeIntegrator", "WavefrontIntegrator", "MultiProcessRowRenderLoop",
+    "RenderConfig", "PreviewConfig", "PostProcessConfig", "ToneMapping", "ProgressDisplay", "AOV", "RenderCache",
     # IO & resolution
     "Resolution",
     "ipynb_display_images", "ipynb_display_multiple_images_in_row",
@@ -1,10 +1,12 @@
-from .primitives import Sphere, Plane, Square, Triangle, Box, Cylinder, Torus
+from .primitives import Sphere, Plane, Square, Quad, Triangle, Box, Cylinder, Torus, Heightfield, SphereCloud
+from .primitives import SDF, SDFPrimitive, SDFSphere, SDFBox, SDFTorus, SDFUnion, SDFSmoothUnion
 from .geometry_hit import GeometryHit
 from .primitive import Primitive
 from .ray import Ray
 
 __all__ = [
-    "Plane", "Sphere", "Square", "Triangle", "Box", "Cylinder", "Torus",
+    "Plane", "Sphere", "Square", "Quad", "Triangle", "Box", "Cylinder", "Torus", "Heightfield", "SphereCloud",
+    "SDF", "SDFPrimitive", "SDFSphere", "SDFBox", "SDFTorus", "SDFUnion", "SDFSmoothUnion",
     "GeometryHit",
     "Primitive",
     "Ray",
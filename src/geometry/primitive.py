@@ -1,9 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+import numpy as np
 from src.geometry.geometry_hit import GeometryHit
 from src.geometry.ray import Ray
-from src.math import Vertex
+from src.math import Vertex, Vector
 
 @dataclass
 class Primitive(ABC):
@@ -23,3 +24,81 @@ class Primitive(ABC):
     def normal_at(self, point: Vertex) -> Vertex:
         """Get the normal vector at a given point on the object's surface."""
         raise NotImplementedError("Primitive.normal_at must be implemented by subclasses")
+
+    def refresh(self) -> None:
+        """
+        Recompute the invariants a primitive caches at construction (edges, normals, slab bounds, ...).
+        Mutators such as Triangle.translate call it; code that edits the defining fields directly must call it too.
+        The default has nothing cached.
+        """
+
+    per_element_materials = False  # True if parts of the primitive carry their own materials, see material_at
+
+    def material_at(self, hit: GeometryHit, material):
+        """
+        Material to shade a hit on this primitive with.
+        The default is the object's material; primitives with per_element_materials pick one by hit.element.
+        :param hit: hit in the primitive's own space
+        :param material: material of the object
+        :return: Material
+        """
+        return material
+
+    def origin_terms(self, origin: Vertex):
+        """
+        Precompute the parts of the intersection that only depend on the ray origin.
+        All camera rays of a frame share one origin, so these are computed once per frame and passed to intersect_from.
+        :param origin: shared ray origin
+        :return: opaque terms for intersect_from, None if the primitive has nothing to precompute
+        """
+        return None
+
+    def intersect_from(self, ray: Ray, origin_terms, t_min: float = 1e-3, t_max: float = float('inf')) -> GeometryHit | None:
+        """
+        Same as intersect, for a ray whose origin terms were already computed by origin_terms(ray.origin).
+        :param ray: Ray to test intersection with
+        :param origin_terms: result of origin_terms for ray.origin
+        :return: Hit record if intersection occurs, else None
+        """
+        return self.intersect(ray, t_min, t_max)
+
+    def bake(self, transform) -> Primitive | None:
+        """
+        Return a copy of the primitive with the transform applied to its own parameters, so the object can be
+        intersected in world space without moving every ray into local space.
+        The default cannot bake; primitives override it for the transforms their shape is closed under.
+        :param transform: object-to-world Transform
+        :return: world-space primitive, or None if the transform cannot be expressed by this primitive
+        """
+        return None
+
+    def bounds(self) -> tuple[Vertex, Vertex] | None:
+        """
+        Axis-aligned bounding box of the primitive in its own space.
+        :return: (min corner, max corner), or None for unbounded primitives such as planes
+        """
+        return None
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min: float = 1e-3,
+                        t_max: float = float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Intersect a whole batch of rays with the object at once.
+        The default implementation calls intersect for every ray; primitives override it with vectorized NumPy kernels.
+        :param origins: (N, 3) array of ray origins
+        :param directions: (N, 3) array of normalized ray directions
+        :param t_min: minimum valid distance for intersection
+        :param t_max: maximum valid distance for intersection
+        :return: (dist, normals) - (N,) distances with inf where the ray misses, (N, 3) unit normals facing against the ray
+        """
+        n = origins.shape[0]
+        dist = np.full(n, np.inf)
+        normals = np.zeros((n, 3))
+
+        for k in range(n):
+            o, d = origins[k], directions[k]
+            hit = self.intersect(Ray(Vertex(o[0], o[1], o[2]), Vector(d[0], d[1], d[2])), t_min, t_max)
+            if hit is not None:
+                dist[k] = hit.dist
+                normals[k] = (hit.normal.x, hit.normal.y, hit.normal.z)
+
+        return dist, normals
@@ -2,17 +2,31 @@ from .plane import Plane
 from .sphere import Sphere
 from .triangle import Triangle
 from .square import Square
+from .quad import Quad
 from .cylinder import Cylinder
 from .torus import Torus
 from .box import Box
+from .heightfield import Heightfield
+from .sphere_cloud import SphereCloud
+from .sdf import SDF, SDFPrimitive, SDFSphere, SDFBox, SDFTorus, SDFUnion, SDFSmoothUnion
 
 
 __all__ = [
     "Plane",
     "Sphere",
     "Square",
+    "Quad",
     "Triangle",
     "Cylinder",
     "Torus",
     "Box",
+    "Heightfield",
+    "SphereCloud",
+    "SDF",
+    "SDFPrimitive",
+    "SDFSphere",
+    "SDFBox",
+    "SDFTorus",
+    "SDFUnion",
+    "SDFSmoothUnion",
 ]
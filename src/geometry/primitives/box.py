@@ -1,6 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
+import numpy as np
 from src.math import Vertex, Vector
+from src.math.batch import readonly_vec3_array, batch_face_forward
 from src.geometry.primitive import Primitive
 from src.geometry.ray import Ray
 from src.geometry.geometry_hit import GeometryHit
@@ -15,29 +17,39 @@ class Box(Primitive):
     corner1: Vertex = field(default_factory=lambda: Vertex(-0.5, -0.5, -0.5))
     corner2: Vertex = field(default_factory=lambda: Vertex(0.5, 0.5, 0.5))
 
-    @property
-    def x0(self):
-        return min(self.corner1.x, self.corner2.x)
+    def __post_init__(self):
+        self.refresh()
 
-    @property
-    def x1(self):
-        return max(self.corner1.x, self.corner2.x)
-
-    @property
-    def y0(self):
-        return min(self.corner1.y, self.corner2.y)
-
-    @property
-    def y1(self):
-        return max(self.corner1.y, self.corner2.y)
+    def refresh(self) -> None:
+        """
+        Cache the slab bounds x0..z1 (min and max corner coordinates) as floats and as lo / hi arrays for batch kernels.
+        """
+        c1, c2 = self.corner1, self.corner2
+        self.x0, self.x1 = min(c1.x, c2.x), max(c1.x, c2.x)
+        self.y0, self.y1 = min(c1.y, c2.y), max(c1.y, c2.y)
+        self.z0, self.z1 = min(c1.z, c2.z), max(c1.z, c2.z)
+        self.lo = readonly_vec3_array(Vertex(self.x0, self.y0, self.z0))
+        self.hi = readonly_vec3_array(Vertex(self.x1, self.y1, self.z1))
+
+    def translate(self, offset: Vector) -> None:
+        """
+        Move box by offset vector.
+        """
+        self.corner1 += offset
+        self.corner2 += offset
+        self.refresh()
 
-    @property
-    def z0(self):
-        return min(self.corner1.z, self.corner2.z)
+    def bake(self, transform) -> Box | None:
+        """
+        The box is axis aligned, so only translation and (possibly non-uniform) axis scaling can be baked.
+        Rotated boxes keep their per-ray transform.
+        """
+        if not transform.is_axis_aligned:
+            return None
+        return Box(corner1=transform.apply_point(self.corner1), corner2=transform.apply_point(self.corner2))
 
-    @property
-    def z1(self):
-        return max(self.corner1.z, self.corner2.z)
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        return Vertex(self.x0, self.y0, self.z0), Vertex(self.x1, self.y1, self.z1)
 
     def normal_at(self, point: Vertex) -> Vector:
         """
@@ -60,43 +72,54 @@ class Box(Primitive):
         raise ValueError("Point is not on the surface of the box.")
 
     def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        return self.intersect_from(ray, self.origin_terms(ray.origin), t_min, t_max)
 
-        if abs(ray.direction.x) < EPS:
-            if ray.origin.x < self.x0 or ray.origin.x > self.x1:
+    def origin_terms(self, origin: Vertex) -> tuple[tuple[float, float, float, float, float], ...]:
+        """
+        Per axis: slab bounds, origin coordinate and the slab distances from the origin (bound - origin),
+        shared by all rays from origin.
+        """
+        ox, oy, oz = origin.x, origin.y, origin.z
+        return ((self.x0, self.x1, ox, self.x0 - ox, self.x1 - ox),
+                (self.y0, self.y1, oy, self.y0 - oy, self.y1 - oy),
+                (self.z0, self.z1, oz, self.z0 - oz, self.z1 - oz))
+
+    def intersect_from(self, ray: Ray, origin_terms, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        (x0, x1, ox, dx0, dx1), (y0, y1, oy, dy0, dy1), (z0, z1, oz, dz0, dz1) = origin_terms
+        direction = ray.direction
+
+        if abs(direction.x) < EPS:
+            if ox < x0 or ox > x1:
                 return None
-        if abs(ray.direction.y) < EPS:
-            if ray.origin.y < self.y0 or ray.origin.y > self.y1:
+        if abs(direction.y) < EPS:
+            if oy < y0 or oy > y1:
                 return None
-        if abs(ray.direction.z) < EPS:
-            if ray.origin.z < self.z0 or ray.origin.z > self.z1:
+        if abs(direction.z) < EPS:
+            if oz < z0 or oz > z1:
                 return None
 
-        if abs(ray.direction.x) < EPS:
-            tx0 = float('-inf') if ray.origin.x < self.x0 else float('inf')
-            tx1 = float('-inf') if ray.origin.x > self.x1 else float('inf')
+        if abs(direction.x) < EPS:
+            tx0 = float('-inf') if ox < x0 else float('inf')
+            tx1 = float('-inf') if ox > x1 else float('inf')
         else:
-            tx0 = (self.x0 - ray.origin.x) / ray.direction.x
-            tx1 = (self.x1 - ray.origin.x) / ray.direction.x
+            tx0 = dx0 / direction.x
+            tx1 = dx1 / direction.x
 
         tmin = min(tx0, tx1)
         tmax = max(tx0, tx1)
 
-        if abs(ray.direction.y) < EPS:
-            ty0 = float('-inf') if ray.origin.y < self.y0 else float('inf')
-            ty1 = float('-inf') if ray.origin.y > self.y1 else float('inf')
+        if abs(direction.y) < EPS:
+            ty0 = float('-inf') if oy < y0 else float('inf')
+            ty1 = float('-inf') if oy > y1 else float('inf')
         else:
-            ty0 = (self.y0 - ray.origin.y) / ray.direction.y
-            ty1 = (self.y1 - ray.origin.y) / ray.direction.y
+            ty0 = dy0 / direction.y
+            ty1 = dy1 / direction.y
 
         tmin = max(tmin, min(ty0, ty1))
         tmax = min(tmax, max(ty0, ty1))
 
-        if abs(ray.direction.z) < EPS:
-            tz0 = (self.z0 - ray.origin.z) / ray.direction.z
-            tz1 = (self.z1 - ray.origin.z) / ray.direction.z
-        else:
-            tz0 = (self.z0 - ray.origin.z) / ray.direction.z
-            tz1 = (self.z1 - ray.origin.z) / ray.direction.z
+        tz0 = dz0 / direction.z
+        tz1 = dz1 / direction.z
 
         tmin = max(tmin, min(tz0, tz1))
         tmax = min(tmax, max(tz0, tz1))
@@ -122,4 +145,50 @@ class Box(Primitive):
             point=hit_point,
             normal=normal,
             front_face=front_face,
-        )
\ No newline at end of file
+        )
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized slab test for (N, 3) arrays of ray origins and directions.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        lo, hi = self.lo, self.hi
+
+        # rays parallel to a slab miss unless their origin lies between its planes
+        parallel = np.abs(directions) < EPS
+        outside = np.any(parallel & ((origins < lo) | (origins > hi)), axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t0 = (lo - origins) / directions
+            t1 = (hi - origins) / directions
+        t0 = np.where(parallel, -np.inf, t0)
+        t1 = np.where(parallel, np.inf, t1)
+
+        tmin = np.max(np.minimum(t0, t1), axis=1)
+        tmax = np.min(np.maximum(t0, t1), axis=1)
+
+        valid = ~outside & ~(tmax < np.maximum(tmin, t_min)) & ~(tmin > t_max)
+        t_hit = np.where(tmin >= t_min, tmin, tmax)
+        dist = np.where(valid, t_hit, np.inf)
+
+        # face normal, same face order as normal_at
+        p = origins + directions * np.where(valid, t_hit, 0.0)[:, None]
+        faces = [
+            (np.abs(p[:, 0] - lo[0]) < EPS, (-1.0, 0.0, 0.0)),
+            (np.abs(p[:, 0] - hi[0]) < EPS, (1.0, 0.0, 0.0)),
+            (np.abs(p[:, 1] - lo[1]) < EPS, (0.0, -1.0, 0.0)),
+            (np.abs(p[:, 1] - hi[1]) < EPS, (0.0, 1.0, 0.0)),
+            (np.abs(p[:, 2] - lo[2]) < EPS, (0.0, 0.0, -1.0)),
+            (np.abs(p[:, 2] - hi[2]) < EPS, (0.0, 0.0, 1.0)),
+        ]
+        normals = np.zeros_like(origins)
+        assigned = np.zeros(origins.shape[0], dtype=bool)
+        for on_face, face_normal in faces:
+            pick = on_face & ~assigned
+            normals[pick] = face_normal
+            assigned |= pick
+
+        normals = batch_face_forward(normals, directions)
+        normals[~valid] = 0.0
+        return dist, normals
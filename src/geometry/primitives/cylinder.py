@@ -1,7 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from math import sqrt
+import numpy as np
 from src.math import Vertex
+from src.math.batch import readonly_vec3_array, batch_dot, batch_normalize, batch_face_forward
 from src.geometry.primitive import Primitive
 from src.geometry.ray import Ray
 from src.geometry.geometry_hit import GeometryHit
@@ -18,10 +20,41 @@ class Cylinder(Primitive):
     cap_point: Vertex = field(default_factory=lambda: Vertex(0, 0.5, 0))   # Center of the cylinder cap
     radius: float = 0.5
 
+    def __post_init__(self):
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Cache the axis, its length and unit direction, also as base_array / axis_array for batch kernels.
+        """
+        self.axis = self.cap_point - self.base_point
+        self.axis_length_squared = self.axis.dot(self.axis)
+        self.axis_length = sqrt(self.axis_length_squared)
+        self.axis_normalized = self.axis / self.axis_length
+        self.base_array = readonly_vec3_array(self.base_point)
+        self.axis_array = readonly_vec3_array(self.axis_normalized)
+
+    def bake(self, transform) -> Cylinder | None:
+        """
+        The axis can point anywhere, so rotation, translation and uniform scale can be baked.
+        """
+        if not transform.is_similarity:
+            return None
+        return Cylinder(
+            base_point=transform.apply_point(self.base_point),
+            cap_point=transform.apply_point(self.cap_point),
+            radius=self.radius * transform.uniform_scale,
+        )
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        # both cap discs fit into spheres of the radius around their centers
+        r = abs(self.radius)
+        b, c = self.base_point, self.cap_point
+        return (Vertex(min(b.x, c.x) - r, min(b.y, c.y) - r, min(b.z, c.z) - r),
+                Vertex(max(b.x, c.x) + r, max(b.y, c.y) + r, max(b.z, c.z) + r))
+
     def normal_at(self, point: Vertex) -> Vector:
-        axis = self.cap_point - self.base_point
-        axis_length_squared = axis.dot(axis)
-        axis_normalized = axis / sqrt(axis_length_squared)
+        axis_normalized = self.axis_normalized
 
         delta_p = point - self.base_point
 
@@ -32,18 +65,25 @@ class Cylinder(Primitive):
         return normal
 
     def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
-        axis = self.cap_point - self.base_point
-        axis_length_squared = axis.dot(axis)
-        axis_normalized = axis / sqrt(axis_length_squared)
+        return self.intersect_from(ray, self.origin_terms(ray.origin), t_min, t_max)
+
+    def origin_terms(self, origin: Vertex) -> tuple[Vector, float, Vector, float]:
+        """
+        Axis, axis length, the origin offset perpendicular to the axis and the constant quadratic coefficient,
+        shared by all rays from origin.
+        """
+        axis_normalized = self.axis_normalized
+        delta_p = origin - self.base_point
+        dp = delta_p - (delta_p.dot(axis_normalized)) * axis_normalized
+        return axis_normalized, self.axis_length, dp, dp.dot(dp) - self.radius * self.radius
 
-        delta_p = ray.origin - self.base_point
+    def intersect_from(self, ray: Ray, origin_terms, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        axis_normalized, axis_length, dp, c = origin_terms
 
         d = ray.direction - (ray.direction.dot(axis_normalized)) * axis_normalized
-        dp = delta_p - (delta_p.dot(axis_normalized)) * axis_normalized
 
         a = d.dot(d)
         b = 2 * d.dot(dp)
-        c = dp.dot(dp) - self.radius * self.radius
 
         discriminant = b * b - 4 * a * c
         if discriminant < 0:
@@ -60,7 +100,7 @@ class Cylinder(Primitive):
         hit_point = ray.point_at(root)
 
         projection_length = (hit_point - self.base_point).dot(axis_normalized)
-        if projection_length < 0 or projection_length > sqrt(axis_length_squared):
+        if projection_length < 0 or projection_length > axis_length:
             return None
 
         normal = self.normal_at(hit_point)
@@ -75,4 +115,43 @@ class Cylinder(Primitive):
             point=hit_point,
             normal=normal,
             front_face=front_face,
-        )
\ No newline at end of file
+        )
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of intersect for (N, 3) arrays of ray origins and directions.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        base, axis_normalized, axis_length = self.base_array, self.axis_array, self.axis_length
+
+        delta_p = origins - base
+
+        # components of direction and origin offset perpendicular to the axis
+        d = directions - (directions @ axis_normalized)[:, None] * axis_normalized
+        dp = delta_p - (delta_p @ axis_normalized)[:, None] * axis_normalized
+
+        a = batch_dot(d, d)
+        b = 2 * batch_dot(d, dp)
+        c = batch_dot(dp, dp) - self.radius * self.radius
+
+        discriminant = b * b - 4 * a * c
+        sqrt_disc = np.sqrt(np.maximum(discriminant, 0.0))
+        safe_a = np.where(a > 0.0, a, 1.0)
+
+        root = (-b - sqrt_disc) / (2.0 * safe_a)
+        far = (-b + sqrt_disc) / (2.0 * safe_a)
+        root = np.where((root < t_min) | (root > t_max), far, root)
+
+        valid = (a > 0.0) & (discriminant >= 0) & (root >= t_min) & (root <= t_max)
+
+        hit_points = origins + directions * np.where(valid, root, 0.0)[:, None]
+        projection_length = (hit_points - base) @ axis_normalized
+        valid &= (projection_length >= 0) & (projection_length <= axis_length)
+
+        dist = np.where(valid, root, np.inf)
+
+        closest_point_on_axis = base + projection_length[:, None] * axis_normalized
+        normals = batch_face_forward(batch_normalize(hit_points - closest_point_on_axis), directions)
+        normals[~valid] = 0.0
+        return dist, normals
@@ -0,0 +1,266 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from math import floor, inf
+import numpy as np
+from src.math import Vertex, Vector
+from src.geometry.primitive import Primitive
+from src.geometry.ray import Ray
+from src.geometry.geometry_hit import GeometryHit
+
+
+@dataclass(eq=False)
+class Heightfield(Primitive):
+    """
+    Terrain surface y = corner.y + height_scale * heights[j, i] over a regular grid in the XZ plane.
+    Sample i runs along x over width and sample j along z over depth; every grid cell is split into two triangles
+    along its (i, j) - (i + 1, j + 1) diagonal.
+    The heights are kept as one float32 per sample. A min/max mip hierarchy over 2 x 2 blocks of cells and up
+    (two thirds of a float per sample on top) lets rays skip whole blocks they pass above or below, so the cost of
+    a ray grows with the logarithm of the grid size rather than with the number of cells it crosses.
+    """
+    heights: np.ndarray = field(default_factory=lambda: np.zeros((2, 2), dtype=np.float32))
+    corner: Vertex = field(default_factory=lambda: Vertex(-0.5, 0.0, -0.5))  # min x, base height and min z
+    width: float = 1.0   # extent along x
+    depth: float = 1.0   # extent along z
+    height_scale: float = 1.0
+
+    def __post_init__(self):
+        self.heights = np.asarray(self.heights, dtype=np.float32)
+        self.refresh()
+
+    @staticmethod
+    def from_noise(noise, samples: int | tuple[int, int] = 129, corner: Vertex | None = None, width: float = 1.0,
+                   depth: float = 1.0, height_scale: float = 1.0) -> Heightfield:
+        """
+        Sample a height grid from any Noise (RidgeNoise, FBMNoise, ...) at the world x, z coordinates of the samples.
+        :param noise: noise whose noise_fn(x, z) gives the height
+        :param samples: number of samples along x and z, or (along x, along z)
+        :param corner: min x, base height and min z, the default centers the terrain at the origin
+        :return: Heightfield
+        """
+        nx, nz = (samples, samples) if isinstance(samples, int) else samples
+        if nx < 2 or nz < 2:
+            raise ValueError("A heightfield needs at least 2 x 2 samples.")
+        corner = corner if corner is not None else Vertex(-0.5 * width, 0.0, -0.5 * depth)
+        xs = corner.x + np.linspace(0.0, width, nx)
+        zs = corner.z + np.linspace(0.0, depth, nz)
+        heights = np.array([[noise.noise_fn(float(x), float(z)) for x in xs] for z in zs], dtype=np.float32)
+        return Heightfield(heights=heights, corner=corner, width=width, depth=depth, height_scale=height_scale)
+
+    def refresh(self) -> None:
+        """
+        Cache the cell size and the min/max mip hierarchy of world heights.
+        mip_min[k] / mip_max[k] hold the height range of blocks of 2^(k + 1) x 2^(k + 1) cells; single cells are
+        not stored, their four corner samples are tested directly.
+        """
+        if self.heights.ndim != 2 or min(self.heights.shape) < 2:
+            raise ValueError("Heights must be a 2D grid of at least 2 x 2 samples.")
+        if self.width <= 0 or self.depth <= 0:
+            raise ValueError("Heightfield width and depth must be positive.")
+
+        rows, columns = self.heights.shape
+        self.cell_x = self.width / (columns - 1)
+        self.cell_z = self.depth / (rows - 1)
+
+        # world heights in float64 like the triangle tests, the mip is stored as float32 rounded outwards
+        world = self.corner.y + self.height_scale * self.heights.astype(np.float64)
+        corners = (world[:-1, :-1], world[:-1, 1:], world[1:, :-1], world[1:, 1:])
+        mins = [_reduce_blocks(np.minimum.reduce(corners), np.minimum, np.inf)]
+        maxs = [_reduce_blocks(np.maximum.reduce(corners), np.maximum, -np.inf)]
+        while mins[-1].shape != (1, 1):
+            mins.append(_reduce_blocks(mins[-1], np.minimum, np.inf))
+            maxs.append(_reduce_blocks(maxs[-1], np.maximum, -np.inf))
+        self.mip_min = tuple(_round_float32(level, -np.inf) for level in mins)
+        self.mip_max = tuple(_round_float32(level, np.inf) for level in maxs)
+        # slack of the height range tests, so rays grazing flat regions at the lowest or highest height still
+        # reach the triangles instead of being clipped to an empty interval
+        lo, hi = float(self.mip_min[-1][0, 0]), float(self.mip_max[-1][0, 0])
+        self.height_eps = 1e-6 * (1.0 + abs(lo) + abs(hi))
+
+    def bake(self, transform) -> Heightfield | None:
+        """
+        Translation and positive axis scaling keep the grid axis aligned, the heights array itself is shared.
+        """
+        diagonal = np.diag(transform.matrix)[:3]
+        if not (transform.is_axis_aligned and np.all(diagonal > 0)):
+            return None
+        return Heightfield(
+            heights=self.heights,
+            corner=transform.apply_point(self.corner),
+            width=self.width * float(diagonal[0]),
+            depth=self.depth * float(diagonal[2]),
+            height_scale=self.height_scale * float(diagonal[1]),
+        )
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        c = self.corner
+        return (Vertex(c.x, float(self.mip_min[-1][0, 0]), c.z),
+                Vertex(c.x + self.width, float(self.mip_max[-1][0, 0]), c.z + self.depth))
+
+    def translate(self, offset: Vector) -> None:
+        """
+        Move heightfield by offset vector.
+        """
+        self.corner += offset
+        self.refresh()
+
+    def _cell_slopes(self, i: int, j: int, upper: bool) -> tuple[float, float, float]:
+        """
+        World height at the cell's (i, j) sample and the slopes along x and z of one of its two triangles.
+        upper is the triangle on the (i, j + 1) side of the diagonal.
+        """
+        h = self.heights
+        s = self.height_scale
+        h00 = self.corner.y + s * float(h[j, i])
+        h11 = self.corner.y + s * float(h[j + 1, i + 1])
+        if upper:
+            h01 = self.corner.y + s * float(h[j + 1, i])
+            return h00, (h11 - h01) / self.cell_x, (h01 - h00) / self.cell_z
+        h10 = self.corner.y + s * float(h[j, i + 1])
+        return h00, (h10 - h00) / self.cell_x, (h11 - h10) / self.cell_z
+
+    def normal_at(self, point: Vertex) -> Vector:
+        columns, rows = self.heights.shape[1] - 1, self.heights.shape[0] - 1
+        fx = (point.x - self.corner.x) / self.cell_x
+        fz = (point.z - self.corner.z) / self.cell_z
+        i = min(max(int(floor(fx)), 0), columns - 1)
+        j = min(max(int(floor(fz)), 0), rows - 1)
+        _, slope_x, slope_z = self._cell_slopes(i, j, fz - j > fx - i)
+        return Vector(-slope_x, 1.0, -slope_z).normalize()
+
+    def _intersect_cell(self, i: int, j: int, ox: float, oy: float, oz: float, dx: float, dy: float, dz: float,
+                        t_min: float, t_max: float) -> tuple[float, float, float] | None:
+        """
+        Nearest hit of the ray with the two triangles of cell (i, j).
+        :return: (t, slope_x, slope_z) of the hit triangle, or None
+        """
+        x0 = self.corner.x + i * self.cell_x
+        z0 = self.corner.z + j * self.cell_z
+        best = None
+        for upper in (False, True):
+            h00, slope_x, slope_z = self._cell_slopes(i, j, upper)
+            # the triangle lies in the plane y = h00 + slope_x (x - x0) + slope_z (z - z0)
+            denom = dy - slope_x * dx - slope_z * dz
+            if abs(denom) < 1e-12:
+                continue
+            t = (h00 + slope_x * (ox - x0) + slope_z * (oz - z0) - oy) / denom
+            if t < t_min or t > t_max or (best is not None and t >= best[0]):
+                continue
+            u = (ox + t * dx - x0) / self.cell_x
+            v = (oz + t * dz - z0) / self.cell_z
+            if u < 0.0 or u > 1.0 or v < 0.0 or v > 1.0 or (v >= u) != upper and abs(v - u) > 1e-12:
+                continue
+            best = (t, slope_x, slope_z)
+        return best
+
+    def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        """
+        Hierarchical 2D DDA over the min/max mip: walk the cells of the current level along the ray, step over cells
+        whose height range the ray passes above or below (moving to a coarser level), and refine cells it may hit
+        down to level 0, where the two triangles are tested.
+        :param ray: Ray to test intersection with
+        :param t_min: minimum valid distance for intersection
+        :param t_max: maximum valid distance for intersection
+        :return: Hit record if intersection occurs, else None
+        """
+        ox, oy, oz = ray.origin.x, ray.origin.y, ray.origin.z
+        dx, dy, dz = ray.direction.x, ray.direction.y, ray.direction.z
+
+        # clip the ray to the bounding box of the terrain
+        t_start, t_end = t_min, t_max
+        eps = self.height_eps
+        y_lo, y_hi = float(self.mip_min[-1][0, 0]) - eps, float(self.mip_max[-1][0, 0]) + eps
+        for o, d, lo, hi in ((ox, dx, self.corner.x, self.corner.x + self.width), (oy, dy, y_lo, y_hi),
+                             (oz, dz, self.corner.z, self.corner.z + self.depth)):
+            if d == 0.0:
+                if o < lo or o > hi:
+                    return None
+                continue
+            t0, t1 = (lo - o) / d, (hi - o) / d
+            if t0 > t1:
+                t0, t1 = t1, t0
+            t_start, t_end = max(t_start, t0), min(t_end, t1)
+            if t_start > t_end:
+                return None
+
+        # ray in grid units, where cells are 1 x 1; level k steps over blocks of 2^k cells
+        gx, gz = (ox - self.corner.x) / self.cell_x, (oz - self.corner.z) / self.cell_z
+        gdx, gdz = dx / self.cell_x, dz / self.cell_z
+        inv_x = 1.0 / gdx if gdx != 0.0 else inf
+        inv_z = 1.0 / gdz if gdz != 0.0 else inf
+        # a tiny step past cell boundaries, so the next cell is looked up and not the one just left
+        nudge = 1e-9 * (t_end - t_start + 1.0)
+
+        cell_rows, cell_columns = self.heights.shape[0] - 1, self.heights.shape[1] - 1
+        top = len(self.mip_min)
+        level = top
+        t = t_start
+        while t <= t_end:
+            size = 1 << level
+            if level > 0:
+                mins, maxs = self.mip_min[level - 1], self.mip_max[level - 1]
+                rows, columns = mins.shape
+            else:
+                rows, columns = cell_rows, cell_columns
+            probe = t + nudge
+            i = min(max(int(floor((gx + gdx * probe) / size)), 0), columns - 1)
+            j = min(max(int(floor((gz + gdz * probe) / size)), 0), rows - 1)
+
+            # distance to the cell's exit, the DDA step
+            tx = ((i + 1) * size - gx) * inv_x if gdx > 0.0 else (i * size - gx) * inv_x if gdx < 0.0 else inf
+            tz = ((j + 1) * size - gz) * inv_z if gdz > 0.0 else (j * size - gz) * inv_z if gdz < 0.0 else inf
+            t_next = min(tx, tz, t_end)
+            if t_next <= t:
+                t_next = t + nudge
+
+            if level > 0:
+                y_a, y_b = oy + dy * t, oy + dy * t_next
+                if max(y_a, y_b) < mins[j, i] - eps or min(y_a, y_b) > maxs[j, i] + eps:
+                    # the ray passes above or below everything in the block
+                    t = t_next
+                    if t >= t_end:
+                        break
+                    level = min(level + 1, top)
+                    continue
+                level -= 1
+                continue
+
+            hit = self._intersect_cell(i, j, ox, oy, oz, dx, dy, dz, t_min, t_max)
+            if hit is not None:
+                return self._hit(ray, *hit)
+            t = t_next
+            if t >= t_end:
+                break
+        return None
+
+    def _hit(self, ray: Ray, t: float, slope_x: float, slope_z: float) -> GeometryHit:
+        normal = Vector(-slope_x, 1.0, -slope_z).normalize()
+        front_face = ray.direction.dot(normal) < 0.0
+        if not front_face:
+            normal = -normal
+        return GeometryHit(
+            dist=t,
+            point=ray.point_at(t),
+            normal=normal,
+            front_face=front_face,
+        )
+
+
+def _reduce_blocks(level: np.ndarray, reduce, fill: float) -> np.ndarray:
+    """
+    Combine 2 x 2 blocks of a mip level, padding odd sizes with fill.
+    """
+    rows, columns = level.shape
+    padded = np.full((rows + rows % 2, columns + columns % 2), fill, dtype=level.dtype)
+    padded[:rows, :columns] = level
+    return reduce.reduce((padded[0::2, 0::2], padded[0::2, 1::2], padded[1::2, 0::2], padded[1::2, 1::2]))
+
+
+def _round_float32(level: np.ndarray, towards: float) -> np.ndarray:
+    """
+    Convert a mip level to float32, stepping values that rounded inwards one ulp towards +inf or -inf,
+    so the stored range always contains the float64 heights.
+    """
+    rounded = level.astype(np.float32)
+    inwards = rounded > level if towards < 0 else rounded < level
+    return np.where(inwards, np.nextafter(rounded, np.float32(towards)), rounded)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
+import numpy as np
 from src.math import Vertex, Vector
+from src.math.batch import vec3_to_array, batch_dot, batch_face_forward
 from src.geometry.ray import Ray
 from src.geometry.geometry_hit import GeometryHit
 from src.geometry.primitive import Primitive
@@ -17,6 +19,12 @@ class Plane(Primitive):
     def __post_init__(self):
         self.normal = self.normal.normalize_ip()
 
+    def bake(self, transform) -> Plane:
+        """
+        Any affine transform maps a plane to a plane; the normal goes through the inverse transpose.
+        """
+        return Plane(point=transform.apply_point(self.point), normal=transform.apply_normal(self.normal))
+
     def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
         """
         Calculate intersection of ray with plane.
@@ -25,11 +33,20 @@ class Plane(Primitive):
         :param t_max: maximum valid distance for intersection
         :return: Hit record if intersection occurs, else None
         """
+        return self.intersect_from(ray, self.origin_terms(ray.origin), t_min, t_max)
+
+    def origin_terms(self, origin: Vertex) -> float:
+        """
+        Signed distance numerator (point - origin) . normal, shared by all rays from origin.
+        """
+        return (self.point - origin).dot(self.normal)
+
+    def intersect_from(self, ray: Ray, origin_terms, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
         denom = ray.direction.dot(self.normal)
         if abs(denom) < 1e-6:
             return None  # Ray is parallel to the plane
 
-        t = (self.point - ray.origin).dot(self.normal) / denom
+        t = origin_terms / denom
         if t < t_min or t > t_max:
             return None  # Intersection is out of bounds
 
@@ -45,6 +62,26 @@ class Plane(Primitive):
             front_face=ray.direction.dot(normal) < 0.0,
         )
 
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of intersect for (N, 3) arrays of ray origins and directions.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        normal = vec3_to_array(self.normal)
+        denom = directions @ normal
+
+        parallel = np.abs(denom) < 1e-6
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = ((vec3_to_array(self.point) - origins) @ normal) / np.where(parallel, 1.0, denom)
+
+        valid = ~parallel & (t >= t_min) & (t <= t_max)
+        dist = np.where(valid, t, np.inf)
+
+        normals = batch_face_forward(np.broadcast_to(normal, origins.shape), directions)
+        normals[~valid] = 0.0
+        return dist, normals
+
     def normal_at(self, point: Vertex) -> Vector:
         """
         Get the normal vector at a given point on the plane's surface.
@@ -0,0 +1,193 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import random
+import numpy as np
+from src.math import Vertex, Vector
+from src.math.batch import readonly_vec3_array, batch_face_forward
+from src.geometry.primitive import Primitive
+from src.geometry.ray import Ray
+from src.geometry.geometry_hit import GeometryHit
+
+
+@dataclass
+class Quad(Primitive):
+    """
+    Parallelogram spanned by a corner and two edge vectors: points corner + a * edge_u + b * edge_v with a, b in [0, 1].
+    Rectangles are quads with perpendicular edges. The default is a unit square in the XY plane centered at the origin.
+    Intersection is one plane test and two dot products, compared to two full triangle tests of Square.
+    """
+    corner: Vertex = field(default_factory=lambda: Vertex(-0.5, -0.5, 0))
+    edge_u: Vector = field(default_factory=lambda: Vector(1, 0, 0))
+    edge_v: Vector = field(default_factory=lambda: Vector(0, 1, 0))
+
+    def __post_init__(self):
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Cache the unit normal, the plane offset, the area and the dual edge vectors that turn a point on the plane
+        into its (a, b) coordinates with one dot product each; also as arrays for batch kernels.
+        """
+        n = self.edge_u.cross(self.edge_v)
+        n_length_squared = n.dot(n)
+        if n_length_squared == 0.0:
+            raise ValueError("Quad edges must not be parallel.")
+        w = n / n_length_squared
+        self.unit_normal = n.normalize()
+        self.plane_offset = self.unit_normal.dot(self.corner)
+        self.area = n_length_squared ** 0.5
+        self.dual_u = self.edge_v.cross(w)
+        self.dual_v = w.cross(self.edge_u)
+        self.corner_array = readonly_vec3_array(self.corner)
+        self.edge_u_array = readonly_vec3_array(self.edge_u)
+        self.edge_v_array = readonly_vec3_array(self.edge_v)
+        self.normal_array = readonly_vec3_array(self.unit_normal)
+        self.dual_u_array = readonly_vec3_array(self.dual_u)
+        self.dual_v_array = readonly_vec3_array(self.dual_v)
+
+    @staticmethod
+    def rectangle(center: Vertex, normal: Vector, width: float, height: float, up: Vector | None = None) -> Quad:
+        """
+        Build a width x height rectangle centered at center and facing normal.
+        :param up: direction of the height edge, projected onto the rectangle plane; world y (or z for horizontal rectangles) if None
+        :return: Quad
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError("Rectangle size must be positive.")
+        n = normal.normalize()
+        if up is None:
+            up = Vector(0, 0, 1) if abs(n.y) > 0.999 else Vector(0, 1, 0)
+        v_dir = (up - n * up.dot(n)).normalize()
+        u_dir = v_dir.cross(n)
+        edge_u, edge_v = u_dir * width, v_dir * height
+        return Quad(corner=center - edge_u * 0.5 - edge_v * 0.5, edge_u=edge_u, edge_v=edge_v)
+
+    def bake(self, transform) -> Quad:
+        """
+        Any affine transform maps a parallelogram to a parallelogram, so the corner and edges move to world space.
+        """
+        corner = transform.apply_point(self.corner)
+        return Quad(
+            corner=corner,
+            edge_u=transform.apply_point(self.corner + self.edge_u) - corner,
+            edge_v=transform.apply_point(self.corner + self.edge_v) - corner,
+        )
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        corners = (self.corner, self.corner + self.edge_u, self.corner + self.edge_v, self.corner + self.edge_u + self.edge_v)
+        xs, ys, zs = zip(*((v.x, v.y, v.z) for v in corners))
+        return Vertex(min(xs), min(ys), min(zs)), Vertex(max(xs), max(ys), max(zs))
+
+    def translate(self, offset: Vector) -> None:
+        """
+        Move quad by offset vector.
+        """
+        self.corner += offset
+        self.refresh()
+
+    def normal_at(self, point: Vertex) -> Vector:
+        return self.unit_normal
+
+    def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        """
+        Intersect the plane of the quad, then check the (a, b) coordinates of the hit point.
+        :param ray: Ray to test intersection with
+        :param t_min: minimum valid distance for intersection
+        :param t_max: maximum valid distance for intersection
+        :return: Hit record if intersection occurs, else None
+        """
+        return self.intersect_from(ray, self.origin_terms(ray.origin), t_min, t_max)
+
+    def origin_terms(self, origin: Vertex) -> tuple[float, Vector]:
+        """
+        Signed distance numerator of the plane test and the offset of the origin from the corner, shared by all rays from origin.
+        """
+        return self.plane_offset - self.unit_normal.dot(origin), origin - self.corner
+
+    def intersect_from(self, ray: Ray, origin_terms, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        numerator, corner_to_origin = origin_terms
+        direction = ray.direction
+
+        denom = direction.dot(self.unit_normal)
+        if abs(denom) < 1e-8:
+            return None
+
+        t = numerator / denom
+        if t < t_min or t > t_max:
+            return None
+
+        # coordinates of corner_to_origin + t * direction along the edges
+        a = corner_to_origin.dot(self.dual_u) + t * direction.dot(self.dual_u)
+        if a < 0.0 or a > 1.0:
+            return None
+        b = corner_to_origin.dot(self.dual_v) + t * direction.dot(self.dual_v)
+        if b < 0.0 or b > 1.0:
+            return None
+
+        normal = self.unit_normal
+        if denom > 0.0:
+            normal = -normal
+
+        return GeometryHit(
+            dist=t,
+            point=ray.point_at(t),
+            normal=normal,
+            front_face=denom < 0.0,
+        )
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of intersect for (N, 3) arrays of ray origins and directions.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        denom = directions @ self.normal_array
+        parallel = np.abs(denom) < 1e-8
+        t = (self.plane_offset - origins @ self.normal_array) / np.where(parallel, 1.0, denom)
+
+        local = origins - self.corner_array + directions * t[:, None]
+        a = local @ self.dual_u_array
+        b = local @ self.dual_v_array
+
+        valid = ~parallel & (t >= t_min) & (t <= t_max) & (a >= 0.0) & (a <= 1.0) & (b >= 0.0) & (b <= 1.0)
+        dist = np.where(valid, t, np.inf)
+
+        normals = batch_face_forward(np.broadcast_to(self.normal_array, origins.shape), directions)
+        normals[~valid] = 0.0
+        return dist, normals
+
+    def sample_point(self, u: float, v: float) -> Vertex:
+        """
+        Map a point of the unit square to the quad, uniformly by area. Stratified (u, v) give stratified points.
+        :param u: coordinate along edge_u in [0, 1]
+        :param v: coordinate along edge_v in [0, 1]
+        :return: point on the quad
+        """
+        return self.corner + self.edge_u * u + self.edge_v * v
+
+    def sample_points(self, uv: np.ndarray) -> np.ndarray:
+        """
+        Vectorized sample_point.
+        :param uv: (N, 2) coordinates in [0, 1]
+        :return: (N, 3) points on the quad
+        """
+        return self.corner_array + uv[:, :1] * self.edge_u_array + uv[:, 1:2] * self.edge_v_array
+
+    def random_point(self) -> Vertex:
+        return self.sample_point(random.random(), random.random())
+
+    def pdf(self, point: Vertex, direction: Vector) -> float:
+        """
+        Solid-angle density of sampling the quad uniformly by area, seen from point along direction towards the quad.
+        Used to weight area-light samples: pdf = distance^2 / (area * |cos theta_light|).
+        :param point: shaded point
+        :param direction: unit direction from point towards the sampled point
+        :return: density, 0 if the direction misses the quad
+        """
+        hit = self.intersect(Ray(point, direction))
+        if hit is None:
+            return 0.0
+        cosine = abs(direction.dot(self.unit_normal))
+        if cosine < 1e-12:
+            return 0.0
+        return hit.dist * hit.dist / (self.area * cosine)
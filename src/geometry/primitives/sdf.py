@@ -0,0 +1,377 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from math import sqrt, inf
+import numpy as np
+from src.math import Vertex, Vector
+from src.math.batch import batch_normalize, batch_face_forward
+from src.geometry.primitive import Primitive
+from src.geometry.ray import Ray
+from src.geometry.geometry_hit import GeometryHit
+
+# offsets of the tetrahedron technique for SDF gradients: four distance evaluations instead of six
+_TETRAHEDRON = ((1.0, -1.0, -1.0), (-1.0, -1.0, 1.0), (-1.0, 1.0, -1.0), (1.0, 1.0, 1.0))
+
+
+@dataclass(frozen=True)
+class SDF(ABC):
+    """
+    Signed distance function: negative inside, positive outside, never larger than the true distance to the surface.
+    Nodes are immutable and compose into trees (SDFUnion, SDFSmoothUnion). Every node has an axis-aligned
+    bounding box of its surface, used to clip rays and to skip exact evaluation of far away children.
+    """
+
+    def __post_init__(self):
+        lo, hi = self.bounds()
+        object.__setattr__(self, "_lo", (lo.x, lo.y, lo.z))
+        object.__setattr__(self, "_hi", (hi.x, hi.y, hi.z))
+
+    @abstractmethod
+    def distance(self, x: float, y: float, z: float) -> float:
+        """
+        Signed distance of one point.
+        """
+        raise NotImplementedError("SDF.distance must be implemented by subclasses")
+
+    @abstractmethod
+    def distances(self, points: np.ndarray) -> np.ndarray:
+        """
+        Signed distances of an (N, 3) array of points.
+        :return: (N,) array
+        """
+        raise NotImplementedError("SDF.distances must be implemented by subclasses")
+
+    @abstractmethod
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        """
+        Axis-aligned box containing the surface (the zero set) of the SDF.
+        """
+        raise NotImplementedError("SDF.bounds must be implemented by subclasses")
+
+    def box_distance(self, x: float, y: float, z: float) -> float:
+        """
+        Distance of a point to the bounding box, a cheap lower bound of the distance to the surface outside the box.
+        """
+        lo, hi = self._lo, self._hi
+        dx = max(lo[0] - x, 0.0, x - hi[0])
+        dy = max(lo[1] - y, 0.0, y - hi[1])
+        dz = max(lo[2] - z, 0.0, z - hi[2])
+        return sqrt(dx * dx + dy * dy + dz * dz)
+
+    def box_distances(self, points: np.ndarray) -> np.ndarray:
+        """
+        Vectorized box_distance.
+        """
+        outside = np.maximum(np.maximum(np.asarray(self._lo) - points, points - np.asarray(self._hi)), 0.0)
+        return np.sqrt(np.sum(outside * outside, axis=1))
+
+
+@dataclass(frozen=True)
+class SDFSphere(SDF):
+    center: Vertex = field(default_factory=lambda: Vertex(0, 0, 0))
+    radius: float = 1.0
+
+    def distance(self, x, y, z):
+        c = self.center
+        return sqrt((x - c.x) ** 2 + (y - c.y) ** 2 + (z - c.z) ** 2) - self.radius
+
+    def distances(self, points):
+        c = self.center
+        return np.linalg.norm(points - (c.x, c.y, c.z), axis=1) - self.radius
+
+    def bounds(self):
+        c, r = self.center, abs(self.radius)
+        return Vertex(c.x - r, c.y - r, c.z - r), Vertex(c.x + r, c.y + r, c.z + r)
+
+
+@dataclass(frozen=True)
+class SDFBox(SDF):
+    """
+    Box with the given half extents, optionally with edges rounded by rounding (the box grows by rounding).
+    """
+    center: Vertex = field(default_factory=lambda: Vertex(0, 0, 0))
+    half_size: Vector = field(default_factory=lambda: Vector(0.5, 0.5, 0.5))
+    rounding: float = 0.0
+
+    def distance(self, x, y, z):
+        c, b = self.center, self.half_size
+        qx, qy, qz = abs(x - c.x) - b.x, abs(y - c.y) - b.y, abs(z - c.z) - b.z
+        mx, my, mz = max(qx, 0.0), max(qy, 0.0), max(qz, 0.0)
+        return sqrt(mx * mx + my * my + mz * mz) + min(max(qx, qy, qz), 0.0) - self.rounding
+
+    def distances(self, points):
+        c, b = self.center, self.half_size
+        q = np.abs(points - (c.x, c.y, c.z)) - (b.x, b.y, b.z)
+        return np.linalg.norm(np.maximum(q, 0.0), axis=1) + np.minimum(np.max(q, axis=1), 0.0) - self.rounding
+
+    def bounds(self):
+        c, b, r = self.center, self.half_size, max(self.rounding, 0.0)
+        return (Vertex(c.x - abs(b.x) - r, c.y - abs(b.y) - r, c.z - abs(b.z) - r),
+                Vertex(c.x + abs(b.x) + r, c.y + abs(b.y) + r, c.z + abs(b.z) + r))
+
+
+@dataclass(frozen=True)
+class SDFTorus(SDF):
+    """
+    Torus around the y axis, same shape as the Torus primitive.
+    """
+    center: Vertex = field(default_factory=lambda: Vertex(0, 0, 0))
+    radius_major: float = 1.0
+    radius_tube: float = 0.2
+
+    def distance(self, x, y, z):
+        c = self.center
+        x, y, z = x - c.x, y - c.y, z - c.z
+        ring = sqrt(x * x + z * z) - self.radius_major
+        return sqrt(ring * ring + y * y) - self.radius_tube
+
+    def distances(self, points):
+        local = points - (self.center.x, self.center.y, self.center.z)
+        ring = np.hypot(local[:, 0], local[:, 2]) - self.radius_major
+        return np.hypot(ring, local[:, 1]) - self.radius_tube
+
+    def bounds(self):
+        c = self.center
+        outer, tube = abs(self.radius_major) + abs(self.radius_tube), abs(self.radius_tube)
+        return Vertex(c.x - outer, c.y - tube, c.z - outer), Vertex(c.x + outer, c.y + tube, c.z + outer)
+
+
+@dataclass(frozen=True)
+class SDFUnion(SDF):
+    """
+    Union of any number of SDFs. Children whose bounding box is farther than the nearest distance found so far
+    are not evaluated, so large unions cost little more than the children near the point.
+    """
+    children: tuple[SDF, ...] = ()
+
+    def __post_init__(self):
+        if not self.children:
+            raise ValueError("SDFUnion needs at least one child.")
+        object.__setattr__(self, "children", tuple(self.children))
+        super().__post_init__()
+
+    def distance(self, x, y, z):
+        nearest = inf
+        for child in self.children:
+            if child.box_distance(x, y, z) < nearest:
+                nearest = min(nearest, child.distance(x, y, z))
+        return nearest
+
+    def distances(self, points):
+        nearest = np.full(points.shape[0], np.inf)
+        for child in self.children:
+            rows = np.flatnonzero(child.box_distances(points) < nearest)
+            if rows.size:
+                nearest[rows] = np.minimum(nearest[rows], child.distances(points[rows]))
+        return nearest
+
+    def bounds(self):
+        boxes = [child.bounds() for child in self.children]
+        return (Vertex(min(lo.x for lo, _ in boxes), min(lo.y for lo, _ in boxes), min(lo.z for lo, _ in boxes)),
+                Vertex(max(hi.x for _, hi in boxes), max(hi.y for _, hi in boxes), max(hi.z for _, hi in boxes)))
+
+
+@dataclass(frozen=True)
+class SDFSmoothUnion(SDF):
+    """
+    Union of two SDFs blended over a distance of about blend (polynomial smooth minimum).
+    """
+    a: SDF = None
+    b: SDF = None
+    blend: float = 0.25
+
+    def __post_init__(self):
+        if self.a is None or self.b is None:
+            raise ValueError("SDFSmoothUnion needs two SDFs.")
+        if self.blend <= 0:
+            raise ValueError("Blend distance must be positive.")
+        super().__post_init__()
+
+    def distance(self, x, y, z):
+        da, db = self.a.distance(x, y, z), self.b.distance(x, y, z)
+        h = max(0.0, min(1.0, 0.5 + 0.5 * (db - da) / self.blend))
+        return db + (da - db) * h - self.blend * h * (1.0 - h)
+
+    def distances(self, points):
+        da, db = self.a.distances(points), self.b.distances(points)
+        h = np.clip(0.5 + 0.5 * (db - da) / self.blend, 0.0, 1.0)
+        return db + (da - db) * h - self.blend * h * (1.0 - h)
+
+    def bounds(self):
+        # the smooth minimum lies at most blend / 4 below the plain minimum, so the surface grows by at most that
+        grow = 0.25 * self.blend
+        (alo, ahi), (blo, bhi) = self.a.bounds(), self.b.bounds()
+        return (Vertex(min(alo.x, blo.x) - grow, min(alo.y, blo.y) - grow, min(alo.z, blo.z) - grow),
+                Vertex(max(ahi.x, bhi.x) + grow, max(ahi.y, bhi.y) + grow, max(ahi.z, bhi.z) + grow))
+
+
+@dataclass
+class SDFPrimitive(Primitive):
+    """
+    Primitive rendered by sphere tracing a signed distance function.
+    Rays are clipped to the SDF's bounding box and marched with over-relaxed steps (relaxation times the distance).
+    When a relaxed step lands inside the shape, leaves the box, or its unbounding sphere stops overlapping the
+    previous one, the march steps back and continues with plain steps, so no surface is skipped.
+     - epsilon: distance below which the ray counts as hitting the surface
+     - max_steps: march budget per ray, rays that run out count as misses
+     - relaxation: step multiplier in [1, 2), 1 is plain sphere tracing
+    """
+    sdf: SDF = field(default_factory=SDFSphere)
+    epsilon: float = 1e-4
+    max_steps: int = 256
+    relaxation: float = 1.6
+
+    def __post_init__(self):
+        if not 1.0 <= self.relaxation < 2.0:
+            raise ValueError("Relaxation must be in [1, 2).")
+        if self.epsilon <= 0 or self.max_steps <= 0:
+            raise ValueError("Epsilon and max_steps must be positive.")
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        return self.sdf.bounds()
+
+    def _clip(self, o: tuple[float, float, float], d: tuple[float, float, float], t_min: float, t_max: float) -> tuple[float, float] | None:
+        # the box is grown by epsilon so surfaces touching it are still reached
+        lo, hi = self.sdf.bounds()
+        t_start, t_end = t_min, t_max
+        for oc, dc, l, h in zip(o, d, (lo.x, lo.y, lo.z), (hi.x, hi.y, hi.z)):
+            l, h = l - self.epsilon, h + self.epsilon
+            if dc == 0.0:
+                if oc < l or oc > h:
+                    return None
+                continue
+            t0, t1 = (l - oc) / dc, (h - oc) / dc
+            if t0 > t1:
+                t0, t1 = t1, t0
+            t_start, t_end = max(t_start, t0), min(t_end, t1)
+            if t_start > t_end:
+                return None
+        return t_start, t_end
+
+    def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        """
+        Sphere trace a single ray. Rays starting inside the shape (e.g. refracted rays) march on the negated distance.
+        :param ray: Ray to test intersection with
+        :param t_min: minimum valid distance for intersection
+        :param t_max: maximum valid distance for intersection
+        :return: Hit record if intersection occurs, else None
+        """
+        ox, oy, oz = ray.origin.x, ray.origin.y, ray.origin.z
+        dx, dy, dz = ray.direction.x, ray.direction.y, ray.direction.z
+        span = self._clip((ox, oy, oz), (dx, dy, dz), t_min, t_max)
+        if span is None:
+            return None
+        t, t_end = span
+        distance = self.sdf.distance
+        side = 1.0 if distance(ox + dx * t, oy + dy * t, oz + dz * t) >= 0.0 else -1.0
+
+        omega = self.relaxation
+        t_prev, r_prev, step = t, 0.0, 0.0
+        for _ in range(self.max_steps):
+            overshot = t > t_end
+            r = 0.0 if overshot else side * distance(ox + dx * t, oy + dy * t, oz + dz * t)
+            if omega > 1.0 and (overshot or r < -self.epsilon or abs(r) + r_prev < step):
+                # the relaxed step went past what the last sphere guaranteed, redo it as a plain step
+                omega = 1.0
+                step = r_prev
+                t = t_prev + step
+                continue
+            if overshot:
+                return None
+            if r < self.epsilon:
+                return self._hit(ray, t)
+            t_prev, r_prev = t, r
+            step = omega * r
+            t += step
+        return None
+
+    def _hit(self, ray: Ray, t: float) -> GeometryHit:
+        point = ray.point_at(t)
+        normal = self.normal_at(point)
+        front_face = ray.direction.dot(normal) < 0.0
+        if not front_face:
+            normal = -normal
+        return GeometryHit(dist=t, point=point, normal=normal, front_face=front_face)
+
+    def normal_at(self, point: Vertex) -> Vector:
+        """
+        Outward normal from the SDF gradient (tetrahedron technique).
+        """
+        h = self.epsilon
+        distance = self.sdf.distance
+        nx = ny = nz = 0.0
+        for kx, ky, kz in _TETRAHEDRON:
+            f = distance(point.x + h * kx, point.y + h * ky, point.z + h * kz)
+            nx, ny, nz = nx + kx * f, ny + ky * f, nz + kz * f
+        return Vector(nx, ny, nz).normalize()
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        March all rays together: every iteration evaluates the SDF once for the rays still marching,
+        with the same over-relaxation and step-back rule as intersect.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        n = origins.shape[0]
+        dist = np.full(n, np.inf)
+        normals = np.zeros((n, 3))
+
+        lo, hi = self.sdf.bounds()
+        lo = np.array([lo.x, lo.y, lo.z]) - self.epsilon
+        hi = np.array([hi.x, hi.y, hi.z]) + self.epsilon
+        parallel = directions == 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t0 = (lo - origins) / directions
+            t1 = (hi - origins) / directions
+        outside = np.any(parallel & ((origins < lo) | (origins > hi)), axis=1)
+        t0 = np.where(parallel, -np.inf, t0)
+        t1 = np.where(parallel, np.inf, t1)
+        t_start = np.maximum(np.max(np.minimum(t0, t1), axis=1), t_min)
+        t_end = np.minimum(np.min(np.maximum(t0, t1), axis=1), t_max)
+
+        rows = np.flatnonzero(~outside & (t_start <= t_end))
+        if rows.size == 0:
+            return dist, normals
+
+        o, d, t_end = origins[rows], directions[rows], t_end[rows]
+        t = t_start[rows]
+        side = np.where(self.sdf.distances(o + d * t[:, None]) >= 0.0, 1.0, -1.0)
+        omega = np.full(rows.size, self.relaxation)
+        t_prev = t.copy()
+        r_prev = np.zeros(rows.size)
+        step = np.zeros(rows.size)
+        active = np.arange(rows.size)
+
+        for _ in range(self.max_steps):
+            if active.size == 0:
+                break
+            overshot = t[active] > t_end[active]
+            r = np.zeros(active.size)
+            inside_box = active[~overshot]
+            r[~overshot] = side[inside_box] * self.sdf.distances(o[inside_box] + d[inside_box] * t[inside_box, None])
+
+            failed = (omega[active] > 1.0) & (overshot | (r < -self.epsilon) | (np.abs(r) + r_prev[active] < step[active]))
+            redo = active[failed]
+            omega[redo] = 1.0
+            step[redo] = r_prev[redo]
+            t[redo] = t_prev[redo] + step[redo]
+
+            hit = ~failed & ~overshot & (r < self.epsilon)
+            dist[rows[active[hit]]] = t[active[hit]]
+
+            go = ~failed & ~overshot & ~hit
+            moving = active[go]
+            t_prev[moving] = t[moving]
+            r_prev[moving] = r[go]
+            step[moving] = omega[moving] * r[go]
+            t[moving] += step[moving]
+
+            active = np.concatenate([redo, moving])
+
+        found = np.isfinite(dist)
+        if found.any():
+            points = origins[found] + directions[found] * dist[found, None]
+            h = self.epsilon
+            gradient = sum(np.array(k) * self.sdf.distances(points + h * np.array(k))[:, None] for k in _TETRAHEDRON)
+            normals[found] = batch_face_forward(batch_normalize(gradient), directions[found])
+        return dist, normals
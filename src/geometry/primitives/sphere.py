@@ -1,7 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from math import sqrt
+import numpy as np
 from src.math import Vertex
+from src.math.batch import vec3_to_array, batch_dot, batch_normalize, batch_face_forward
 from src.geometry.primitive import Primitive
 from src.geometry.ray import Ray
 from src.geometry.geometry_hit import GeometryHit
@@ -24,12 +26,21 @@ class Sphere(Primitive):
         :param t_max: maximum valid distance for intersection
         :return: Hit record if intersection occurs, else None
         """
-        oc = ray.origin - self.center  # Vector from oray origin to sphere center
+        return self.intersect_from(ray, self.origin_terms(ray.origin), t_min, t_max)
+
+    def origin_terms(self, origin: Vertex) -> tuple[Vector, float]:
+        """
+        Origin offset and the constant quadratic coefficient, shared by all rays from origin.
+        """
+        oc = origin - self.center  # Vector from ray origin to sphere center
+        return oc, oc.dot(oc) - self.radius * self.radius  # Sphere quadratic coefficient c
+
+    def intersect_from(self, ray: Ray, origin_terms, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        oc, c = origin_terms
 
         # Quadratic coefficients
         a = ray.direction.dot(ray.direction)  # Usually = 1 if ray.direction is normalized
         b = 2.0 * oc.dot(ray.direction)  # Projection of oc onto the ray
-        c = oc.dot(oc) - self.radius * self.radius  # Sphere quadratic coefficient c
 
         discriminant = b * b - 4 * a * c
         if discriminant < 0:
@@ -61,6 +72,48 @@ class Sphere(Primitive):
             front_face=front_face
         )
 
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of intersect for (N, 3) arrays of ray origins and directions.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        center = vec3_to_array(self.center)
+        oc = origins - center
+
+        a = batch_dot(directions, directions)
+        b = 2.0 * batch_dot(oc, directions)
+        c = batch_dot(oc, oc) - self.radius * self.radius
+
+        discriminant = b * b - 4 * a * c
+        sqrt_disc = np.sqrt(np.maximum(discriminant, 0.0))
+
+        # nearer root first, the farther one if the nearer is out of range
+        root = (-b - sqrt_disc) / (2.0 * a)
+        far = (-b + sqrt_disc) / (2.0 * a)
+        root = np.where((root < t_min) | (root > t_max), far, root)
+
+        valid = (discriminant >= 0) & (root >= t_min) & (root <= t_max)
+        dist = np.where(valid, root, np.inf)
+
+        hit_points = origins + directions * np.where(valid, root, 0.0)[:, None]
+        normals = batch_face_forward(batch_normalize((hit_points - center) / self.radius), directions)
+        normals[~valid] = 0.0
+        return dist, normals
+
+    def bake(self, transform) -> Sphere | None:
+        """
+        A sphere stays a sphere under rotation, translation and uniform scale.
+        """
+        if not transform.is_similarity:
+            return None
+        return Sphere(center=transform.apply_point(self.center), radius=self.radius * transform.uniform_scale)
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        r = abs(self.radius)
+        c = self.center
+        return Vertex(c.x - r, c.y - r, c.z - r), Vertex(c.x + r, c.y + r, c.z + r)
+
     def normal_at(self, point: Vertex) -> Vector:
         """
         Get the normal vector at a given point on the sphere's surface.
@@ -0,0 +1,296 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import numpy as np
+from src.math import Vertex, Vector
+from src.math.batch import batch_face_forward
+from src.geometry.primitive import Primitive
+from src.geometry.ray import Ray
+from src.geometry.geometry_hit import GeometryHit
+
+_LEAF_SIZE = 8
+
+
+@dataclass(eq=False)
+class SphereCloud(Primitive):
+    """
+    Many spheres stored as NumPy arrays instead of one Sphere object each, for particles, point clouds and packings.
+    Every sphere costs its float32 center and radius, an int32 material index and about 15 bytes of the internal
+    BVH, a few tens of bytes against the kilobytes of a Sphere, an Object and their Vertex fields.
+    The BVH is a flat array of float32 node boxes in depth-first order: the left child of an inner node follows it
+    directly, leaves hold up to 8 spheres. Rays traverse it level by level, all (ray, node) pairs of a level at once.
+    Hits report the sphere index in GeometryHit.element; with materials and material_ids set, every sphere is shaded
+    with its own material (see material_at).
+    """
+    centers: np.ndarray = field(default_factory=lambda: np.zeros((1, 3), dtype=np.float32))
+    radii: np.ndarray | float = 1.0  # one radius per sphere, or one for all
+    material_ids: np.ndarray | None = None  # index into materials for every sphere
+    materials: tuple = ()
+
+    def __post_init__(self):
+        self.centers = np.asarray(self.centers, dtype=np.float32)
+        if np.ndim(self.radii) == 0:
+            # a shared radius is stored once and broadcast
+            self.radii = np.broadcast_to(np.float32(self.radii), (self.centers.shape[0],))
+        else:
+            self.radii = np.asarray(self.radii, dtype=np.float32)
+        if self.material_ids is not None:
+            self.material_ids = np.asarray(self.material_ids, dtype=np.int32)
+        self.materials = tuple(self.materials)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Validate the arrays and rebuild the BVH.
+        node_lo / node_hi are the node boxes, node_start / node_count the range of order for leaves (count > 0);
+        inner nodes have count 0 and store the index of their right child in node_start.
+        """
+        n = self.centers.shape[0]
+        if self.centers.ndim != 2 or self.centers.shape[1] != 3 or n == 0:
+            raise ValueError("Sphere cloud centers must be a non-empty (N, 3) array.")
+        if self.radii.shape != (n,):
+            raise ValueError("Sphere cloud needs one radius per sphere.")
+        if np.any(self.radii <= 0):
+            raise ValueError("Sphere radii must be positive.")
+        if self.material_ids is not None:
+            if self.material_ids.shape != (n,):
+                raise ValueError("Sphere cloud needs one material id per sphere.")
+            if self.materials and (self.material_ids.min() < 0 or self.material_ids.max() >= len(self.materials)):
+                raise ValueError("Sphere material ids must index into materials.")
+        self._build_bvh()
+
+    def _build_bvh(self) -> None:
+        n = self.centers.shape[0]
+        lo = self.centers - self.radii[:, None]
+        hi = self.centers + self.radii[:, None]
+        order = np.arange(n, dtype=np.int32)
+        # median splits leave at least _LEAF_SIZE // 2 spheres per leaf
+        capacity = 4 * (n // _LEAF_SIZE + 1)
+        node_lo = np.empty((capacity, 3), dtype=np.float32)
+        node_hi = np.empty((capacity, 3), dtype=np.float32)
+        node_start = np.empty(capacity, dtype=np.int32)
+        node_count = np.empty(capacity, dtype=np.int32)
+
+        count = 0
+        # (node index, first, end) of nodes waiting for their right child index, and ranges still to build
+        stack = [(-1, 0, n)]
+        while stack:
+            parent, first, end = stack.pop()
+            node = count
+            count += 1
+            if parent >= 0:
+                node_start[parent] = node
+            members = order[first:end]
+            node_lo[node] = lo[members].min(axis=0)
+            node_hi[node] = hi[members].max(axis=0)
+            if end - first <= _LEAF_SIZE:
+                node_start[node] = first
+                node_count[node] = end - first
+                continue
+
+            # median split along the widest axis of the centers
+            centers = self.centers[members]
+            axis = int(np.argmax(centers.max(axis=0) - centers.min(axis=0)))
+            middle = (end - first) // 2
+            order[first:end] = members[np.argpartition(centers[:, axis], middle)]
+            node_count[node] = 0
+            # the left child is built next, so it gets index node + 1
+            stack.append((node, first + middle, end))
+            stack.append((-1, first, first + middle))
+
+        self.order = order
+        self.node_lo = node_lo[:count].copy()
+        self.node_hi = node_hi[:count].copy()
+        self.node_start = node_start[:count].copy()
+        self.node_count = node_count[:count].copy()
+
+    def __len__(self) -> int:
+        return self.centers.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the sphere arrays and the BVH, in bytes.
+        """
+        arrays = (self.centers, self.order, self.node_lo, self.node_hi, self.node_start, self.node_count)
+        total = sum(a.nbytes for a in arrays)
+        # a shared radius is one broadcast value
+        total += self.radii.itemsize if self.radii.strides == (0,) else self.radii.nbytes
+        if self.material_ids is not None:
+            total += self.material_ids.nbytes
+        return total
+
+    @property
+    def per_element_materials(self) -> bool:
+        return bool(self.materials) and self.material_ids is not None
+
+    def material_at(self, hit: GeometryHit, material):
+        """
+        Material of the sphere that was hit, found from hit.element or, for batch hits, from the hit point.
+        """
+        if not self.per_element_materials:
+            return material
+        element = hit.element if hit.element is not None else self.sphere_at(hit.point)
+        return self.materials[int(self.material_ids[element])]
+
+    def bake(self, transform) -> SphereCloud | None:
+        """
+        Similarity transforms (rotation, uniform scale, translation) keep spheres round, so centers and radii move to world space.
+        """
+        linear = transform.matrix[:3, :3]
+        gram = linear.T @ linear
+        scale_squared = gram[0, 0]
+        if scale_squared <= 0 or not np.allclose(gram, scale_squared * np.eye(3), rtol=1e-9, atol=1e-12):
+            return None
+        centers = self.centers @ linear.T.astype(np.float32) + transform.matrix[:3, 3].astype(np.float32)
+        scale = np.float32(np.sqrt(scale_squared))
+        radii = self.radii[0] * scale if self.radii.strides == (0,) else self.radii * scale
+        return SphereCloud(centers=centers, radii=radii, material_ids=self.material_ids, materials=self.materials)
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        lo, hi = self.node_lo[0], self.node_hi[0]
+        return Vertex(float(lo[0]), float(lo[1]), float(lo[2])), Vertex(float(hi[0]), float(hi[1]), float(hi[2]))
+
+    def translate(self, offset: Vector) -> None:
+        """
+        Move all spheres by offset vector.
+        """
+        self.centers = self.centers + np.array([offset.x, offset.y, offset.z], dtype=np.float32)
+        self.refresh()
+
+    def sphere_at(self, point: Vertex) -> int:
+        """
+        Index of the sphere whose surface is closest to point, searched through the BVH.
+        """
+        p = np.array([point.x, point.y, point.z], dtype=np.float32)
+        best, best_gap = 0, np.inf
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            # nodes at least best_gap away from the point cannot hold a closer surface
+            outside = np.maximum(np.maximum(self.node_lo[node] - p, p - self.node_hi[node]), 0.0)
+            if float(outside @ outside) > best_gap * best_gap:
+                continue
+            count = self.node_count[node]
+            if count == 0:
+                stack.append(int(self.node_start[node]))
+                stack.append(node + 1)
+                continue
+            members = self.order[self.node_start[node]:self.node_start[node] + count]
+            gaps = np.abs(np.linalg.norm(self.centers[members] - p, axis=1) - self.radii[members])
+            k = int(np.argmin(gaps))
+            if gaps[k] < best_gap:
+                best, best_gap = int(members[k]), float(gaps[k])
+        return best
+
+    def normal_at(self, point: Vertex) -> Vector:
+        c = self.centers[self.sphere_at(point)]
+        return Vector(point.x - float(c[0]), point.y - float(c[1]), point.z - float(c[2])).normalize()
+
+    def _traverse(self, origins: np.ndarray, directions: np.ndarray, t_min: float,
+                  t_max: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest sphere hit of every ray, walking the BVH one level per step for all rays together.
+        Pairs whose node box starts beyond the best hit so far are dropped.
+        :return: (dist, sphere) - (N,) distances with inf on miss, (N,) sphere indices, -1 on miss
+        """
+        n = origins.shape[0]
+        best = np.full(n, np.inf)
+        best_sphere = np.full(n, -1, dtype=np.int64)
+        limit = np.full(n, t_max, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse = 1.0 / directions
+
+            rays = np.arange(n)
+            nodes = np.zeros(n, dtype=np.int64)
+            while rays.size:
+                o, inv = origins[rays], inverse[rays]
+                t0 = (self.node_lo[nodes] - o) * inv
+                t1 = (self.node_hi[nodes] - o) * inv
+                near, far = np.minimum(t0, t1), np.maximum(t0, t1)
+                # rays parallel to a slab give nan for origins on its planes, treat those as inside
+                near = np.max(np.where(np.isnan(near), -np.inf, near), axis=1)
+                far = np.min(np.where(np.isnan(far), np.inf, far), axis=1)
+                keep = (near <= far) & (far >= t_min) & (near <= limit[rays])
+                rays, nodes = rays[keep], nodes[keep]
+
+                counts = self.node_count[nodes]
+                leaf = counts > 0
+                if np.any(leaf):
+                    self._test_leaves(rays[leaf], nodes[leaf], counts[leaf], origins, directions, t_min,
+                                      limit, best, best_sphere)
+
+                inner_rays, inner_nodes = rays[~leaf], nodes[~leaf]
+                rays = np.concatenate((inner_rays, inner_rays))
+                nodes = np.concatenate((inner_nodes + 1, self.node_start[inner_nodes]))
+        return best, best_sphere
+
+    def _test_leaves(self, rays, nodes, counts, origins, directions, t_min, limit, best, best_sphere) -> None:
+        """
+        Intersect every (ray, sphere) pair of the given leaves and keep the nearest hit per ray.
+        """
+        total = int(counts.sum())
+        first = np.repeat(self.node_start[nodes], counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_rays = np.repeat(rays, counts)
+        spheres = self.order[first + offsets]
+
+        d = directions[pair_rays]
+        oc = origins[pair_rays] - self.centers[spheres]
+        r = self.radii[spheres].astype(np.float64)
+        a = np.einsum("ij,ij->i", d, d)
+        half_b = np.einsum("ij,ij->i", oc, d)
+        c = np.einsum("ij,ij->i", oc, oc) - r * r
+        discriminant = half_b * half_b - a * c
+        root = np.sqrt(np.maximum(discriminant, 0.0))
+        t = (-half_b - root) / a
+        t = np.where(t < t_min, (-half_b + root) / a, t)
+
+        valid = (discriminant >= 0.0) & (t >= t_min) & (t <= limit[pair_rays])
+        pair_rays, spheres, t = pair_rays[valid], spheres[valid], t[valid]
+        np.minimum.at(best, pair_rays, t)
+        winners = t == best[pair_rays]
+        best_sphere[pair_rays[winners]] = spheres[winners]
+        limit[pair_rays[winners]] = t[winners]
+
+    def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        """
+        Nearest sphere along the ray, through the same BVH traversal as intersect_batch.
+        :param ray: Ray to test intersection with
+        :param t_min: minimum valid distance for intersection
+        :param t_max: maximum valid distance for intersection
+        :return: Hit record with the sphere index in element if intersection occurs, else None
+        """
+        o, d = ray.origin, ray.direction
+        dist, sphere = self._traverse(np.array([[o.x, o.y, o.z]]), np.array([[d.x, d.y, d.z]]), t_min, t_max)
+        if sphere[0] < 0:
+            return None
+
+        t = float(dist[0])
+        point = ray.point_at(t)
+        c = self.centers[sphere[0]]
+        normal = Vector(point.x - float(c[0]), point.y - float(c[1]), point.z - float(c[2]))
+        front_face = d.dot(normal) < 0.0
+        if not front_face:
+            normal = -normal
+        return GeometryHit(
+            dist=t,
+            point=point,
+            normal=normal,
+            front_face=front_face,
+            element=int(sphere[0]),
+        )
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of intersect for (N, 3) arrays of ray origins and directions.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        dist, sphere = self._traverse(origins, directions, t_min, t_max)
+        hit = sphere >= 0
+        normals = np.zeros_like(origins, dtype=np.float64)
+        if np.any(hit):
+            points = origins[hit] + directions[hit] * dist[hit, None]
+            outward = (points - self.centers[sphere[hit]]) / self.radii[sphere[hit], None]
+            normals[hit] = batch_face_forward(outward, directions[hit])
+        return dist, normals
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import numpy as np
 from src.math import Vertex, Vector
 from src.geometry.primitive import Primitive
 from src.geometry.ray import Ray
@@ -35,7 +36,12 @@ class Square(Primitive):
         self.__post_init__()
 
     def __post_init__(self):
-        # Create two triangles from the square's vertices
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Rebuild the two triangles, and with them their cached edges and normal, from the square's vertices.
+        """
         self.tri1 = Triangle(self.v0, self.v1, self.v2)
         self.tri2 = Triangle(self.v0, self.v2, self.v3)
 
@@ -54,6 +60,31 @@ class Square(Primitive):
             return hit1 if hit1.dist < hit2.dist else hit2
         return hit1 or hit2
 
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized intersection with both triangles, keeping the nearer hit per ray.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        dist1, normals1 = self.tri1.intersect_batch(origins, directions, t_min, t_max)
+        dist2, normals2 = self.tri2.intersect_batch(origins, directions, t_min, t_max)
+
+        use_second = dist2 < dist1
+        return np.where(use_second, dist2, dist1), np.where(use_second[:, None], normals2, normals1)
+
+    def bake(self, transform) -> Square:
+        """
+        Move all four vertices to world space, any affine transform keeps the two triangles valid.
+        """
+        square = Square()
+        square.v0, square.v1, square.v2, square.v3 = (transform.apply_point(v) for v in (self.v0, self.v1, self.v2, self.v3))
+        square.refresh()
+        return square
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        xs, ys, zs = zip(*((v.x, v.y, v.z) for v in (self.v0, self.v1, self.v2, self.v3)))
+        return Vertex(min(xs), min(ys), min(zs)), Vertex(max(xs), max(ys), max(zs))
+
     def random_point(self) -> Vertex:
         u = random.uniform(0, 1)
         v = random.uniform(0, 1)
@@ -1,7 +1,10 @@
 from __future__ import annotations
+from math import sqrt
 import numpy as np
 from dataclasses import dataclass, field
 from src.math import Vertex, Vector
+from src.math.batch import vec3_to_array, batch_dot, batch_normalize
+from src.math.polynomial import solve_quartic, solve_quartic_batch
 from src.geometry.primitive import Primitive
 from src.geometry.ray import Ray
 from src.geometry.geometry_hit import GeometryHit
@@ -17,6 +20,21 @@ class Torus(Primitive):
     radius_major: float = 1.0  # Major radius (distance from center to tube center)
     radius_tube: float  = 0.2  # Minor radius (tube radius)
 
+    def bake(self, transform) -> Torus | None:
+        """
+        The torus axis is fixed to y, so only translation and positive uniform scale can be baked.
+        """
+        if not (transform.is_axis_aligned and transform.is_similarity and np.all(np.diag(transform.matrix)[:3] > 0)):
+            return None
+        scale = transform.uniform_scale
+        return Torus(center=transform.apply_point(self.center), radius_major=self.radius_major * scale, radius_tube=self.radius_tube * scale)
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        outer = abs(self.radius_major) + abs(self.radius_tube)
+        tube = abs(self.radius_tube)
+        c = self.center
+        return Vertex(c.x - outer, c.y - tube, c.z - outer), Vertex(c.x + outer, c.y + tube, c.z + outer)
+
     def normal_at(self, point: Vertex) -> Vector:
         local_hit = point - self.center
         nx = 4 * local_hit.x * (
@@ -31,26 +49,38 @@ class Torus(Primitive):
         ray_origin = ray.origin - self.center
         rd = ray.direction
 
-        # coefficients for quartic equation
         ox, oy, oz = ray_origin.x, ray_origin.y, ray_origin.z
         dx, dy, dz = rd.x, rd.y, rd.z
-
         sum_d_sq = dx * dx + dy * dy + dz * dz
+
+        # early reject with the bounding sphere of radius R + r, most rays of a frame miss the torus
+        f = ox * dx + oy * dy + oz * dz
+        bounding_radius = abs(self.radius_major) + abs(self.radius_tube)
+        discriminant = f * f - sum_d_sq * (ox * ox + oy * oy + oz * oz - bounding_radius * bounding_radius)
+        if discriminant < 0.0:
+            return None
+        root = sqrt(discriminant)
+        t_enter, t_exit = (-f - root) / sum_d_sq, (-f + root) / sum_d_sq
+        if t_exit < t_min or t_enter > t_max:
+            return None
+
+        # solve from the bounding sphere entry, far away origins would make the quartic badly conditioned
+        t_start = max(t_enter, 0.0)
+        ox, oy, oz = ox + t_start * dx, oy + t_start * dy, oz + t_start * dz
+
+        # coefficients for quartic equation
         e = ox * ox + oy * oy + oz * oz - self.radius_major * self.radius_major - self.radius_tube * self.radius_tube
         f = ox * dx + oy * dy + oz * dz
         four_R2 = 4.0 * self.radius_major * self.radius_major
 
-        coeffs = [
+        roots = solve_quartic(
             sum_d_sq * sum_d_sq,
             4.0 * sum_d_sq * f,
             2.0 * sum_d_sq * e + 4.0 * f * f + four_R2 * dy * dy,
             4.0 * f * e + 2.0 * four_R2 * oy * dy,
-            e * e - four_R2 * (self.radius_tube * self.radius_tube - oy * oy)
-        ]
-
-        roots = np.roots(coeffs)
-        roots = np.real(roots[np.isreal(roots)])
-        roots = [r for r in roots if t_min < r < t_max]
+            e * e - four_R2 * (self.radius_tube * self.radius_tube - oy * oy),
+        )
+        roots = [t_start + r for r in roots if t_min < t_start + r < t_max]
 
         if not roots:
             return None
@@ -65,4 +95,58 @@ class Torus(Primitive):
             normal=normal,
             dist=t,
             front_face=ray.direction.dot(normal) < 0.0,
-        )
\ No newline at end of file
+        )
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=1e-3,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of intersect: bounding sphere reject, then one batched quartic solve for the remaining rays.
+        Normals point out of the torus like in intersect.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        n = origins.shape[0]
+        dist = np.full(n, np.inf)
+        normals = np.zeros((n, 3))
+
+        local = origins - vec3_to_array(self.center)
+        sum_d_sq = batch_dot(directions, directions)
+        f = batch_dot(local, directions)
+        bounding_radius = abs(self.radius_major) + abs(self.radius_tube)
+        discriminant = f * f - sum_d_sq * (batch_dot(local, local) - bounding_radius * bounding_radius)
+        root = np.sqrt(np.maximum(discriminant, 0.0))
+        t_enter, t_exit = (-f - root) / sum_d_sq, (-f + root) / sum_d_sq
+        candidates = np.flatnonzero((discriminant >= 0.0) & (t_exit >= t_min) & (t_enter <= t_max))
+        if candidates.size == 0:
+            return dist, normals
+
+        d = directions[candidates]
+        a = sum_d_sq[candidates]
+        t_start = np.maximum(t_enter[candidates], 0.0)
+        o = local[candidates] + d * t_start[:, None]
+
+        e = batch_dot(o, o) - self.radius_major * self.radius_major - self.radius_tube * self.radius_tube
+        f = batch_dot(o, d)
+        four_R2 = 4.0 * self.radius_major * self.radius_major
+        oy, dy = o[:, 1], d[:, 1]
+        coeffs = np.stack([
+            a * a,
+            4.0 * a * f,
+            2.0 * a * e + 4.0 * f * f + four_R2 * dy * dy,
+            4.0 * f * e + 2.0 * four_R2 * oy * dy,
+            e * e - four_R2 * (self.radius_tube * self.radius_tube - oy * oy),
+        ], axis=1)
+
+        t = solve_quartic_batch(coeffs) + t_start[:, None]
+        t = np.where((t > t_min) & (t < t_max), t, np.inf)
+        nearest = np.min(t, axis=1)
+        hit = np.isfinite(nearest)
+        rows = candidates[hit]
+        dist[rows] = nearest[hit]
+
+        # gradient of the implicit torus surface, same as normal_at
+        p = local[rows] + directions[rows] * dist[rows][:, None]
+        k = batch_dot(p, p) - self.radius_major * self.radius_major - self.radius_tube * self.radius_tube
+        gradient = 4.0 * p * k[:, None]
+        gradient[:, 1] += 8.0 * self.radius_major * self.radius_major * p[:, 1]
+        normals[rows] = batch_normalize(gradient)
+        return dist, normals
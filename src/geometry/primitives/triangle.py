@@ -1,6 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
+import numpy as np
 from src.math import Vertex, Vector
+from src.math.batch import readonly_vec3_array, batch_dot, batch_face_forward
 from src.geometry.primitive import Primitive
 from src.geometry.ray import Ray
 from src.geometry.geometry_hit import GeometryHit
@@ -18,8 +20,20 @@ class Triangle(Primitive):
     edge_2: Vector = None
 
     def __post_init__(self):
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Cache the edges and the unit face normal, also as v0_array / edge_1_array / edge_2_array / normal_array
+        for batch kernels.
+        """
         self.edge_1 = self.v1 - self.v0
         self.edge_2 = self.v2 - self.v0
+        self.unit_normal = self.edge_1.cross(self.edge_2).normalize_ip()
+        self.v0_array = readonly_vec3_array(self.v0)
+        self.edge_1_array = readonly_vec3_array(self.edge_1)
+        self.edge_2_array = readonly_vec3_array(self.edge_2)
+        self.normal_array = readonly_vec3_array(self.unit_normal)
 
     def intersect(self, ray: Ray, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
         """
@@ -29,6 +43,19 @@ class Triangle(Primitive):
         :param t_max: maximum valid distance for intersection
         :return: Hit record if intersection occurs, else None
         """
+        return self.intersect_from(ray, self.origin_terms(ray.origin), t_min, t_max)
+
+    def origin_terms(self, origin: Vertex) -> tuple[Vector, Vector, float]:
+        """
+        Möller–Trumbore terms that do not depend on the ray direction: the offset of the origin from v0,
+        its cross product with edge_1 and the numerator of t.
+        """
+        vertex_to_origin = origin - self.v0
+        q_vector = vertex_to_origin.cross(self.edge_1)
+        return vertex_to_origin, q_vector, self.edge_2.dot(q_vector)
+
+    def intersect_from(self, ray: Ray, origin_terms, t_min=0.001, t_max=float('inf')) -> GeometryHit | None:
+        vertex_to_origin, q_vector, t_numerator = origin_terms
 
         # Calculate determinant and check if ray is parallel to triangle
         plane_vector = ray.direction.cross(self.edge_2)
@@ -40,32 +67,25 @@ class Triangle(Primitive):
 
         inv_det = 1.0 / determinant
 
-        # Calculate distance from v0 to ray origin
-        vertex_to_origin = ray.origin - self.v0
-
         # Calculate u parameter and test bounds u stands u is the barycentric coordinate
         u = vertex_to_origin.dot(plane_vector) * inv_det
 
         if u < 0.0 or u > 1.0:
             return None
 
-        # Prepare to test v parameter
-        q_vector = vertex_to_origin.cross(self.edge_1)
-
         # Calculate v parameter and test bounds
         v = ray.direction.dot(q_vector) * inv_det
         if v < 0.0 or u + v > 1.0:
             return None
 
         # Calculate t to find intersection point along the ray
-        t = self.edge_2.dot(q_vector) * inv_det
+        t = t_numerator * inv_det
         if t < t_min or t > t_max:
             return None
 
         # Calculate intersection point in 3D space
         hit_point = ray.point_at(t)
-        # Calculate normal using cross product of edges
-        normal = self.edge_1.cross(self.edge_2).normalize_ip()
+        normal = self.unit_normal
         if ray.direction.dot(normal) > 0.0:
             normal = -normal
 
@@ -76,6 +96,44 @@ class Triangle(Primitive):
             front_face=ray.direction.dot(normal) < 0.0,
         )
 
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001,
+                        t_max=float('inf')) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized Möller–Trumbore for (N, 3) arrays of ray origins and directions.
+        :return: (dist, normals) with inf distance where the ray misses
+        """
+        edge_1, edge_2 = self.edge_1_array, self.edge_2_array
+
+        plane_vector = np.cross(directions, edge_2)
+        determinant = plane_vector @ edge_1
+        parallel = np.abs(determinant) < 1e-8
+        inv_det = 1.0 / np.where(parallel, 1.0, determinant)
+
+        vertex_to_origin = origins - self.v0_array
+        u = batch_dot(vertex_to_origin, plane_vector) * inv_det
+
+        q_vector = np.cross(vertex_to_origin, edge_1)
+        v = batch_dot(directions, q_vector) * inv_det
+        t = (q_vector @ edge_2) * inv_det
+
+        valid = (~parallel & (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0)
+                 & (t >= t_min) & (t <= t_max))
+        dist = np.where(valid, t, np.inf)
+
+        normals = batch_face_forward(np.broadcast_to(self.normal_array, origins.shape), directions)
+        normals[~valid] = 0.0
+        return dist, normals
+
+    def bake(self, transform) -> Triangle:
+        """
+        Any affine transform maps a triangle to a triangle, so the vertices are simply moved to world space.
+        """
+        return Triangle(transform.apply_point(self.v0), transform.apply_point(self.v1), transform.apply_point(self.v2))
+
+    def bounds(self) -> tuple[Vertex, Vertex]:
+        xs, ys, zs = zip(*((v.x, v.y, v.z) for v in (self.v0, self.v1, self.v2)))
+        return Vertex(min(xs), min(ys), min(zs)), Vertex(max(xs), max(ys), max(zs))
+
     def translate(self, offset: Vector) -> None:
         """
         Move triangle by offset vector.
@@ -83,7 +141,7 @@ class Triangle(Primitive):
         self.v0 += offset
         self.v1 += offset
         self.v2 += offset
-        self.__post_init__()
+        self.refresh()
 
     def normal_at(self, point: Vertex) -> Vector:
         """
@@ -91,5 +149,4 @@ class Triangle(Primitive):
         :param point: Point on the triangle
         :return: Normal vector at that point
         """
-        normal = self.edge_1.cross(self.edge_2).normalize_ip()
-        return normal
+        return self.unit_normal
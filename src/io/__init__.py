@@ -1,4 +1,4 @@
-from .image_helper import convert_ppm_to_png, write_ppm, ipynb_display_images, image_to_ppm, ipynb_display_multiple_images_in_row, image_pipeline
+from .image_helper import convert_ppm_to_png, write_ppm, write_png, ipynb_display_images, image_to_ppm, ipynb_display_multiple_images_in_row, image_pipeline
 from .object_libraries import ColorLibrary, LightLibrary, MaterialLibrary
 from .pickle_manager import PickleManager
 from .resolution import Resolution
@@ -6,7 +6,7 @@ from .video import frames_to_mp4
 
 __all__ = [
     "ColorLibrary", "MaterialLibrary", "LightLibrary",
-    "convert_ppm_to_png", "write_ppm", "ipynb_display_images", "convert_ppm_to_png","image_to_ppm",
+    "convert_ppm_to_png", "write_ppm", "write_png", "ipynb_display_images", "convert_ppm_to_png","image_to_ppm",
     "ipynb_display_multiple_images_in_row", "image_pipeline",
     "PickleManager",
     "Resolution",
@@ -1,4 +1,5 @@
 from pathlib import Path
+import numpy as np
 from PIL import Image as PILImage
 from IPython.display import Image
 from IPython.display import display, Image as IPImage
@@ -19,15 +20,28 @@ def write_ppm(filename, pixels, w, h):
     """
     Write a PPM image file.
     :param filename: Name of the file to write
-    :param pixels: List of (r, g, b) tuples
+    :param pixels: List of (r, g, b) tuples or a uint8 array of shape (h, w, 3) / (w * h, 3)
     :param w: Width of the image
     :param h: Height of the image
     :return: None
     """
+    arr = np.asarray(pixels, dtype=np.uint8).reshape(w * h, 3)
     with open(filename, "w", encoding="ascii") as f:
         f.write(f"P3\n{w} {h}\n255\n")
-        for (r, g, b) in pixels:
-            f.write(f"{r} {g} {b}\n")
+        np.savetxt(f, arr, fmt="%d")
+
+
+def write_png(filename, pixels, w, h):
+    """
+    Write a PNG image file directly from pixel data.
+    :param filename: Name of the file to write
+    :param pixels: List of (r, g, b) tuples or a uint8 array of shape (h, w, 3) / (w * h, 3)
+    :param w: Width of the image
+    :param h: Height of the image
+    :return: None
+    """
+    arr = np.asarray(pixels, dtype=np.uint8).reshape(h, w, 3)
+    PILImage.fromarray(arr, mode="RGB").save(filename, "PNG")
 
 def image_to_ppm(filename: str, image: tuple[list[tuple[float, float, float]], int, int]) -> Path:
     """
@@ -3,11 +3,15 @@ from .vector import Vector
 from .vertex import Vertex
 from .optics import reflect, refract
 from .helpers import clamp_float_01, interpolate, perlin_fade, lerp
+from .polynomial import solve_quartic
+from .sampling import halton_2d, shading_rng, row_shading_stream
 
 __all__ = [
     "Vec3",
     "Vector",
     "Vertex",
     "reflect", "refract",
-    "clamp_float_01", "interpolate", "perlin_fade", "lerp"
+    "clamp_float_01", "interpolate", "perlin_fade", "lerp",
+    "solve_quartic",
+    "halton_2d", "shading_rng", "row_shading_stream",
 ]
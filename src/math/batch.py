@@ -0,0 +1,56 @@
+from __future__ import annotations
+import numpy as np
+from .vec3 import Vec3
+
+# Helpers for ray batches stored as (N, 3) float64 arrays, one row per ray / point / normal.
+
+
+def vec3_to_array(v: Vec3) -> np.ndarray:
+    """
+    Convert a single Vec3 to a (3,) float64 array that broadcasts against (N, 3) batches.
+    :param v: vector or vertex
+    :return: array [x, y, z]
+    """
+    return np.array([v.x, v.y, v.z], dtype=np.float64)
+
+
+def readonly_vec3_array(v: Vec3) -> np.ndarray:
+    """
+    Same as vec3_to_array, but write-protected, for invariants that primitives cache for batch kernels.
+    :param v: vector or vertex
+    :return: read-only array [x, y, z]
+    """
+    array = vec3_to_array(v)
+    array.flags.writeable = False
+    return array
+
+
+def batch_dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Row-wise dot product of two (N, 3) arrays (either side may also be a single (3,) vector).
+    :return: (N,) array of dot products
+    """
+    return np.sum(a * b, axis=-1)
+
+
+def batch_normalize(v: np.ndarray) -> np.ndarray:
+    """
+    Safely normalize each row of an (N, 3) array. Zero-length rows stay zero, same as Vec3.normalize.
+    :param v: (N, 3) array
+    :return: (N, 3) array of unit vectors
+    """
+    norm = np.sqrt(batch_dot(v, v))
+    inv = np.divide(1.0, norm, out=np.zeros_like(norm), where=norm > 0.0)
+    return v * inv[:, None]
+
+
+def batch_face_forward(normals: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """
+    Flip normals so they face against the ray directions, mirroring the `if ray.direction.dot(normal) > 0.0: normal = -normal`
+    step every primitive does after an intersection.
+    :param normals: (N, 3) normals
+    :param directions: (N, 3) ray directions
+    :return: (N, 3) flipped normals
+    """
+    sign = np.where(batch_dot(directions, normals) > 0.0, -1.0, 1.0)
+    return normals * sign[:, None]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+from math import sqrt, cbrt, cos, acos, copysign
+import numpy as np
+
+# Closed-form real roots of low degree polynomials, used by primitives whose intersection is a polynomial in t.
+# Ferrari's method loses precision for nearly double roots, so every quartic root is polished with Newton steps
+# on the original polynomial.
+
+_NEWTON_STEPS = 2
+# below this the depressed quartic is treated as biquadratic (no linear term)
+_BIQUADRATIC_EPS = 1e-12
+
+
+def _quadratic_roots(b: float, c: float) -> tuple[float, ...]:
+    """
+    Real roots of the monic quadratic x^2 + b x + c, computed without cancellation.
+    """
+    discriminant = b * b - 4.0 * c
+    if discriminant < 0.0:
+        return ()
+    q = -0.5 * (b + copysign(sqrt(discriminant), b))
+    if q == 0.0:
+        return (0.0, 0.0)
+    return (q, c / q)
+
+
+def _largest_cubic_root(a2: float, a1: float, a0: float) -> float:
+    """
+    Largest real root of the monic cubic x^3 + a2 x^2 + a1 x + a0 (Cardano / trigonometric form).
+    """
+    shift = a2 / 3.0
+    p = a1 - a2 * shift
+    q = (2.0 * shift * shift - a1) * shift + a0
+    discriminant = 0.25 * q * q + p * p * p / 27.0
+
+    if discriminant > 0.0:
+        # one real root
+        root = sqrt(discriminant)
+        u = cbrt(-0.5 * q + root) + cbrt(-0.5 * q - root)
+    elif p < 0.0:
+        # three real roots, the k = 0 branch of the cosine form is the largest
+        rho = sqrt(-p / 3.0)
+        u = 2.0 * rho * cos(acos(max(-1.0, min(1.0, -0.5 * q / (rho * rho * rho)))) / 3.0)
+    else:
+        u = 0.0
+
+    x = u - shift
+    # one Newton step removes most of the cancellation error of the closed form
+    f = ((x + a2) * x + a1) * x + a0
+    df = (3.0 * x + 2.0 * a2) * x + a1
+    if df != 0.0:
+        x -= f / df
+    return x
+
+
+def solve_quartic(a: float, b: float, c: float, d: float, e: float) -> list[float]:
+    """
+    Real roots of a x^4 + b x^3 + c x^2 + d x + e = 0 with Ferrari's method, polished by Newton iteration.
+    Replaces np.roots for single rays: no companion matrix and no eigenvalue decomposition.
+    :param a: leading coefficient, must not be zero
+    :return: real roots in ascending order, double roots may appear twice
+    """
+    if a == 0.0:
+        raise ValueError("Leading coefficient of a quartic must not be zero.")
+
+    b, c, d, e = b / a, c / a, d / a, e / a
+
+    # depressed quartic y^4 + p y^2 + q y + r with x = y - b / 4
+    shift = 0.25 * b
+    b2 = b * b
+    p = c - 0.375 * b2
+    q = d - 0.5 * b * c + 0.125 * b2 * b
+    r = e - 0.25 * b * d + 0.0625 * b2 * c - 0.01171875 * b2 * b2
+
+    if abs(q) < _BIQUADRATIC_EPS:
+        ys = [y for z in _quadratic_roots(p, r) if z >= 0.0 for y in (sqrt(z), -sqrt(z))]
+    else:
+        # Ferrari: with m a root of the resolvent cubic the quartic splits into two quadratics
+        m = _largest_cubic_root(p, 0.25 * p * p - r, -0.125 * q * q)
+        if m <= 0.0:
+            ys = [y for z in _quadratic_roots(p, r) if z >= 0.0 for y in (sqrt(z), -sqrt(z))]
+        else:
+            s = sqrt(2.0 * m)
+            half = 0.5 * p + m
+            ys = list(_quadratic_roots(-s, half + 0.5 * q / s)) + list(_quadratic_roots(s, half - 0.5 * q / s))
+
+    roots = []
+    for y in ys:
+        x = y - shift
+        for _ in range(_NEWTON_STEPS):
+            f = (((x + b) * x + c) * x + d) * x + e
+            df = ((4.0 * x + 3.0 * b) * x + 2.0 * c) * x + d
+            if df == 0.0:
+                break
+            x -= f / df
+        roots.append(x)
+    return sorted(roots)
+
+
+def _batch_quadratic_roots(b: np.ndarray, c: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized _quadratic_roots, nan where the roots are complex.
+    """
+    discriminant = b * b - 4.0 * c
+    real = discriminant >= 0.0
+    q = -0.5 * (b + np.copysign(np.sqrt(np.where(real, discriminant, 0.0)), b))
+    safe_q = np.where(q == 0.0, 1.0, q)
+    x1 = np.where(real, q, np.nan)
+    x2 = np.where(real, np.where(q == 0.0, 0.0, c / safe_q), np.nan)
+    return x1, x2
+
+
+def _batch_largest_cubic_root(a2: np.ndarray, a1: np.ndarray, a0: np.ndarray) -> np.ndarray:
+    """
+    Vectorized _largest_cubic_root.
+    """
+    shift = a2 / 3.0
+    p = a1 - a2 * shift
+    q = (2.0 * shift * shift - a1) * shift + a0
+    discriminant = 0.25 * q * q + p * p * p / 27.0
+
+    root = np.sqrt(np.maximum(discriminant, 0.0))
+    one_real = np.cbrt(-0.5 * q + root) + np.cbrt(-0.5 * q - root)
+
+    rho = np.sqrt(np.maximum(-p / 3.0, 0.0))
+    safe_rho3 = np.where(rho > 0.0, rho * rho * rho, 1.0)
+    three_real = 2.0 * rho * np.cos(np.arccos(np.clip(-0.5 * q / safe_rho3, -1.0, 1.0)) / 3.0)
+
+    u = np.where(discriminant > 0.0, one_real, np.where(p < 0.0, three_real, 0.0))
+    x = u - shift
+    f = ((x + a2) * x + a1) * x + a0
+    df = (3.0 * x + 2.0 * a2) * x + a1
+    return x - np.divide(f, df, out=np.zeros_like(f), where=df != 0.0)
+
+
+def solve_quartic_batch(coeffs: np.ndarray) -> np.ndarray:
+    """
+    Vectorized solve_quartic for many quartics at once.
+    :param coeffs: (N, 5) coefficients a..e of a x^4 + b x^3 + c x^2 + d x + e, a must not be zero
+    :return: (N, 4) real roots, nan where a root is complex; not sorted
+    """
+    coeffs = np.asarray(coeffs, dtype=np.float64)
+    if np.any(coeffs[:, 0] == 0.0):
+        raise ValueError("Leading coefficient of a quartic must not be zero.")
+    b, c, d, e = (coeffs[:, k] / coeffs[:, 0] for k in range(1, 5))
+
+    shift = 0.25 * b
+    b2 = b * b
+    p = c - 0.375 * b2
+    q = d - 0.5 * b * c + 0.125 * b2 * b
+    r = e - 0.25 * b * d + 0.0625 * b2 * c - 0.01171875 * b2 * b2
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        m = _batch_largest_cubic_root(p, 0.25 * p * p - r, -0.125 * q * q)
+        biquadratic = (np.abs(q) < _BIQUADRATIC_EPS) | (m <= 0.0)
+
+        # biquadratic rows: y = +-sqrt(z) for the non-negative roots z of z^2 + p z + r
+        z1, z2 = _batch_quadratic_roots(p, r)
+        z1 = np.where(z1 >= 0.0, z1, np.nan)
+        z2 = np.where(z2 >= 0.0, z2, np.nan)
+        biquadratic_ys = (np.sqrt(z1), -np.sqrt(z1), np.sqrt(z2), -np.sqrt(z2))
+
+        # Ferrari rows
+        s = np.sqrt(np.where(biquadratic, 1.0, 2.0 * m))
+        half = 0.5 * p + m
+        ferrari_ys = _batch_quadratic_roots(-s, half + 0.5 * q / s) + _batch_quadratic_roots(s, half - 0.5 * q / s)
+
+        x = np.stack([np.where(biquadratic, by, fy) for by, fy in zip(biquadratic_ys, ferrari_ys)], axis=1) - shift[:, None]
+
+        b, c, d, e = b[:, None], c[:, None], d[:, None], e[:, None]
+        for _ in range(_NEWTON_STEPS):
+            f = (((x + b) * x + c) * x + d) * x + e
+            df = ((4.0 * x + 3.0 * b) * x + 2.0 * c) * x + d
+            x = x - np.divide(f, df, out=np.zeros_like(f), where=df != 0.0)
+    return x
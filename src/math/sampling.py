@@ -0,0 +1,83 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator
+import numpy as np
+
+# Low-discrepancy sample patterns for light sampling. Every prefix of a Halton sequence is well spread over the
+# unit square, so an adaptive sampler that stops after the first few samples still covered the whole domain.
+
+
+def radical_inverse(index: int, base: int) -> float:
+    """
+    Mirror the digits of index in the given base around the radix point (van der Corput sequence).
+    :param index: sample index, 0 maps to 0
+    :param base: prime base
+    :return: value in [0, 1)
+    """
+    inverse, scale = 0.0, 1.0 / base
+    while index > 0:
+        index, digit = divmod(index, base)
+        inverse += digit * scale
+        scale /= base
+    return inverse
+
+
+@lru_cache(maxsize=None)
+def _halton_2d(count: int) -> np.ndarray:
+    points = np.array([(radical_inverse(i + 1, 2), radical_inverse(i + 1, 3)) for i in range(count)]).reshape(count, 2)
+    points.flags.writeable = False
+    return points
+
+
+def halton_2d(count: int, shifts: np.ndarray | None = None) -> np.ndarray:
+    """
+    First count points of the 2D Halton sequence (bases 2 and 3), optionally with Cranley-Patterson rotations:
+    every set of points is shifted by a random offset modulo 1, which keeps the spread and decorrelates neighbours.
+    :param count: number of points
+    :param shifts: (2,) offset for one set, (N, 2) offsets for N sets, or None
+    :return: (count, 2) points in [0, 1)^2, or (N, count, 2) for N shifts
+    """
+    if count < 0:
+        raise ValueError("Sample count must not be negative.")
+    points = _halton_2d(count)
+    if shifts is None:
+        return points.copy()
+    shifts = np.asarray(shifts, dtype=np.float64)
+    if shifts.ndim == 2:
+        return (points[None, :, :] + shifts[:, None, :]) % 1.0
+    return (points + shifts) % 1.0
+
+
+# Random stream of stochastic shading (light picks, soft shadow and environment samples), see shading_rng
+_shading_rng: ContextVar[np.random.Generator | None] = ContextVar("shading_rng", default=None)
+_unseeded_rng = np.random.default_rng()
+
+
+def shading_rng() -> np.random.Generator:
+    """
+    Generator shaders draw their random numbers from.
+    Inside row_shading_stream it is the stream of the row being rendered, otherwise an unseeded generator.
+    """
+    rng = _shading_rng.get()
+    return rng if rng is not None else _unseeded_rng
+
+
+@contextmanager
+def row_shading_stream(seed: int | None, j: int) -> Iterator[np.random.Generator]:
+    """
+    Make shading_rng return the shading stream of image row j while the block runs.
+    With a seed the stream is seeded by (seed, j, 1), separate from the (seed, j) pixel jitter of the row,
+    so shading is reproducible regardless of the order rows are rendered in, the number of processes
+    or whether the camera rays came from a G-buffer. Without a seed the row gets fresh entropy.
+    :param seed: render seed (RenderConfig.seed) or None
+    :param j: row index
+    :return: the row's generator
+    """
+    rng = np.random.default_rng((seed, j, 1)) if seed is not None else np.random.default_rng()
+    token = _shading_rng.set(rng)
+    try:
+        yield rng
+    finally:
+        _shading_rng.reset(token)
@@ -1,4 +1,6 @@
 from .integrator import RecursiveIntegrator
+from .integrator import IterativeIntegrator
+from .integrator import WavefrontIntegrator
 from .integrator import Integrator
 
 from .loops import LinearRenderLoop
@@ -6,21 +8,31 @@ from .loops import MultiProcessRowRenderLoop
 from .loops import ProgressDisplay, PreviewConfig
 from .loops import RenderLoop, ImgFormat
 
-from .post_process import PostProcessConfig
+from .post_process import PostProcessConfig, ToneMapping
 from .post_process import post_process_pipeline
 
 from .render_config import RenderConfig
+from .gbuffer import GBuffer, GBufferRow
+from .aov import AOV, AOVBuffers
+from .render_cache import RenderCache
+from .shared_assets import SharedAssetStore
 from .integrator import fresnel_schlick
 
 __all__ = [
     'RecursiveIntegrator',
+    'IterativeIntegrator',
+    'WavefrontIntegrator',
     'Integrator',
     'LinearRenderLoop',
     'MultiProcessRowRenderLoop',
     'ProgressDisplay', 'PreviewConfig',
     'RenderLoop', 'ImgFormat',
-    "PostProcessConfig",
+    "PostProcessConfig", "ToneMapping",
     "post_process_pipeline",
     "RenderConfig",
+    "GBuffer", "GBufferRow",
+    "AOV", "AOVBuffers",
+    "RenderCache",
+    "SharedAssetStore",
     "fresnel_schlick",
 ]
\ No newline at end of file
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+import numpy as np
+from src.io.image_helper import write_ppm, write_png
+
+
+class AOV(Enum):
+    """
+    Arbitrary output variables a render can capture next to the beauty image.
+     - DEPTH: distance from the camera to the first hit, inf for background
+     - NORMAL: world-space unit normal of the first hit facing the camera
+     - ALBEDO: base color of the material sample at the first hit
+     - OBJECT_ID: index of the first hit object in scene.objects, -1 for background
+     - MATERIAL_ID: index of the first hit material in the scene's list of distinct materials, -1 for background
+     - HIT_COUNT: number of surface hits of all rays spawned by the pixel (primary and secondary)
+    """
+    DEPTH = "depth"
+    NORMAL = "normal"
+    ALBEDO = "albedo"
+    OBJECT_ID = "object_id"
+    MATERIAL_ID = "material_id"
+    HIT_COUNT = "hit_count"
+
+    @property
+    def channels(self) -> int:
+        return 3 if self in (AOV.NORMAL, AOV.ALBEDO) else 1
+
+
+def reduce_aov_samples(aov: AOV, values: np.ndarray, width: int, spp: int) -> np.ndarray:
+    """
+    Combine the spp consecutive per-ray values of one image row into per-pixel values.
+    Ids keep the first sample of each pixel, since averaging ids would invent objects; everything else is averaged.
+    :param aov: which output the values belong to
+    :param values: (width * spp,) or (width * spp, 3) per-ray values
+    :return: (width,) or (width, 3) per-pixel values
+    """
+    values = values.reshape((width, spp) + values.shape[1:])
+    if aov in (AOV.OBJECT_ID, AOV.MATERIAL_ID):
+        return values[:, 0]
+    if aov == AOV.DEPTH:
+        # a pixel half covering an object gets the mean depth of the samples that hit something
+        finite = np.isfinite(values)
+        count = finite.sum(axis=1)
+        total = np.where(finite, values, 0.0).sum(axis=1)
+        return np.divide(total, count, out=np.full(width, np.inf), where=count > 0)
+    return values.mean(axis=1)
+
+
+@dataclass
+class AOVBuffers:
+    """
+    Full-frame float buffers for the requested AOVs, filled row by row during a render.
+    buffers[aov] has shape (height, width) or (height, width, 3).
+    """
+    width: int
+    height: int
+    aovs: tuple[AOV, ...]
+    buffers: dict[AOV, np.ndarray] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for aov in self.aovs:
+            shape = (self.height, self.width) if aov.channels == 1 else (self.height, self.width, 3)
+            fill = -1.0 if aov in (AOV.OBJECT_ID, AOV.MATERIAL_ID) else 0.0
+            self.buffers[aov] = np.full(shape, fill)
+
+    def set_row(self, j: int, row: dict[AOV, np.ndarray]) -> None:
+        """
+        Store per-pixel values of image row j as returned by sample_row.
+        """
+        for aov, values in row.items():
+            self.buffers[aov][j] = values
+
+    def __getitem__(self, aov: AOV) -> np.ndarray:
+        return self.buffers[aov]
+
+    def write(self, aov: AOV, filename: str) -> Path:
+        """
+        Write one buffer to disk. The format follows the file extension:
+         - .npy: raw float values, for compositing and denoising
+         - .ppm / .png: 8-bit visualization, see aov_to_u8
+        :param aov: which buffer to write
+        :param filename: output path
+        :return: path of the written file
+        """
+        path = Path(filename)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        ext = path.suffix.lower()
+
+        if ext == ".npy":
+            np.save(path, self.buffers[aov])
+            return path
+
+        if ext not in (".ppm", ".png"):
+            raise ValueError("Unsupported AOV file extension. Please use .npy, .ppm or .png.")
+
+        rgb = aov_to_u8(aov, self.buffers[aov])
+        writer = write_png if ext == ".png" else write_ppm
+        writer(path.as_posix(), rgb, self.width, self.height)
+        return path
+
+    def write_all(self, filename: str, aovs: tuple[AOV, ...] | None = None) -> list[Path]:
+        """
+        Write buffers next to the beauty image, e.g. render.png -> render_depth.png, render_normal.png, ...
+        :param filename: path of the beauty image, its extension selects the format
+        :param aovs: which buffers to write, all of them if None
+        :return: paths of the written files
+        """
+        base = Path(filename)
+        aovs = self.aovs if aovs is None else aovs
+        return [self.write(aov, base.with_name(f"{base.stem}_{aov.value}{base.suffix}").as_posix()) for aov in aovs]
+
+
+def aov_to_u8(aov: AOV, values: np.ndarray, max_depth: float = 10.0) -> np.ndarray:
+    """
+    Map an AOV buffer to a displayable (H, W, 3) uint8 image.
+     - depth: white at the camera fading to black at max_depth, background black (same look as DepthShader)
+     - normal: (n + 1) / 2 (same look as NormalShader)
+     - albedo: clamped to [0, 1]
+     - ids: a fixed pseudo-random color per id, background black
+     - hit count: scaled by the largest count in the frame
+    """
+    if aov == AOV.DEPTH:
+        intensity = 1.0 - np.minimum(values, max_depth) / max_depth
+        rgb = np.repeat(intensity[..., None], 3, axis=-1)
+    elif aov == AOV.NORMAL:
+        rgb = (values + 1.0) * 0.5
+    elif aov == AOV.ALBEDO:
+        rgb = values
+    elif aov in (AOV.OBJECT_ID, AOV.MATERIAL_ID):
+        ids = values.astype(np.int64)
+        # golden-ratio hue steps keep neighbouring ids visually distinct
+        hue = (ids * 0.618033988749895) % 1.0
+        rgb = 0.5 + 0.5 * np.cos(2.0 * np.pi * (hue[..., None] + np.array([0.0, 1.0 / 3.0, 2.0 / 3.0])))
+        rgb = np.where((ids >= 0)[..., None], rgb, 0.0)
+    else:
+        top = values.max() if values.size else 0.0
+        intensity = values / top if top > 0 else values
+        rgb = np.repeat(intensity[..., None], 3, axis=-1)
+
+    return (np.clip(rgb, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import numpy as np
+from src.material.material.material_sample import MaterialSample
+from src.scene.camera.camera import Camera
+
+
+@dataclass
+class GBufferRow:
+    """
+    Primary hit data for one batch of camera rays, usually all samples of one image row.
+    Arrays have one entry per camera ray. Misses have object_id -1 and inf distance.
+     - origins, directions: (N, 3) camera rays, kept so a re-shade uses exactly the same samples
+     - dist: (N,) distance to the first hit
+     - object_ids: (N,) index of the hit object in scene.objects
+     - points, normals: (N, 3) world-space hit point and unit normal facing the camera
+     - samples: material sample of every hit (None for misses), so procedural materials are not re-evaluated
+    """
+    origins: np.ndarray
+    directions: np.ndarray
+    dist: np.ndarray
+    object_ids: np.ndarray
+    points: np.ndarray
+    normals: np.ndarray
+    samples: list[MaterialSample | None]
+
+
+@dataclass
+class GBuffer:
+    """
+    Per-pixel primary hit data of a whole frame, filled row by row during the first render.
+    Later renders with another shader re-shade from the stored rows instead of tracing camera rays again.
+    The buffer is only valid for the camera and sampling it was built with, see matches().
+    """
+    width: int
+    height: int
+    spp: int
+    camera: Camera
+    rows: list[GBufferRow | None] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.rows:
+            self.rows = [None] * self.height
+
+    def matches(self, camera: Camera, width: int, height: int, spp: int) -> bool:
+        """
+        Check whether the buffer can be reused for a render with the given camera and sampling.
+        :return: True if nothing affecting primary rays changed
+        """
+        return (self.width, self.height, self.spp) == (width, height, spp) and self.camera == camera
+
+    def is_complete(self) -> bool:
+        """
+        :return: True if every row has been filled
+        """
+        return all(row is not None for row in self.rows)
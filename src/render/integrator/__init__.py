@@ -1,9 +1,13 @@
 from .recursive_integrator import RecursiveIntegrator
+from .iterative_integrator import IterativeIntegrator
+from .wavefront_integrator import WavefrontIntegrator
 from .integrator import Integrator
 from .fresnel import fresnel_schlick
 
 __all__ = [
     'RecursiveIntegrator',
+    'IterativeIntegrator',
+    'WavefrontIntegrator',
     'Integrator',
     'fresnel_schlick',
 ]
@@ -1,6 +1,8 @@
 from abc import abstractmethod, ABC
+import numpy as np
 from src.material.color import Color
 from src.geometry.ray import Ray
+from src.math import Vertex, Vector
 
 
 class Integrator(ABC):
@@ -15,4 +17,20 @@ class Integrator(ABC):
         :param depth: The current recursion depth, which can be used to limit how many times the ray can bounce. If None, it should use a default maximum depth defined in the integrator.
         :return: The color resulting from casting the ray, which may include contributions from direct illumination, reflections, refractions, and other effects depending on the integrator's implementation.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def cast_rays(self, origins: np.ndarray, directions: np.ndarray, depth: int | None = None) -> np.ndarray:
+        """
+        Cast a batch of rays and return their colors. Render loops call this with all samples of a row at once.
+        The default implementation calls cast_ray for every ray, batch integrators override it to trace whole arrays.
+        :param origins: (N, 3) array of ray origins.
+        :param directions: (N, 3) array of ray directions.
+        :param depth: Maximum bounce depth, same meaning as in cast_ray.
+        :return: (N, 3) array of linear RGB colors.
+        """
+        colors = np.empty((origins.shape[0], 3))
+        for k in range(origins.shape[0]):
+            o, d = origins[k], directions[k]
+            ray = Ray(Vertex(o[0], o[1], o[2]), Vector(d[0], d[1], d[2]))
+            colors[k] = self.cast_ray(ray=ray, depth=depth).as_rgb()
+        return colors
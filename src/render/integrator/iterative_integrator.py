@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from src.render.integrator.integrator import Integrator
+from src.scene.scene import Scene
+from src.geometry.ray import Ray
+from src.material.color import Color
+from src.scene.light import Light
+from src.math.optics import reflect, refract
+from src.shading.blinn_phong_shader import BlinnPhongShader
+from src.render.integrator.fresnel import fresnel_schlick
+from src.shading.local_shading import LocalShading, apply_noise_normal_perturbation
+
+
+@dataclass
+class IterativeIntegrator(Integrator):
+    """
+    Whitted-style integrator producing the same image as RecursiveIntegrator, but without Python recursion.
+    Pending rays are kept on an explicit work stack together with the weight their color contributes to the final pixel.
+    Each popped ray adds weight * local_color to the result and pushes its reflected / refracted children with scaled weights,
+    which unrolls the recursive blend local * (1 - k) + child * k into a flat loop.
+    """
+    max_depth: int
+    scene: Scene
+    lights: list[Light]
+    shader: LocalShading | None = None
+    _bias_min: float = 1e-3
+
+    def __post_init__(self):
+        if self.shader is None:
+            self.shader = BlinnPhongShader()
+
+    def cast_ray(self, ray: Ray, depth: int | None = None) -> Color:
+        """
+        Cast a ray into the scene and compute the color seen along that ray, accounting for local shading, reflections, and refractions up to a maximum depth.
+        :param ray: The ray to cast into the scene.
+        :param depth: Remaining bounce budget for this ray. If None, it will use the max_depth defined in the integrator.
+        :return: Color seen along the ray.
+        """
+        if depth is None:
+            depth = self.max_depth
+
+        scene = self.scene
+        shader = self.shader
+        lights = self.lights
+        bias = self._bias_min
+
+        result = Color.custom_rgb(0, 0, 0)
+
+        # work stack of (ray, remaining depth, weight of this ray's color in the final result)
+        stack: list[tuple[Ray, int, float]] = [(ray, depth, 1.0)]
+
+        while stack:
+            ray, depth, weight = stack.pop()
+            direction = ray.direction
+
+            hit = scene.intersect(ray)
+            if hit is None:
+                result += scene.background().color_from_dir(direction) * weight
+                continue
+
+            local_color = shader.shade_multiple_lights(hit=hit, lights=lights, view_dir=-direction, scene=scene)
+
+            if depth <= 0:
+                result += local_color * weight
+                continue
+
+            material = hit.material
+            reflectivity = material.get_reflectance()
+            transparency = material.get_transparency()
+
+            if reflectivity <= 0.0 and transparency <= 0.0:
+                result += local_color * weight
+                continue
+
+            # geometric normal is used for ray offsetting, shading normal may be perturbed by a normal-noise map
+            n_geom = hit.geom.normal.normalize()
+            if hasattr(material, "normal_noise"):
+                n_shade = apply_noise_normal_perturbation(hit, material.normal_noise, n_geom)
+            else:
+                n_shade = n_geom
+
+            # both normals flipped to face against the incoming ray
+            front_face = n_shade.dot(direction) < 0.0
+            n_facing = n_shade if front_face else -n_shade
+            n_geom_facing = n_geom if n_geom.dot(direction) <= 0.0 else -n_geom
+
+            reflected_ray = Ray(hit.geom.point + n_geom_facing * bias, reflect(direction, n_facing).normalize())
+
+            if transparency > 0.0:
+                result += local_color * (weight * (1.0 - transparency))
+
+                ior_m = material.get_ior()
+                ior_out, ior_in = (1.0, ior_m) if front_face else (ior_m, 1.0)
+
+                refracted_dir = refract(direction, n_facing, ior_out=ior_out, ior_in=ior_in)
+                if refracted_dir is None:
+                    # total internal reflection, all transmitted energy goes to the reflected ray
+                    stack.append((reflected_ray, depth - 1, weight * transparency))
+                    continue
+
+                kr = fresnel_schlick(direction, n_facing, ior_out=ior_out, ior_in=ior_in)
+                refracted_ray = Ray(hit.geom.point - n_geom_facing * bias, refracted_dir.normalize())
+
+                stack.append((refracted_ray, depth - 1, weight * transparency * (1.0 - kr)))
+                stack.append((reflected_ray, depth - 1, weight * transparency * kr))
+                continue
+
+            result += local_color * (weight * (1.0 - reflectivity))
+            stack.append((reflected_ray, depth - 1, weight * reflectivity))
+
+        return result
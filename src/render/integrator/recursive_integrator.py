@@ -37,7 +37,7 @@ class RecursiveIntegrator(Integrator):
 
         hit = self.scene.intersect(ray)
         if hit is None:
-            return Color.background_color(ray.direction, skybox=self.scene.skybox)
+            return self.scene.background().color_from_dir(ray.direction)
 
         local_color = self.shader.shade_multiple_lights(
             hit=hit, lights=self.lights, view_dir=-ray.direction, scene=self.scene
@@ -0,0 +1,283 @@
+from dataclasses import dataclass
+import numpy as np
+from src.render.integrator.integrator import Integrator
+from src.scene.scene import Scene
+from src.geometry.ray import Ray
+from src.material.color import Color
+from src.scene.light import Light
+from src.math.batch import batch_dot, batch_normalize
+from src.render.gbuffer import GBufferRow
+from src.render.aov import AOV
+from src.shading.blinn_phong_shader import BlinnPhongShader
+from src.shading.local_shading import LocalShading, apply_noise_normal_perturbation
+
+
+@dataclass
+class WavefrontIntegrator(Integrator):
+    """
+    Whitted-style integrator that traces rays in waves instead of one at a time.
+    All rays of one depth are intersected with Scene.intersect_batch and shaded with LocalShading.shade_batch.
+    The reflection and refraction rays they spawn are collected into arrays and form the next wave.
+    Every ray carries the index of the pixel sample it belongs to and a weight, so its color is scattered back to that sample.
+    Produces the same image as RecursiveIntegrator.
+    """
+    max_depth: int
+    scene: Scene
+    lights: list[Light]
+    shader: LocalShading | None = None
+    _bias_min: float = 1e-3
+
+    def __post_init__(self):
+        if self.shader is None:
+            self.shader = BlinnPhongShader()
+
+    def cast_ray(self, ray: Ray, depth: int | None = None) -> Color:
+        """
+        Cast a single ray by running it as a batch of one.
+        """
+        origins = np.array([[ray.origin.x, ray.origin.y, ray.origin.z]])
+        directions = np.array([[ray.direction.x, ray.direction.y, ray.direction.z]])
+        c = self.cast_rays(origins, directions, depth)[0]
+        return Color(float(c[0]), float(c[1]), float(c[2]))
+
+    def trace_primary(self, origins: np.ndarray, directions: np.ndarray) -> GBufferRow:
+        """
+        Intersect a batch of camera rays and store everything shading needs, without shading it.
+        The returned row can be passed to cast_rays any number of times, e.g. once per shader.
+        :param origins: (N, 3) array of ray origins.
+        :param directions: (N, 3) array of ray directions.
+        :return: GBufferRow with first hits and their material samples
+        """
+        directions = batch_normalize(directions)
+        dist, object_ids, points, normals = self.scene.intersect_batch(origins, directions)
+
+        samples = [None] * origins.shape[0]
+        for k in np.flatnonzero(object_ids >= 0):
+            hit = self.scene.surface_interaction(object_ids[k], dist[k], points[k], normals[k], directions[k])
+            samples[k] = hit.material_sample()
+
+        return GBufferRow(
+            origins=origins,
+            directions=directions,
+            dist=dist,
+            object_ids=object_ids,
+            points=points,
+            normals=normals,
+            samples=samples,
+        )
+
+    def cast_rays(self, origins: np.ndarray, directions: np.ndarray, depth: int | None = None,
+                  primary: GBufferRow | None = None, aov_out: dict[AOV, np.ndarray] | None = None) -> np.ndarray:
+        """
+        Trace a batch of rays wave by wave and return their colors.
+        :param origins: (N, 3) array of ray origins.
+        :param directions: (N, 3) array of ray directions.
+        :param depth: Maximum number of bounces. If None, max_depth of the integrator is used.
+        :param primary: Optional result of trace_primary for these rays. The first wave then reuses its hits and material samples instead of intersecting again.
+        :param aov_out: Optional dict whose keys select AOVs to capture during the same traversal. Each key is set to an (N,) or (N, 3) array of per-ray values.
+        :return: (N, 3) array of linear RGB colors.
+        """
+        if depth is None:
+            depth = self.max_depth
+
+        scene = self.scene
+        result = np.zeros((origins.shape[0], 3))
+
+        # current wave: rays, the sample each one contributes to and the weight of its contribution
+        directions = batch_normalize(directions) if primary is None else primary.directions
+        sample_ids = np.arange(origins.shape[0])
+        weights = np.ones(origins.shape[0])
+
+        if aov_out is not None:
+            self._init_aovs(aov_out, origins.shape[0])
+
+        for remaining in range(depth, -1, -1):
+            if sample_ids.size == 0:
+                break
+
+            if primary is not None and remaining == depth:
+                dist, object_ids, points, normals = primary.dist, primary.object_ids, primary.points, primary.normals
+            else:
+                dist, object_ids, points, normals = scene.intersect_batch(origins, directions)
+
+            # rays that escaped the scene take the background color
+            miss = object_ids < 0
+            if miss.any():
+                background = scene.background().colors_from_dirs(directions[miss])
+                np.add.at(result, sample_ids[miss], background * weights[miss, None])
+
+            hit_rows = np.flatnonzero(~miss)
+            if aov_out is not None and AOV.HIT_COUNT in aov_out:
+                np.add.at(aov_out[AOV.HIT_COUNT], sample_ids[hit_rows], 1.0)
+            if hit_rows.size == 0:
+                break
+
+            origins, directions, dist = origins[hit_rows], directions[hit_rows], dist[hit_rows]
+            points, normals, object_ids = points[hit_rows], normals[hit_rows], object_ids[hit_rows]
+            sample_ids, weights = sample_ids[hit_rows], weights[hit_rows]
+
+            hits = [
+                scene.surface_interaction(object_ids[k], dist[k], points[k], normals[k], directions[k])
+                for k in range(hit_rows.size)
+            ]
+            if primary is not None and remaining == depth:
+                for k, hit in enumerate(hits):
+                    hit.sample = primary.samples[hit_rows[k]]
+            if aov_out is not None and remaining == depth:
+                # first wave: rows of hit_rows are still the original ray indices
+                self._store_primary_aovs(aov_out, hit_rows, hits, dist, object_ids, normals)
+            local_color = self.shader.shade_batch(hits, self.lights, -directions, scene=scene)
+
+            if remaining <= 0:
+                np.add.at(result, sample_ids, local_color * weights[:, None])
+                break
+
+            origins, directions, sample_ids, weights = self._spawn_secondary_rays(
+                hits, directions, points, normals, local_color, sample_ids, weights, result
+            )
+
+        return result
+
+    @staticmethod
+    def _init_aovs(aov_out: dict[AOV, np.ndarray], n: int) -> None:
+        """
+        Allocate per-ray arrays for the requested AOVs with their background values.
+        """
+        for aov in list(aov_out):
+            if aov.channels == 3:
+                aov_out[aov] = np.zeros((n, 3))
+            elif aov == AOV.DEPTH:
+                aov_out[aov] = np.full(n, np.inf)
+            elif aov == AOV.HIT_COUNT:
+                aov_out[aov] = np.zeros(n)
+            else:
+                aov_out[aov] = np.full(n, -1.0)
+
+    def _store_primary_aovs(self, aov_out: dict[AOV, np.ndarray], rows: np.ndarray, hits, dist: np.ndarray,
+                            object_ids: np.ndarray, normals: np.ndarray) -> None:
+        """
+        Fill the first-hit AOVs of the given ray rows.
+        """
+        if AOV.DEPTH in aov_out:
+            aov_out[AOV.DEPTH][rows] = dist
+        if AOV.NORMAL in aov_out:
+            aov_out[AOV.NORMAL][rows] = normals
+        if AOV.OBJECT_ID in aov_out:
+            aov_out[AOV.OBJECT_ID][rows] = object_ids
+        if AOV.MATERIAL_ID in aov_out:
+            aov_out[AOV.MATERIAL_ID][rows] = self.scene.material_ids()[object_ids]
+        if AOV.ALBEDO in aov_out:
+            for k, hit in enumerate(hits):
+                sample = hit.material_sample()
+                color = sample.get_color() if hasattr(sample, "get_color") else hit.material.get_color()
+                aov_out[AOV.ALBEDO][rows[k]] = color.data[:3]
+
+    def _spawn_secondary_rays(self, hits, directions: np.ndarray, points: np.ndarray, normals: np.ndarray,
+                              local_color: np.ndarray, sample_ids: np.ndarray, weights: np.ndarray,
+                              result: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Add the local part of every hit to its sample and build the next wave of reflection and refraction rays.
+        The blend matches RecursiveIntegrator:
+            transparent: local * (1 - t) + reflected * t * kr + refracted * t * (1 - kr)
+            reflective:  local * (1 - r) + reflected * r
+        :return: (origins, directions, sample_ids, weights) of the next wave
+        """
+        n = len(hits)
+        reflectivity = np.empty(n)
+        transparency = np.empty(n)
+        ior = np.ones(n)
+        shading_normals = normals.copy()
+
+        for k, hit in enumerate(hits):
+            material = hit.material
+            reflectivity[k] = material.get_reflectance()
+            transparency[k] = material.get_transparency()
+            if transparency[k] > 0.0:
+                ior[k] = material.get_ior()
+            # shading normal may be perturbed by a normal-noise map, only worth the Python call when the ray continues
+            if (reflectivity[k] > 0.0 or transparency[k] > 0.0) and getattr(material, "normal_noise", None) is not None:
+                n_shade = apply_noise_normal_perturbation(hit, material.normal_noise, hit.geom.normal.normalize())
+                shading_normals[k] = (n_shade.x, n_shade.y, n_shade.z)
+
+        transparent = transparency > 0.0
+        reflective = ~transparent & (reflectivity > 0.0)
+        terminal = ~transparent & ~reflective
+
+        # local contribution of every hit
+        local_weight = np.where(transparent, 1.0 - transparency, np.where(reflective, 1.0 - reflectivity, 1.0))
+        np.add.at(result, sample_ids, local_color * (weights * local_weight)[:, None])
+
+        # normals facing against the incoming ray
+        front_face = batch_dot(shading_normals, directions) < 0.0
+        n_facing = np.where(front_face[:, None], shading_normals, -shading_normals)
+        n_geom_facing = np.where((batch_dot(normals, directions) <= 0.0)[:, None], normals, -normals)
+
+        # reflection rays, biased along the geometric normal to avoid self-intersection
+        reflected_dirs = batch_normalize(directions - n_facing * (2.0 * batch_dot(directions, n_facing))[:, None])
+        reflected_origins = points + n_geom_facing * self._bias_min
+
+        # refraction with air assumed on the outside
+        ior_out = np.where(front_face, 1.0, ior)
+        ior_in = np.where(front_face, ior, 1.0)
+        refracted_dirs, total_internal = self._refract(directions, n_facing, ior_out, ior_in)
+        kr = self._fresnel(directions, n_facing, ior_out, ior_in)
+        refracted_origins = points - n_geom_facing * self._bias_min
+
+        reflected_weight = np.where(
+            transparent,
+            weights * transparency * np.where(total_internal, 1.0, kr),
+            weights * reflectivity,
+        )
+        spawn_reflected = ~terminal
+        spawn_refracted = transparent & ~total_internal
+
+        origins = np.concatenate([reflected_origins[spawn_reflected], refracted_origins[spawn_refracted]])
+        directions = np.concatenate([reflected_dirs[spawn_reflected], refracted_dirs[spawn_refracted]])
+        sample_ids = np.concatenate([sample_ids[spawn_reflected], sample_ids[spawn_refracted]])
+        weights = np.concatenate([
+            reflected_weight[spawn_reflected],
+            (weights * transparency * (1.0 - kr))[spawn_refracted],
+        ])
+        return origins, directions, sample_ids, weights
+
+    @staticmethod
+    def _refract(v: np.ndarray, n: np.ndarray, ior_out: np.ndarray, ior_in: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized math.optics.refract.
+        :return: ((N, 3) refracted directions, (N,) bool mask of total internal reflection)
+        """
+        v = batch_normalize(v)
+        n = batch_normalize(n)
+
+        eta = ior_out / ior_in
+        cos_i = -batch_dot(n, v)
+
+        inside = cos_i < 0.0
+        n = np.where(inside[:, None], -n, n)
+        cos_i = np.where(inside, -cos_i, cos_i)
+        eta = np.where(inside, 1.0 / eta, eta)
+
+        sin2_t = eta * eta * np.maximum(0.0, 1.0 - cos_i * cos_i)
+        total_internal = sin2_t >= 1.0
+
+        cos_t = np.sqrt(np.maximum(0.0, 1.0 - sin2_t))
+        t = v * eta[:, None] + n * (eta * cos_i - cos_t)[:, None]
+        return batch_normalize(t), total_internal
+
+    @staticmethod
+    def _fresnel(d: np.ndarray, n: np.ndarray, ior_out: np.ndarray, ior_in: np.ndarray) -> np.ndarray:
+        """
+        Vectorized fresnel_schlick.
+        :return: (N,) reflectance
+        """
+        d = batch_normalize(d)
+        n = batch_normalize(n)
+
+        cos_theta = -batch_dot(n, d)
+        inside = cos_theta < 0.0
+        cos_theta = np.where(inside, -cos_theta, cos_theta)
+        ior_out, ior_in = np.where(inside, ior_in, ior_out), np.where(inside, ior_out, ior_in)
+
+        cos_theta = np.clip(cos_theta, 0.0, 1.0)
+        r0 = ((ior_out - ior_in) / (ior_out + ior_in)) ** 2
+        return r0 + (1.0 - r0) * (1.0 - cos_theta) ** 5
@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import Tuple, List
+from typing import Tuple
 from random import random
+import numpy as np
 from src.material.color import Color, to_u8
+from src.render.post_process.stages import quantize_u8
 from .render_loop import RenderLoop
 from dataclasses import dataclass
 
@@ -29,16 +31,16 @@ class LinearRenderLoop(RenderLoop):
         col = acc / self.spp
         return to_u8(col.r), to_u8(col.g), to_u8(col.b)
 
-    def render_all_pixels(self) -> Tuple[List[Tuple[int, int, int]], int, int]:
-        pixels: List[Tuple[int, int, int]] = []
-        total = self.width * self.height
+    def render_all_pixels(self) -> Tuple[np.ndarray, int, int]:
+        self.compile_scene()
+        width = self.width
+        total = width * self.height
+        pixels = np.zeros((total, 3), dtype=np.uint8)
 
         self.ui.start(total)
 
         for row in range(self.height):
-            for i in range(self.width):
-                rgb = self.render_pixel(i, row)
-                pixels.append(rgb)
+            pixels[row * width:(row + 1) * width] = quantize_u8(self.render_row(row))
 
             self.on_row_end_update_preview(row, pixels)
             self.ui.update_pixel(self.width)
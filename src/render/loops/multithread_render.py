@@ -1,47 +1,48 @@
 from __future__ import annotations
 import multiprocessing as mp
 from random import random
-from typing import List, Tuple
+from typing import Tuple
+import numpy as np
 
 from src.material.color import Color, to_u8
+from src.render.post_process.stages import quantize_u8
+from src.render.shared_assets import SharedAssetStore
 from .linear_render_loop import RenderLoop
+from .render_loop import sample_row, sample_gbuffer_row
 
 # shared globals for worker processes
 _STATE = {}
 
 
-def _init_worker(integrator, spp, max_depth, width, height):
-    _STATE["integrator"] = integrator
-    _STATE["spp"]        = spp
-    _STATE["max_depth"]  = max_depth
-    _STATE["width"]      = width
-    _STATE["height"]     = height
+def _init_worker(integrator, spp, max_depth, width, height, use_gbuffer=False, aovs=(), seed=None):
+    _STATE["integrator"]  = integrator
+    _STATE["spp"]         = spp
+    _STATE["max_depth"]   = max_depth
+    _STATE["width"]       = width
+    _STATE["height"]      = height
+    _STATE["use_gbuffer"] = use_gbuffer
+    _STATE["aovs"]        = aovs
+    _STATE["seed"]        = seed
 
 
-def _render_row_worker(j: int):
+def _render_row_worker(task):
+    # task is (row index, stored GBufferRow or None)
+    j, primary = task
     integrator = _STATE["integrator"]
     spp        = _STATE["spp"]
     max_depth  = _STATE["max_depth"]
     width      = _STATE["width"]
     height     = _STATE["height"]
+    seed       = _STATE["seed"]
 
-    row: List[Tuple[int, int, int]] = [None] * width
+    camera = integrator.scene.camera
+    aov_out = dict.fromkeys(_STATE["aovs"]) if _STATE["aovs"] else None
+    if _STATE["use_gbuffer"]:
+        colors, primary = sample_gbuffer_row(integrator, camera, j, width, height, spp, max_depth, primary=primary, aov_out=aov_out, seed=seed)
+    else:
+        colors = sample_row(integrator, camera, j, width, height, spp, max_depth, aov_out=aov_out, seed=seed)
 
-    for i in range(width):
-        u = (i + 0.5) / width * 2 - 1
-        v = 1 - (j + 0.5) / height * 2
-
-        acc = Color.custom_rgb(0, 0, 0)
-        for _ in range(spp):
-            du = (random() - 0.5) * 2 / width
-            dv = (random() - 0.5) * 2 / height
-            ray = integrator.scene.camera.make_ray(u + du, v + dv)
-            acc += integrator.cast_ray(ray=ray, depth=max_depth)
-
-        col = acc / spp
-        row[i] = (to_u8(col.r), to_u8(col.g), to_u8(col.b))
-
-    return j, row
+    return j, colors, primary, aov_out
 
 
 class MultiProcessRowRenderLoop(RenderLoop):
@@ -64,7 +65,9 @@ class MultiProcessRowRenderLoop(RenderLoop):
         col = acc / self.spp
         return (to_u8(col.r), to_u8(col.g), to_u8(col.b))
 
-    def render_all_pixels(self) -> Tuple[List[Tuple[int, int, int]], int, int]:
+    def render_all_pixels(self) -> Tuple[np.ndarray, int, int]:
+        # workers get the compiled snapshot with the integrator
+        compiled_scene = self.compile_scene()
         width, height = self.width, self.height
 
         # 'spawn' avoids fork-with-threads issues on macOS / in Jupyter
@@ -74,20 +77,33 @@ class MultiProcessRowRenderLoop(RenderLoop):
         print(f"Using {n_cores} CPU cores for rendering.")
         print("------------------------------------------------------------")
 
-        pixels_u8: List[Tuple[int, int, int]] = [None] * (width * height)  # type: ignore
+        pixels_u8 = np.zeros((width * height, 3), dtype=np.uint8)
 
         chunksize = max(1, height // (n_cores * 4))
 
-        with ctx.Pool(
-            processes=n_cores,
-            initializer=_init_worker,
-            initargs=(self.integrator, self.spp, self.max_depth, width, height),
-        ) as pool:
-            for j, row in pool.imap_unordered(_render_row_worker, range(height), chunksize=chunksize):
-                base = j * width
-                pixels_u8[base : base + width] = row
-
-                if j % 10 == 0 or j == height - 1:
-                    self.on_row_end_update_preview(j, pixels_u8)
+        # stored primary hits travel to the worker with their row and new ones come back with the result
+        gbuffer = self.prepare_gbuffer() if self.use_gbuffer else None
+        tasks = [(j, gbuffer.rows[j] if gbuffer is not None else None) for j in range(height)]
+
+        # large skybox and texture arrays go to the workers as shared memory instead of one copy each
+        with SharedAssetStore() as assets:
+            assets.share_scene(compiled_scene)
+            with ctx.Pool(
+                processes=n_cores,
+                initializer=_init_worker,
+                initargs=(self.integrator, self.spp, self.max_depth, width, height, self.use_gbuffer, self.aovs, self.seed),
+            ) as pool:
+                for j, colors, primary, aov_row in pool.imap_unordered(_render_row_worker, tasks, chunksize=chunksize):
+                    base = j * width
+                    self.framebuffer[j] = colors
+                    self.framebuffer_rows[j] = True
+                    pixels_u8[base : base + width] = quantize_u8(colors)
+                    if gbuffer is not None:
+                        gbuffer.rows[j] = primary
+                    if aov_row is not None:
+                        self.aov_buffers.set_row(j, aov_row)
+
+                    if j % 10 == 0 or j == height - 1:
+                        self.on_row_end_update_preview(j, pixels_u8)
 
         return pixels_u8, width, height
\ No newline at end of file
@@ -118,10 +118,10 @@ class ProgressUI:
             self.progress_bar.update(n)
 
     # Updates the image preview at the end of a row.
-    def update_row(self, pixels_u8: List[Tuple[int, int, int]], row: int) -> None:
+    def update_row(self, pixels_u8: np.ndarray | List[Tuple[int, int, int]], row: int) -> None:
         """
         At the end of a row, update the image preview with the current pixels.
-        :param pixels_u8: List of rendered pixels as (R,G,B) uint8 tuples.
+        :param pixels_u8: Rendered pixels as (R,G,B) uint8 rows, either the first row * width of them or the whole image buffer.
         :param row: Current row index (number of rows rendered so far).
         :return: None
         """
@@ -130,12 +130,13 @@ class ProgressUI:
             return
 
         width, height = self.width, self.height
+        rendered = np.asarray(pixels_u8[:row * width], dtype=np.uint8).reshape(row, width, 3)
 
         if self.preview.fill_missing_rows:
-            flat = pixels_u8 + [(0, 0, 0)] * ((height - row) * width)
-            arr = np.asarray(flat, dtype=np.uint8).reshape(height, width, 3)
+            arr = np.zeros((height, width, 3), dtype=np.uint8)
+            arr[:row] = rendered
         else:
-            arr = np.asarray(pixels_u8, dtype=np.uint8).reshape(row, width, 3)
+            arr = rendered
 
         img = Image.fromarray(arr)
 
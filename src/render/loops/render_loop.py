@@ -4,20 +4,84 @@ from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 from typing import Tuple, List, Optional
+import numpy as np
 from src.scene.camera.camera import Camera
 from src.scene.light import Light
 from src.shading.local_shading import LocalShading
 from .progress import ProgressUI, PreviewConfig, ProgressDisplay
 from src.scene.scene import Scene
+from src.scene.compiled_scene import CompiledScene
 from src.render.render_config import RenderConfig
-from src.io.image_helper import write_ppm, convert_ppm_to_png
-from src.render.post_process.post_process_pipeline import post_process_pipeline
+from src.io.image_helper import write_ppm, write_png
+from src.render.post_process.post_process_pipeline import post_process_pipeline, DENOISE_AOVS
 from src.render.post_process.post_process_config import PostProcessConfig
 from src.io.resolution import Resolution
-from src.render.integrator import RecursiveIntegrator
+from src.render.integrator import RecursiveIntegrator, WavefrontIntegrator
+from src.render.gbuffer import GBuffer, GBufferRow
+from src.render.aov import AOV, AOVBuffers, reduce_aov_samples
+from src.render.render_cache import RenderCache
+from src.math.sampling import row_shading_stream
 from ..integrator.integrator import Integrator
 
 
+def row_rays(camera: Camera, j: int, width: int, height: int, spp: int, seed: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generate all jittered camera rays of image row j, spp consecutive rays per pixel.
+    Sampling is the same as in render_pixel.
+    :param seed: Optional sampler seed. Each row draws from its own stream seeded by (seed, j),
+                 so the jitter does not depend on the order rows are rendered in or on the number of processes.
+    :return: (origins, directions) as (width * spp, 3) arrays
+    """
+    random = np.random.default_rng((seed, j)).random if seed is not None else np.random.random
+    i = np.repeat(np.arange(width), spp)
+    u = (i + 0.5) / width * 2 - 1 + (random(i.size) - 0.5) * 2 / width
+    v = 1 - (j + 0.5) / height * 2 + (random(i.size) - 0.5) * 2 / height
+    return camera.make_rays(u, v)
+
+
+def sample_row(integrator: Integrator, camera: Camera, j: int, width: int, height: int, spp: int, max_depth: int,
+               aov_out: dict[AOV, np.ndarray] | None = None, seed: int | None = None) -> np.ndarray:
+    """
+    Trace all jittered samples of image row j as one batch through integrator.cast_rays.
+    Sampling is the same as in render_pixel: spp jittered rays per pixel averaged together.
+    :param aov_out: Optional dict whose keys select AOVs to capture (WavefrontIntegrator only). Filled with per-pixel values of the row.
+    :param seed: Optional sampler seed, see row_rays. Shading draws from the row's stream, see row_shading_stream.
+    :return: (width, 3) array of averaged linear RGB colors for the row
+    """
+    origins, directions = row_rays(camera, j, width, height, spp, seed)
+    with row_shading_stream(seed, j):
+        if aov_out is None:
+            colors = integrator.cast_rays(origins, directions, depth=max_depth)
+        else:
+            colors = integrator.cast_rays(origins, directions, depth=max_depth, aov_out=aov_out)
+    if aov_out is not None:
+        _reduce_row_aovs(aov_out, width, spp)
+    return colors.reshape(width, spp, 3).mean(axis=1)
+
+
+def sample_gbuffer_row(integrator: WavefrontIntegrator, camera: Camera, j: int, width: int, height: int, spp: int,
+                       max_depth: int, primary: GBufferRow | None = None,
+                       aov_out: dict[AOV, np.ndarray] | None = None,
+                       seed: int | None = None) -> tuple[np.ndarray, GBufferRow]:
+    """
+    Same as sample_row, but shades from stored primary hits. If primary is None, the camera rays are traced first.
+    :return: ((width, 3) array of averaged linear RGB colors, GBufferRow used for the row)
+    """
+    if primary is None:
+        origins, directions = row_rays(camera, j, width, height, spp, seed)
+        primary = integrator.trace_primary(origins, directions)
+    with row_shading_stream(seed, j):
+        colors = integrator.cast_rays(primary.origins, primary.directions, depth=max_depth, primary=primary, aov_out=aov_out)
+    if aov_out is not None:
+        _reduce_row_aovs(aov_out, width, spp)
+    return colors.reshape(width, spp, 3).mean(axis=1), primary
+
+
+def _reduce_row_aovs(aov_out: dict[AOV, np.ndarray], width: int, spp: int) -> None:
+    for aov, values in aov_out.items():
+        aov_out[aov] = reduce_aov_samples(aov, values, width, spp)
+
+
 class ImgFormat(Enum):
     PPM = "ppm"
     PNG = "png"
@@ -36,6 +100,13 @@ class RenderLoop(ABC):
     - preview_config: Optional configuration for image preview during rendering.
     - render_config: Optional configuration for rendering parameters.
     - post_process_config: Optional configuration for post-processing steps.
+    - render_cache: Optional on-disk cache. render() then reuses the framebuffer of an identical earlier render.
+
+    With render_config.g_buffer enabled, primary hits of the first render are kept in a GBuffer
+    and later renders (e.g. after change_shader) only re-shade them.
+    With render_config.aovs set, the requested AOVs are captured in the same pass into aov_buffers
+    and render() saves them next to the image.
+    Both require a WavefrontIntegrator, which is also the default integrator in that case.
     """
 
     scene: Scene = None
@@ -45,6 +116,7 @@ class RenderLoop(ABC):
     preview_config: Optional[PreviewConfig] = None
     render_config: Optional[RenderConfig] = None
     post_process_config: Optional[PostProcessConfig] = None
+    render_cache: Optional[RenderCache] = None
 
     def __post_init__(self):
         # Camera setup
@@ -63,6 +135,7 @@ class RenderLoop(ABC):
         self.max_depth: int = self.render_config.max_depth if self.render_config is not None else 3
         self.width: int = self.render_config.resolution.width if self.render_config is not None else Resolution.R360p.width
         self.height: int = self.render_config.resolution.height if self.render_config is not None else Resolution.R360p.height
+        self.seed: Optional[int] = self.render_config.seed if self.render_config is not None else None
 
         # Set post-processing configuration
         self.post_process_config: PostProcessConfig = self.post_process_config if self.post_process_config is not None else PostProcessConfig()
@@ -82,18 +155,52 @@ class RenderLoop(ABC):
         if self.lights is None:
             raise ValueError("Lights must be provided.")
 
-        self.integrator = self.integrator if self.integrator is not None else RecursiveIntegrator(
-            max_depth=self.max_depth,
-            scene=self.scene,
-            lights=self.lights,
-            shader=self.shader,
-        )
+        # linear RGB result of the last render, filled row by row and turned into the 8-bit image by post_process_pipeline
+        self.framebuffer: np.ndarray = np.zeros((self.height, self.width, 3))
+        # rows of the framebuffer written by the current render, loops that fill it set their rows (see render_row)
+        self.framebuffer_rows: np.ndarray = np.zeros(self.height, dtype=bool)
+
+        self.use_gbuffer: bool = self.render_config.g_buffer if self.render_config is not None else False
+        self.gbuffer: Optional[GBuffer] = None
+        # AOVs saved next to the image, plus guide buffers the denoiser needs
+        self.output_aovs: tuple[AOV, ...] = tuple(self.render_config.aovs) if self.render_config is not None else ()
+        self.aovs: tuple[AOV, ...] = self.output_aovs
+        if self.post_process_config.enabled and self.post_process_config.denoise:
+            self.aovs += tuple(aov for aov in DENOISE_AOVS if aov not in self.aovs)
+        self.aov_buffers: Optional[AOVBuffers] = AOVBuffers(self.width, self.height, self.aovs) if self.aovs else None
+
+        if self.integrator is None:
+            integrator_type = WavefrontIntegrator if self.use_gbuffer or self.aovs else RecursiveIntegrator
+            self.integrator = integrator_type(
+                max_depth=self.max_depth,
+                scene=self.scene,
+                lights=self.lights,
+                shader=self.shader,
+            )
+        self._check_integrator(self.integrator)
+        # render-ready snapshot of the scene, rebuilt (incrementally) at the start of every render
+        self.compiled_scene: Optional[CompiledScene] = None
 
-    def on_row_end_update_preview(self, current_row: int, pixels_u8: List[Tuple[int, int, int]]) -> None:
+    def compile_scene(self) -> CompiledScene:
+        """
+        Compile the scene and let the integrator render from the snapshot.
+        Cheap when nothing changed since the last render, see Scene.compile.
+        Stored G-buffer hits are dropped when objects were moved, added, removed or got another material.
+        :return: CompiledScene the integrator now uses
+        """
+        bake_transforms = self.render_config.bake_transforms if self.render_config is not None else True
+        compiled_scene = self.scene.compile(bake_transforms=bake_transforms)
+        if not compiled_scene.same_geometry(self.compiled_scene):
+            self.invalidate_gbuffer()
+        self.compiled_scene = compiled_scene
+        self.integrator.scene = self.compiled_scene
+        return self.compiled_scene
+
+    def on_row_end_update_preview(self, current_row: int, pixels_u8: np.ndarray) -> None:
         """
         Called at the end of each row to update preview if needed.
         :param current_row: Current row index.
-        :param pixels_u8: Current list of rendered pixels as (R,G,B) uint8 tuples.
+        :param pixels_u8: (width * height, 3) uint8 buffer of the preview image, rows not rendered yet are black.
         :return:
         """
         config = self.ui.preview
@@ -103,7 +210,7 @@ class RenderLoop(ABC):
             if ((current_row + 1) % config.refresh_interval_rows == 0) or (current_row + 1 == self.height):
                 self.ui.update_row(pixels_u8, current_row + 1)
 
-    def on_number_of_pixels_rendered_update_preview(self, num_pixels_rendered: int, pixels_u8: List[Tuple[int, int, int]]) -> None:
+    def on_number_of_pixels_rendered_update_preview(self, num_pixels_rendered: int, pixels_u8: np.ndarray) -> None:
         config = self.ui.preview
 
         if self.ui.img_widget is None or config.refresh_interval_rows <= 0:
@@ -118,14 +225,57 @@ class RenderLoop(ABC):
         ):
             self.ui.update_image(pixels_u8, rendered_pixels=num_pixels_rendered)
 
+    def render_row(self, j: int) -> np.ndarray:
+        """
+        Render all pixels of row j in one batch and store them in the framebuffer.
+        :param j: Row index.
+        :return: (width, 3) array of linear RGB colors.
+        """
+        aov_out = dict.fromkeys(self.aovs) if self.aovs else None
+
+        if not self.use_gbuffer:
+            colors = sample_row(self.integrator, self.camera, j, self.width, self.height, self.spp, self.max_depth,
+                                aov_out=aov_out, seed=self.seed)
+        else:
+            gbuffer = self.prepare_gbuffer()
+            colors, gbuffer.rows[j] = sample_gbuffer_row(
+                self.integrator, self.camera, j, self.width, self.height, self.spp, self.max_depth,
+                primary=gbuffer.rows[j], aov_out=aov_out, seed=self.seed,
+            )
+
+        if aov_out is not None:
+            self.aov_buffers.set_row(j, aov_out)
+        self.framebuffer[j] = colors
+        self.framebuffer_rows[j] = True
+        return colors
+
+    def prepare_gbuffer(self) -> GBuffer:
+        """
+        Return the G-buffer for the current frame, starting a new empty one if the camera, resolution or sampling changed.
+        :return: GBuffer matching the current camera and settings
+        """
+        if self.gbuffer is None or not self.gbuffer.matches(self.camera, self.width, self.height, self.spp):
+            self.gbuffer = GBuffer(width=self.width, height=self.height, spp=self.spp, camera=self.camera.copy())
+        return self.gbuffer
+
+    def invalidate_gbuffer(self) -> None:
+        """
+        Drop stored primary hits. Changes compile_scene sees and camera changes are detected automatically,
+        call this after editing a primitive in place without Scene.mark_dirty.
+        """
+        self.gbuffer = None
+
     @abstractmethod
     def render_pixel(self, i: int, j: int) -> Tuple[int, int, int]:
         """Return (R,G,B) uint8 for pixel (i,j)."""
         ...
 
     @abstractmethod
-    def render_all_pixels(self) -> Tuple[List[Tuple[int, int, int]], int, int]:
-        """Main render loop. Returns pixel list, width, height."""
+    def render_all_pixels(self) -> Tuple[np.ndarray, int, int]:
+        """
+        Main render loop. Fills the framebuffer, marking the rows in framebuffer_rows (render_row does both),
+        and returns (width * height, 3) uint8 pixels, width, height.
+        """
         ...
 
     def render(self, filename: str, img_format_list: Optional[ImgFormat] = None) -> list[Path]:
@@ -144,17 +294,31 @@ class RenderLoop(ABC):
             else:
                 raise ValueError("Unsupported file extension. Please use .ppm or .png or specify img_format_list.")
 
-        # render all pixels and get raw pixel data as (R,G,B) -> save as ppm first, then convert to png if needed
-        pixels, width, height = self.render_all_pixels()
+        self.compile_scene()
+
+        # render into the float framebuffer (or take it from the cache), then run the post-process chain down to the 8-bit image
+        display_referred = False
+        if not self.load_cached_render():
+            self.framebuffer_rows[:] = False
+            pixels, width, height = self.render_all_pixels()
+
+            if self.framebuffer_rows.all():
+                self.store_cached_render()
+            else:
+                # loops that only produce 8-bit pixels (e.g. custom render_pixel loops) start the chain from those;
+                # they are already display values, so they are neither cached as linear radiance nor tone mapped again
+                self.framebuffer = np.asarray(pixels, dtype=np.float64).reshape(height, width, 3) / 255.0
+                display_referred = True
         saved_paths: [Path] = []
 
-        if self.post_process_config.enabled:
-            pixels, width, height = post_process_pipeline(
-                pixels=pixels,
-                width=width,
-                height=height,
-                config=self.post_process_config
-            )
+        pixels = post_process_pipeline(
+            config=self.post_process_config,
+            image=self.framebuffer,
+            aovs=self.aov_buffers,
+            display_referred=display_referred,
+            seed=self.seed if self.seed is not None else 0,
+        )
+        height, width = pixels.shape[:2]
 
         for img_format in img_format_list:
             if img_format == ImgFormat.PPM:
@@ -164,16 +328,54 @@ class RenderLoop(ABC):
             else:
                 raise ValueError(f"Unsupported image format: {img_format}")
 
+            if self.output_aovs:
+                aov_filename = Path(filename).with_suffix(f".{img_format.value}").as_posix()
+                saved_paths.extend(self.aov_buffers.write_all(aov_filename, aovs=self.output_aovs))
+
         if saved_paths is None:
             raise RuntimeError("No image was saved. Please check the image format.")
         return saved_paths
 
+    def cache_key(self) -> str:
+        """
+        Key of the current render in render_cache, see RenderCache.key.
+        """
+        return self.render_cache.key(self.integrator, self.render_config, self.aovs)
+
+    def load_cached_render(self) -> bool:
+        """
+        Fill the framebuffer and AOV buffers from render_cache if an identical render is stored.
+        :return: True on a cache hit, False on a miss or without a cache
+        """
+        if self.render_cache is None:
+            return False
+        cached = self.render_cache.load(self.cache_key())
+        if cached is None:
+            return False
+
+        framebuffer, aov_arrays = cached
+        if framebuffer.shape != self.framebuffer.shape or any(aov.value not in aov_arrays for aov in self.aovs):
+            return False
+        self.framebuffer = framebuffer
+        for aov in self.aovs:
+            self.aov_buffers.buffers[aov] = aov_arrays[aov.value]
+        return True
+
+    def store_cached_render(self) -> None:
+        """
+        Store the framebuffer and AOV buffers of the last render in render_cache, if there is one.
+        """
+        if self.render_cache is None:
+            return
+        aov_arrays = {aov.value: self.aov_buffers[aov] for aov in self.aovs} if self.aov_buffers is not None else None
+        self.render_cache.store(self.cache_key(), self.framebuffer, aov_arrays)
+
     @staticmethod
-    def save_as_ppm(filename: str, pixels: List[Tuple[int, int, int]], width: int, height: int) -> Path:
+    def save_as_ppm(filename: str, pixels: np.ndarray | List[Tuple[int, int, int]], width: int, height: int) -> Path:
         """
         Saves the rendered pixels to a PPM file.
         :param filename: Name of the output file.
-        :param pixels: List of rendered pixels as (R,G,B) uint8 tuples.
+        :param pixels: uint8 image array or list of rendered pixels as (R,G,B) uint8 tuples.
         :param width: Width of the image.
         :param height: Height of the image.
         :return: Path to the saved PPM file.
@@ -182,29 +384,25 @@ class RenderLoop(ABC):
         write_ppm(filename, pixels, width, height)
         return Path(filename)
 
-    def save_as_png(self, filename: str, pixels: List[Tuple[int, int, int]], width: int, height: int) -> Path:
+    @staticmethod
+    def save_as_png(filename: str, pixels: np.ndarray | List[Tuple[int, int, int]], width: int, height: int) -> Path:
         """
         Saves the rendered pixels to a PNG file.
         :param filename: Name of the output file.
-        :param pixels: List of rendered pixels as (R,G,B) uint8 tuples.
+        :param pixels: uint8 image array or list of rendered pixels as (R,G,B) uint8 tuples.
         :param width: Width of the image.
         :param height: Height of the image.
         :return: Path to the saved PNG file.
         """
-        ppm_temp_path = Path(filename).with_suffix(".ppm")
-        self.save_as_ppm(ppm_temp_path.as_posix(), pixels, width, height)
-
         png_path = Path(filename)
-        convert_ppm_to_png(ppm_temp_path.as_posix(), png_path.as_posix())
-
-        # remove temporary ppm file
-        ppm_temp_path.unlink(missing_ok=True)
-
+        png_path.parent.mkdir(parents=True, exist_ok=True)
+        write_png(png_path.as_posix(), pixels, width, height)
         return png_path
 
     def change_shader(self, new_shader: LocalShading) -> None:
         """
         Change the shader used in the integrator.
+        Stored G-buffer hits stay valid, so with render_config.g_buffer the next render only re-shades them.
         :param new_shader: New LocalShading instance to use.
         """
         self.shader = new_shader
@@ -216,4 +414,21 @@ class RenderLoop(ABC):
         Change the integrator used for rendering.
         :param new_integrator: New Integrator instance to use.
         """
-        self.integrator = new_integrator
\ No newline at end of file
+        self._check_integrator(new_integrator)
+        self.integrator = new_integrator
+        self.invalidate_gbuffer()
+
+    def _check_integrator(self, integrator: Integrator) -> None:
+        if isinstance(integrator, WavefrontIntegrator):
+            return
+        # name the setting that needs the wavefront integrator, the denoiser adds its guide AOVs implicitly
+        causes = []
+        if self.use_gbuffer:
+            causes.append("render_config.g_buffer")
+        if self.output_aovs:
+            causes.append("render_config.aovs")
+        if len(self.aovs) > len(self.output_aovs):
+            causes.append("post_process_config.denoise (the denoiser's guide AOVs)")
+        if causes:
+            verb = "requires" if len(causes) == 1 else "require"
+            raise TypeError(f"{', '.join(causes)} {verb} a WavefrontIntegrator, got {type(integrator).__name__}.")
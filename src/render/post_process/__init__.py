@@ -1,7 +1,10 @@
-from .post_process_config import PostProcessConfig
+from .post_process_config import PostProcessConfig, ToneMapping
 from .post_process_pipeline import post_process_pipeline
+from .denoise import atrous_denoise
 
 __all__ = [
     "PostProcessConfig",
+    "ToneMapping",
     "post_process_pipeline",
+    "atrous_denoise",
 ]
\ No newline at end of file
@@ -0,0 +1,94 @@
+from __future__ import annotations
+import numpy as np
+
+# B3-spline weights of the 5x5 a-trous kernel, applied separably per axis
+_KERNEL = np.array([1.0 / 16.0, 1.0 / 4.0, 3.0 / 8.0, 1.0 / 4.0, 1.0 / 16.0])
+
+
+def atrous_denoise(
+        color: np.ndarray,
+        normal: np.ndarray,
+        depth: np.ndarray,
+        albedo: np.ndarray | None = None,
+        iterations: int = 4,
+        sigma_color: float = 1.0,
+        sigma_normal: float = 64.0,
+        sigma_depth: float = 0.1,
+) -> np.ndarray:
+    """
+    Edge-avoiding a-trous wavelet filter (Dammertz et al. 2010) guided by G-buffer data.
+    Each iteration applies a 5x5 B3-spline kernel whose taps are spread 2^i pixels apart,
+    so a few iterations cover a large footprint at 25 taps per pixel each.
+    Every tap is weighted down when it lies across an edge in color, normal or depth.
+    Color is divided by albedo before filtering and multiplied back afterwards,
+    so texture detail is kept and only the noisy lighting is smoothed.
+    :param color: (H, W, 3) noisy image
+    :param normal: (H, W, 3) world-space normals of the first hit
+    :param depth: (H, W) distance to the first hit, inf for background
+    :param albedo: optional (H, W, 3) base color of the first hit
+    :param iterations: number of a-trous passes
+    :param sigma_color: color difference at which a tap loses most of its weight, halved every pass
+    :param sigma_normal: exponent of the normal weight max(0, n.n_q)^sigma_normal
+    :param sigma_depth: relative depth difference |z - z_q| / z per pixel of tap distance tolerated
+    :return: (H, W, 3) filtered image
+    """
+    if iterations < 0:
+        raise ValueError("Number of denoise iterations must be non-negative.")
+
+    height, width = depth.shape
+    background = ~np.isfinite(depth)
+    # background depth is replaced so differences stay finite, the background mask decides those weights
+    z = np.where(background, 0.0, depth)
+
+    if albedo is not None:
+        # channels with (almost) no albedo are left as they are instead of blowing up the noise
+        divisor = np.where(albedo > 0.05, albedo, 1.0)
+        signal = color / divisor
+    else:
+        signal = color.astype(np.float64)
+
+    for i in range(iterations):
+        step = 2 ** i
+        pad = 2 * step
+        sigma_c = sigma_color * 2.0 ** -i
+
+        s_pad = np.pad(signal, ((pad, pad), (pad, pad), (0, 0)), mode="edge")
+        n_pad = np.pad(normal, ((pad, pad), (pad, pad), (0, 0)), mode="edge")
+        z_pad = np.pad(z, pad, mode="edge")
+        b_pad = np.pad(background, pad, mode="edge")
+
+        total = np.zeros_like(signal)
+        weight_sum = np.zeros((height, width))
+
+        for ky in range(5):
+            dy = (ky - 2) * step
+            for kx in range(5):
+                dx = (kx - 2) * step
+                rows = slice(pad + dy, pad + dy + height)
+                cols = slice(pad + dx, pad + dx + width)
+
+                s_q = s_pad[rows, cols]
+                n_q = n_pad[rows, cols]
+                z_q = z_pad[rows, cols]
+                b_q = b_pad[rows, cols]
+
+                diff = signal - s_q
+                w_color = np.exp(-np.sum(diff * diff, axis=-1) / (sigma_c * sigma_c))
+                w_normal = np.maximum(0.0, np.sum(normal * n_q, axis=-1)) ** sigma_normal
+                tap_dist = max(abs(dx), abs(dy))
+                w_depth = np.exp(-np.abs(z - z_q) / (sigma_depth * np.maximum(z, 1e-6) * max(tap_dist, 1)))
+
+                # surface taps use all guides, background only blends with background
+                w_geom = np.where(background, b_q.astype(np.float64), np.where(b_q, 0.0, w_normal * w_depth))
+                w = _KERNEL[ky] * _KERNEL[kx] * w_color * w_geom
+
+                total += s_q * w[..., None]
+                weight_sum += w
+
+        # pixels without any usable tap (e.g. a zero normal from averaged samples) keep their value
+        filtered = weight_sum > 0.0
+        signal = np.where(filtered[..., None], total / np.where(filtered, weight_sum, 1.0)[..., None], signal)
+
+    if albedo is not None:
+        signal = signal * divisor
+    return signal
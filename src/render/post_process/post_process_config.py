@@ -1,7 +1,48 @@
 from dataclasses import dataclass
+from enum import Enum
+
+
+class ToneMapping(Enum):
+    """
+    Tone mapping operators turning linear radiance into displayable [0, 1] values.
+    """
+    CLAMP = "clamp"
+    REINHARD = "reinhard"
+    ACES = "aces"
 
 
 @dataclass
 class PostProcessConfig:
+    """
+    Configuration of the post-processing chain from the float framebuffer to the 8-bit image.
+    With enabled=False the framebuffer is only clamped and quantized, which matches the plain render output.
+    Attributes:
+        enabled (bool): Run the post-processing stages below.
+        scale_factor (int): Integer upscale factor, 1 keeps the rendered size.
+        denoise (bool): Run the edge-aware a-trous denoiser. The render loop then captures the normal, depth and albedo AOVs it is guided by, which requires a WavefrontIntegrator.
+        denoise_iterations (int): Number of a-trous passes, the filter footprint doubles with each one.
+        denoise_sigma_color (float): Color difference tolerated between neighbouring pixels.
+        denoise_sigma_normal (float): Sharpness of the normal edge-stopping weight.
+        denoise_sigma_depth (float): Relative depth difference tolerated between neighbouring pixels.
+        exposure (float): Exposure adjustment in stops applied to linear radiance.
+        tone_mapping (ToneMapping): Operator compressing radiance into [0, 1].
+        srgb (bool): Encode the output with the sRGB transfer curve. Off keeps linear values, as the renderer always wrote them.
+        dither (bool): Add triangular dither noise before quantization to avoid banding.
+    """
     enabled: bool = False
     scale_factor: int = 1
+    denoise: bool = False
+    denoise_iterations: int = 4
+    denoise_sigma_color: float = 1.0
+    denoise_sigma_normal: float = 64.0
+    denoise_sigma_depth: float = 0.1
+    exposure: float = 0.0
+    tone_mapping: ToneMapping = ToneMapping.CLAMP
+    srgb: bool = False
+    dither: bool = False
+
+    def __post_init__(self):
+        if self.scale_factor <= 0:
+            raise ValueError("Scale factor must be a positive integer.")
+        if self.denoise_iterations < 0:
+            raise ValueError("Number of denoise iterations must be non-negative.")
@@ -1,59 +1,62 @@
-from typing import List, Tuple
-from PIL import Image
+from typing import Optional
 import numpy as np
 from src.render.post_process.post_process_config import PostProcessConfig
+from src.render.post_process.denoise import atrous_denoise
+from src.render.post_process.stages import apply_exposure, tone_map, encode_srgb, upscale, quantize_u8
+from src.render.aov import AOV, AOVBuffers
 
+# AOVs the denoiser is guided by
+DENOISE_AOVS = (AOV.NORMAL, AOV.DEPTH, AOV.ALBEDO)
 
-def post_process_pipeline(config: PostProcessConfig, pixels: List[Tuple[int, int, int]], width: int, height: int) -> \
-Tuple[
-    List[Tuple[int, int, int]], int, int]:
+
+def post_process_pipeline(config: PostProcessConfig, image: np.ndarray, aovs: Optional[AOVBuffers] = None,
+                          display_referred: bool = False, seed: int | None = 0) -> np.ndarray:
     """
-    Applies post-processing steps to the rendered image based on the configuration.
+    Turn the linear float framebuffer into the final 8-bit image with a chain of array stages:
+    exposure -> denoise -> tone mapping -> upscale -> sRGB encoding -> dither and quantization.
+    If post-processing is disabled, the framebuffer is only clamped and quantized.
+    :param config: post-processing configuration
+    :param image: (H, W, 3) linear RGB framebuffer
+    :param aovs: AOV buffers of the render, required for denoising.
+    :param display_referred: image holds final display values in [0, 1] (e.g. 8-bit pixels of a render loop),
+                             only upscale and quantization are applied to it
+    :param seed: seed of the dither noise, fixed by default so the same framebuffer always gives the same image
+    :return: (H * scale_factor, W * scale_factor, 3) uint8 image
     """
     if config.enabled is False:
-        return pixels, width, height
-
-    if config.scale_factor > 1:
-        pixels, width, height = _upscale_image(
-            pixels,
-            width,
-            height,
-            config.scale_factor,
-        )
+        return quantize_u8(np.clip(image, 0.0, 1.0))
 
-    return pixels, width, height
+    if display_referred:
+        return quantize_u8(np.clip(upscale(image, config.scale_factor), 0.0, 1.0), dither=config.dither, seed=seed)
 
+    image = apply_exposure(image, config.exposure)
 
-def _upscale_image(
-        pixels: List[Tuple[int, int, int]],
-        width: int,
-        height: int,
-        scale_factor: int,
-) -> Tuple[List[Tuple[int, int, int]], int, int]:
-    """
-    Upscale an image represented as a flat list of RGB tuples.
+    if config.denoise:
+        image = _denoise_image(image, config, aovs)
 
-    :param pixels: flat list [(r, g, b), ...]
-    :param width: original width
-    :param height: original height
-    :param scale_factor: upscale factor
-    :return: (new_pixels_list, new_width, new_height)
-    """
+    image = tone_map(image, config.tone_mapping)
+    image = upscale(image, config.scale_factor)
 
-    # conver to np array and PIL image
-    arr = np.array(pixels, dtype=np.uint8).reshape((height, width, 3))
-    img = Image.fromarray(arr, mode="RGB")
+    if config.srgb:
+        image = encode_srgb(image)
 
-    # Resampling.NEAREST,
-    # Resampling.BILINEAR,
-    # Resampling.BICUBIC,
-    # Resampling.LANCZOS,
-    # Resampling.BOX,
-    # Resampling.HAMMING,
-    scaled_pixels = img.resize((scale_factor * width, scale_factor * height), resample=Image.BICUBIC)
+    return quantize_u8(image, dither=config.dither, seed=seed)
 
-    # convert back
-    scaled_array = np.asarray(scaled_pixels, dtype=np.uint8)
-    scaled_pixels = [tuple(px) for row in scaled_array for px in row]
 
-    return scaled_pixels, scale_factor * width, scale_factor * height
+def _denoise_image(image: np.ndarray, config: PostProcessConfig, aovs: Optional[AOVBuffers]) -> np.ndarray:
+    """
+    Run the a-trous denoiser on linear radiance, guided by the normal, depth and albedo AOVs.
+    """
+    if aovs is None or any(aov not in aovs.buffers for aov in DENOISE_AOVS):
+        raise ValueError("Denoising requires normal, depth and albedo AOV buffers.")
+
+    return atrous_denoise(
+        image,
+        normal=aovs[AOV.NORMAL],
+        depth=aovs[AOV.DEPTH],
+        albedo=aovs[AOV.ALBEDO],
+        iterations=config.denoise_iterations,
+        sigma_color=config.denoise_sigma_color,
+        sigma_normal=config.denoise_sigma_normal,
+        sigma_depth=config.denoise_sigma_depth,
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import numpy as np
+from PIL import Image
+from src.render.post_process.post_process_config import ToneMapping
+
+# Array stages of the post-processing chain. Every stage takes and returns an (H, W, 3) float image,
+# except quantize_u8 which produces the final uint8 output.
+
+_SRGB_LUT_SIZE = 4096
+
+
+def _build_srgb_lut() -> np.ndarray:
+    x = np.linspace(0.0, 1.0, _SRGB_LUT_SIZE)
+    return np.where(x <= 0.0031308, 12.92 * x, 1.055 * np.power(x, 1.0 / 2.4) - 0.055)
+
+
+_SRGB_LUT = _build_srgb_lut()
+
+
+def apply_exposure(image: np.ndarray, exposure: float) -> np.ndarray:
+    """
+    Scale linear radiance by 2^exposure.
+    :param exposure: exposure in stops, 0 keeps the image as it is
+    """
+    if exposure == 0.0:
+        return image
+    return image * (2.0 ** exposure)
+
+
+def tone_map(image: np.ndarray, operator: ToneMapping) -> np.ndarray:
+    """
+    Compress linear radiance into [0, 1].
+     - CLAMP: cut everything above 1 (same as the renderer always did)
+     - REINHARD: c / (1 + c) per channel
+     - ACES: Narkowicz's fit of the ACES filmic curve
+    """
+    if operator == ToneMapping.CLAMP:
+        return np.clip(image, 0.0, 1.0)
+    if operator == ToneMapping.REINHARD:
+        image = np.maximum(image, 0.0)
+        return image / (1.0 + image)
+    if operator == ToneMapping.ACES:
+        image = np.maximum(image, 0.0)
+        return np.clip((image * (2.51 * image + 0.03)) / (image * (2.43 * image + 0.59) + 0.14), 0.0, 1.0)
+    raise ValueError(f"Unsupported tone mapping operator: {operator}")
+
+
+def encode_srgb(image: np.ndarray) -> np.ndarray:
+    """
+    Apply the sRGB transfer curve through a lookup table instead of evaluating the power function per pixel.
+    :param image: linear values in [0, 1]
+    :return: sRGB encoded values in [0, 1]
+    """
+    index = (np.clip(image, 0.0, 1.0) * (_SRGB_LUT_SIZE - 1) + 0.5).astype(np.intp)
+    return _SRGB_LUT[index]
+
+
+def upscale(image: np.ndarray, scale_factor: int) -> np.ndarray:
+    """
+    Bicubic upscale of a float image, one PIL float plane per channel so no precision is lost before quantization.
+    :param scale_factor: integer upscale factor
+    """
+    if scale_factor <= 1:
+        return image
+    height, width = image.shape[:2]
+    size = (scale_factor * width, scale_factor * height)
+    channels = [
+        np.asarray(Image.fromarray(np.ascontiguousarray(image[..., c], dtype=np.float32), mode="F").resize(size, resample=Image.BICUBIC))
+        for c in range(image.shape[2])
+    ]
+    return np.stack(channels, axis=-1).astype(np.float64)
+
+
+def quantize_u8(image: np.ndarray, dither: bool = False, seed: int | None = None) -> np.ndarray:
+    """
+    Convert [0, 1] values to uint8, rounding like to_u8.
+    With dither, triangular noise of one quantization step is added first so smooth gradients do not band.
+    :param dither: add triangular-PDF dither noise before rounding
+    :param seed: optional seed of the dither noise
+    :return: (H, W, 3) uint8 image
+    """
+    scaled = image * 255.0
+    if dither:
+        rng = np.random.default_rng(seed)
+        scaled = scaled + rng.random(image.shape) - rng.random(image.shape)
+    return (np.clip(scaled, 0.0, 255.0) + 0.5).astype(np.uint8)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+import dataclasses
+import hashlib
+import os
+import types
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any
+import numpy as np
+
+# bump when the stored layout or the meaning of a key changes, so old entries are never reused
+_CACHE_VERSION = 2
+
+
+def fingerprint(*values: Any) -> str:
+    """
+    Content hash of arbitrary scene data: dataclasses, plain objects, containers, enums and NumPy arrays.
+    Dataclasses contribute their declared fields that take part in equality (compare=True),
+    so lazily filled caches declared with compare=False do not change the hash of an object.
+    Skybox paths and other strings naming existing files also hash the file size and modification time.
+    Code is hashed by content, so an edited or redefined function or class gives a new hash even under the same name:
+    Python functions contribute their bytecode, constants, defaults, closure contents and the functions of their
+    module they call, objects contribute the methods of their class and its bases.
+    :return: hex digest
+    """
+    h = hashlib.sha256()
+    classes = {}
+    for value in values:
+        _update(h, value, set(), classes)
+    return h.hexdigest()
+
+
+def _update(h, value: Any, seen: set[int], classes: dict[type, str]) -> None:
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+        return
+    if isinstance(value, str):
+        h.update(f"str:{value!r};".encode())
+        if len(value) < 1024 and os.path.isfile(value):
+            stat = os.stat(value)
+            h.update(f"file:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return
+    if isinstance(value, bytes):
+        h.update(b"bytes:" + value + b";")
+        return
+    if isinstance(value, Enum):
+        h.update(f"enum:{type(value).__qualname__}.{value.name};".encode())
+        return
+    if isinstance(value, np.generic):
+        _update(h, value.item(), seen, classes)
+        return
+    if isinstance(value, np.ndarray):
+        h.update(f"ndarray:{value.dtype.str}:{value.shape};".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+        return
+
+    if id(value) in seen:
+        h.update(b"cycle;")
+        return
+    seen.add(id(value))
+
+    if isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}:{len(value)}[".encode())
+        for item in value:
+            _update(h, item, seen, classes)
+        h.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        h.update(f"set:{len(value)}{{".encode())
+        for item in sorted(fingerprint(item) for item in value):
+            h.update(item.encode())
+        h.update(b"}")
+    elif isinstance(value, dict):
+        h.update(f"dict:{len(value)}{{".encode())
+        for key in sorted(value, key=repr):
+            _update(h, key, seen, classes)
+            _update(h, value[key], seen, classes)
+        h.update(b"}")
+    elif isinstance(value, type):
+        _update_class(h, value, classes)
+    elif isinstance(value, types.FunctionType):
+        _update_function(h, value, seen, classes)
+    elif isinstance(value, types.MethodType):
+        h.update(b"method(")
+        _update(h, value.__func__, seen, classes)
+        _update(h, value.__self__, seen, classes)
+        h.update(b")")
+    elif dataclasses.is_dataclass(value):
+        _update_class(h, type(value), classes)
+        h.update(b"(")
+        for f in dataclasses.fields(value):
+            if f.compare:
+                h.update(f"{f.name}=".encode())
+                _update(h, getattr(value, f.name, None), seen, classes)
+        h.update(b")")
+    elif callable(value) and hasattr(value, "__qualname__"):
+        # builtins and C extensions have no Python code to hash, their name identifies them
+        h.update(f"callable:{getattr(value, '__module__', '')}.{value.__qualname__};".encode())
+    elif hasattr(value, "__dict__"):
+        _update_class(h, type(value), classes)
+        h.update(b"(")
+        for key in sorted(vars(value)):
+            h.update(f"{key}=".encode())
+            _update(h, vars(value)[key], seen, classes)
+        h.update(b")")
+    else:
+        text = repr(value)
+        # default reprs name the memory address, which changes every session
+        h.update(f"{type(value).__qualname__}:{text if ' at 0x' not in text else ''};".encode())
+
+    seen.discard(id(value))
+
+
+def _update_code(h, code: types.CodeType) -> None:
+    h.update(f"code:{code.co_name}:{code.co_argcount}:{code.co_kwonlyargcount}:{code.co_flags}:{code.co_names!r};".encode())
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code(h, const)
+        elif isinstance(const, frozenset):
+            # set order depends on string hash randomization, sort for a key that is stable across sessions
+            h.update(f"frozenset:{sorted(map(repr, const))!r};".encode())
+        else:
+            h.update(f"{type(const).__name__}:{const!r};".encode())
+
+
+def _update_function(h, function: types.FunctionType, seen: set[int], classes: dict[type, str]) -> None:
+    h.update(f"function:{function.__module__}.{function.__qualname__}(".encode())
+    _update_code(h, function.__code__)
+    _update(h, function.__defaults__, seen, classes)
+    _update(h, function.__kwdefaults__, seen, classes)
+    for cell in function.__closure__ or ():
+        try:
+            _update(h, cell.cell_contents, seen, classes)
+        except ValueError:  # cell of a variable that is not assigned yet
+            h.update(b"empty-cell;")
+    # helpers of the same module (e.g. the same notebook) the function calls, edits to them change the result too
+    for name in function.__code__.co_names:
+        helper = function.__globals__.get(name)
+        if isinstance(helper, types.FunctionType) and helper.__module__ == function.__module__:
+            h.update(f"global:{name}=".encode())
+            _update(h, helper, seen, classes)
+    h.update(b")")
+
+
+def _update_class(h, cls: type, classes: dict[type, str]) -> None:
+    """
+    Hash a class by name and by the code of its methods and of the methods of its bases, memoized per fingerprint call.
+    """
+    digest = classes.get(cls)
+    if digest is None:
+        # placeholder while hashing, methods may refer back to their class (super() closures)
+        classes[cls] = f"{cls.__module__}.{cls.__qualname__}"
+        sub = hashlib.sha256()
+        for klass in cls.__mro__:
+            if klass.__module__ == "builtins":
+                continue
+            sub.update(f"class:{klass.__module__}.{klass.__qualname__}(".encode())
+            for name, attr in sorted(vars(klass).items()):
+                if isinstance(attr, (staticmethod, classmethod)):
+                    attr = attr.__func__
+                if isinstance(attr, property):
+                    attr = (attr.fget, attr.fset, attr.fdel)
+                if isinstance(attr, types.FunctionType) or (
+                        isinstance(attr, tuple) and any(isinstance(a, types.FunctionType) for a in attr)):
+                    sub.update(f"{name}=".encode())
+                    _update(sub, attr, set(), classes)
+            sub.update(b")")
+        digest = classes[cls] = sub.hexdigest()
+    h.update(f"class:{cls.__module__}.{cls.__qualname__}:{digest};".encode())
+
+
+@dataclass
+class RenderCache:
+    """
+    Opt-in content-addressed cache of rendered framebuffers on disk.
+    An entry is keyed by a hash of everything that affects the rendered pixels: scene objects, materials, lights,
+    camera and skybox (through the integrator), shader and integrator parameters, RenderConfig and the sampler seed.
+    Entries store the linear framebuffer and AOV buffers, so post-processing can still be changed on a cache hit.
+    The total size is bounded; when it is exceeded, least recently used entries are deleted.
+
+    Renders without RenderConfig.seed use random jitter, but are cached like any other render:
+    a repeat returns the first result instead of a new noise pattern.
+    Shaders, materials and other objects are hashed with the code of their classes and of the functions they hold,
+    so editing them in a notebook misses the old entries. Of the helpers that code calls, only functions of the same
+    module are followed; call clear() after editing a helper imported from another module.
+    """
+    directory: str | Path = "./.render_cache"
+    max_size_mb: float = 512.0
+
+    def __post_init__(self):
+        self.directory = Path(self.directory)
+        if self.max_size_mb <= 0:
+            raise ValueError("Cache size must be positive.")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, integrator, render_config, aovs: tuple = ()) -> str:
+        """
+        Build the cache key of a render.
+        :param integrator: integrator with its scene, lights and shader
+        :param render_config: render settings including the sampler seed
+        :param aovs: AOVs captured with the image
+        :return: hex digest naming the cache entry
+        """
+        return fingerprint(_CACHE_VERSION, type(integrator).__qualname__, integrator, render_config, tuple(aovs))
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def load(self, key: str) -> tuple[np.ndarray, dict[str, np.ndarray]] | None:
+        """
+        Load a cached render and mark it as recently used.
+        :param key: cache key
+        :return: (framebuffer, {aov name: buffer}) or None on a miss
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                framebuffer = data["framebuffer"]
+                aov_buffers = {name[len("aov_"):]: data[name] for name in data.files if name.startswith("aov_")}
+        except (OSError, KeyError, ValueError):
+            return None
+        os.utime(path)
+        return framebuffer, aov_buffers
+
+    def store(self, key: str, framebuffer: np.ndarray, aov_buffers: dict[str, np.ndarray] | None = None) -> Path:
+        """
+        Store a render and evict old entries if the cache grew over its size limit.
+        :param key: cache key
+        :param framebuffer: (H, W, 3) linear framebuffer
+        :param aov_buffers: optional {aov name: buffer}
+        :return: path of the entry
+        """
+        path = self.path(key)
+        arrays = {f"aov_{name}": buffer for name, buffer in (aov_buffers or {}).items()}
+        # write under a temporary name first, so readers never see a half written entry
+        temp = path.with_suffix(".tmp.npz")
+        np.savez(temp, framebuffer=framebuffer, **arrays)
+        os.replace(temp, path)
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        """
+        Delete least recently used entries until the cache fits into max_size_mb.
+        """
+        entries = [(p.stat().st_mtime_ns, p.stat().st_size, p) for p in self.directory.glob("*.npz") if not p.name.endswith(".tmp.npz")]
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_size_mb * 1024 * 1024
+        for _, size, p in sorted(entries):
+            if total <= limit:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Delete all cache entries.
+        """
+        for p in self.directory.glob("*.npz"):
+            p.unlink(missing_ok=True)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from src.io.resolution import Resolution, CustomResolution
+from src.render.aov import AOV
 
 
 @dataclass
@@ -10,10 +11,18 @@ class RenderConfig:
         resolution (Resolution): The output image resolution.
         samples_per_pixel (int): Number of samples per pixel for antialiasing.
         max_depth (int): Maximum recursion depth for ray tracing.
+        g_buffer (bool): Keep primary hits of the first render so re-renders with another shader skip tracing camera rays.
+        aovs (tuple[AOV, ...]): Extra outputs (depth, normal, albedo, ids, hit count) captured in the same pass and saved next to the image.
+        seed (int | None): Sampler seed for the pixel jitter and stochastic shading (light picks, soft shadows). With a seed, renders are reproducible; None draws fresh random numbers.
+        bake_transforms (bool): Bake transforms of static objects into world-space geometry when the scene is compiled for rendering, see Scene.compile.
     """
     resolution: Resolution | CustomResolution = Resolution.R360p
     samples_per_pixel: int = 1
     max_depth: int = 5
+    g_buffer: bool = False
+    aovs: tuple[AOV, ...] = ()
+    seed: int | None = None
+    bake_transforms: bool = True
 
     def __post_init__(self):
         if self.samples_per_pixel <= 0:
@@ -0,0 +1,166 @@
+from __future__ import annotations
+from multiprocessing import shared_memory
+from typing import Any
+import numpy as np
+
+# shared memory blocks attached in this process, kept alive as long as the process runs
+_ATTACHED: dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach_shared_array(name: str, shape: tuple[int, ...], dtype: str) -> np.ndarray:
+    """
+    Unpickle a SharedArray in a worker: map the parent's shared memory block by name, without copying.
+    """
+    shm = _ATTACHED.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _ATTACHED[name] = shm
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    return array
+
+
+def _open_mapped_array(path: str) -> np.ndarray:
+    """
+    Unpickle a memory-mapped .npy array in a worker by mapping the same file again.
+    """
+    return np.load(path, mmap_mode="r")
+
+
+class SharedArray(np.ndarray):
+    """
+    NumPy array living in a named shared memory block.
+    Pickling it (e.g. when the integrator is sent to worker processes) only sends the block name,
+    and unpickling attaches the block read-only instead of copying the data.
+    """
+    _shm_name: str
+
+    def __reduce__(self):
+        return _attach_shared_array, (self._shm_name, self.shape, self.dtype.str)
+
+
+class MappedArray(np.ndarray):
+    """
+    View of a read-only memory-mapped .npy file that pickles as its path, so workers map the file themselves.
+    """
+    _path: str
+
+    def __reduce__(self):
+        return _open_mapped_array, (self._path,)
+
+
+class SharedAssetStore:
+    """
+    Process-shared store for large read-only arrays such as HDR skyboxes, cube maps and texture tables.
+    The parent copies each array once into shared memory (or, for arrays already memory-mapped from an .npy file,
+    only remembers the file) and swaps it into the scene; workers receiving the scene attach to the same pages.
+    Use as a context manager around the lifetime of the worker pool: on exit the original arrays are put back
+    and the shared memory is released.
+
+        with SharedAssetStore() as store:
+            store.share_scene(scene)
+            with ctx.Pool(...) as pool:
+                ...
+    """
+
+    def __init__(self, min_bytes: int = 1 << 20):
+        """
+        :param min_bytes: smaller arrays are left alone, pickling them is cheaper than a shared memory block
+        """
+        self.min_bytes = min_bytes
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self._shared: dict[int, np.ndarray] = {}
+        # (owner, attribute or index, original value) of every swapped array, to restore on close
+        self._swapped: list[tuple[Any, Any, np.ndarray]] = []
+
+    def __enter__(self) -> SharedAssetStore:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def share(self, array: np.ndarray) -> np.ndarray:
+        """
+        Return a shared version of array. The same array shared twice returns the same block.
+        :param array: array to share
+        :return: SharedArray, or MappedArray for arrays memory-mapped from a file
+        """
+        shared = self._shared.get(id(array))
+        if shared is not None:
+            return shared
+
+        if isinstance(array, np.memmap) and array.filename is not None and array.mode == "r":
+            # already backed by a file, every process mapping it shares the pages
+            shared = array.view(MappedArray)
+            shared._path = array.filename
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            self._blocks.append(shm)
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf).view(SharedArray)
+            shared[...] = array
+            shared._shm_name = shm.name
+            shared.flags.writeable = False
+
+        self._shared[id(array)] = shared
+        return shared
+
+    def share_scene(self, scene) -> None:
+        """
+        Resolve the scene's skybox once in this process and swap every large array reachable from
+        the skybox, objects, materials and lights for a shared one.
+        :param scene: scene that is about to be sent to worker processes
+        """
+        self._share_arrays_in(scene.background(), set())
+        for obj in scene.get_objects():
+            self._share_arrays_in(obj, set())
+        for light in scene.lights:
+            self._share_arrays_in(light, set())
+
+    def _share_arrays_in(self, value: Any, seen: set[int]) -> None:
+        if id(value) in seen or isinstance(value, (str, bytes, int, float, bool, type(None), np.ndarray)):
+            return
+        seen.add(id(value))
+
+        if isinstance(value, (list, dict)):
+            items = enumerate(value) if isinstance(value, list) else list(value.items())
+            for key, item in items:
+                if self._is_large(item):
+                    self._swap(value, key, item)
+                else:
+                    self._share_arrays_in(item, seen)
+        elif isinstance(value, tuple):
+            for item in value:
+                self._share_arrays_in(item, seen)
+        elif hasattr(value, "__dict__"):
+            for name, item in list(vars(value).items()):
+                if self._is_large(item):
+                    self._swap(value, name, item)
+                else:
+                    self._share_arrays_in(item, seen)
+
+    def _is_large(self, value: Any) -> bool:
+        return isinstance(value, np.ndarray) and not isinstance(value, (SharedArray, MappedArray)) and value.nbytes >= self.min_bytes
+
+    def _swap(self, owner: Any, key: Any, array: np.ndarray) -> None:
+        self._swapped.append((owner, key, array))
+        if isinstance(owner, (list, dict)):
+            owner[key] = self.share(array)
+        else:
+            setattr(owner, key, self.share(array))
+
+    def close(self) -> None:
+        """
+        Put the original arrays back and release the shared memory blocks.
+        """
+        for owner, key, array in reversed(self._swapped):
+            if isinstance(owner, (list, dict)):
+                owner[key] = array
+            else:
+                setattr(owner, key, array)
+        self._swapped.clear()
+        self._shared.clear()
+
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
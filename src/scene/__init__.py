@@ -1,6 +1,11 @@
 from src.scene.camera import Camera, PinholeCamera
 from .light import Light, AmbientLight, PointLight, LightType, SpotLight, DirectionalLight, PointLightFalloff
+from .light import AreaLight, RectAreaLight, SphereAreaLight
+from .environment_light import EnvironmentLight
 from .scene import Scene
+from .compiled_scene import CompiledScene
+from .light_tree import LightTree
+from .light_grid import LightGrid
 from .object import Object
 from .surface_interaction import SurfaceInteraction
 
@@ -11,7 +16,8 @@ from .animation import EaseType, linear, ease_in_out, Easing
 __all__ = [
     "Camera", "PinholeCamera",
     "Light", "AmbientLight", "PointLight", "LightType", "SpotLight", "DirectionalLight", "PointLightFalloff",
-    "Scene",
+    "AreaLight", "RectAreaLight", "SphereAreaLight", "EnvironmentLight",
+    "Scene", "CompiledScene", "LightTree", "LightGrid",
     "Object",
     "SurfaceInteraction",
     "Animator", "AnimationSetup",
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+import numpy as np
 from src.math import Vertex, Vector
 from src.geometry.ray import Ray
 
@@ -14,6 +15,20 @@ class Camera(ABC):
         """Generate a ray for normalized image coordinates u, v in [-1, 1]."""
         ...
 
+    def make_rays(self, u: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Generate a batch of rays for arrays of normalized image coordinates u, v in [-1, 1].
+        The default implementation calls make_ray for every coordinate pair; cameras can override it with a vectorized version.
+        :return: (origins, directions) as (N, 3) arrays
+        """
+        origins = np.empty((len(u), 3))
+        directions = np.empty((len(u), 3))
+        for k in range(len(u)):
+            ray = self.make_ray(float(u[k]), float(v[k]))
+            origins[k] = (ray.origin.x, ray.origin.y, ray.origin.z)
+            directions[k] = (ray.direction.x, ray.direction.y, ray.direction.z)
+        return origins, directions
+
     @abstractmethod
     def update_camera(self) -> None:
         """Recalculate internal state after parameter changes."""
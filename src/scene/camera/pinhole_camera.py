@@ -1,7 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from math import tan, radians
+import numpy as np
 from src.math import Vertex, Vector
+from src.math.batch import vec3_to_array, batch_normalize
 from src.geometry.ray import Ray
 from .camera import Camera
 
@@ -51,6 +53,53 @@ class PinholeCamera(Camera):
         )
         return Ray(self.origin, (position - self.origin).normalize())
 
+    def make_rays(self, u: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized make_ray for arrays of image coordinates. All rays share the camera origin.
+        :return: (origins, directions) as (N, 3) arrays
+        """
+        origin = vec3_to_array(self.origin)
+        center_plane = origin + vec3_to_array(self.forward)
+        position = (
+            center_plane
+            + np.multiply.outer(np.asarray(u) * self.half_width, vec3_to_array(self.right))
+            + np.multiply.outer(np.asarray(v) * self.half_height, vec3_to_array(self.up))
+        )
+        directions = batch_normalize(position - origin)
+        return np.broadcast_to(origin, directions.shape).copy(), directions
+
+    def image_coords(self, directions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Inverse of make_rays: image coordinates (u, v) of ray directions leaving the camera origin.
+        :param directions: (N, 3) directions pointing in front of the camera
+        :return: (u, v) as (N,) arrays
+        """
+        depth = directions @ vec3_to_array(self.forward)
+        u = (directions @ vec3_to_array(self.right)) / (depth * self.half_width)
+        v = (directions @ vec3_to_array(self.up)) / (depth * self.half_height)
+        return u, v
+
+    def beam_planes(self, u_min: float, u_max: float, v_min: float, v_max: float) -> np.ndarray:
+        """
+        Bounding planes of the pyramid of all rays through the image rectangle [u_min, u_max] x [v_min, v_max],
+        built from the make_ray corner rays, plus a near plane through the origin.
+        A point p lies inside the beam if n . p + offset >= 0 for every plane.
+        :return: (5, 4) array of planes [nx, ny, nz, offset], normals pointing into the beam
+        """
+        corners = [self.make_ray(u, v).direction for u, v in ((u_min, v_min), (u_max, v_min), (u_max, v_max), (u_min, v_max))]
+        center = self.make_ray((u_min + u_max) * 0.5, (v_min + v_max) * 0.5).direction
+        origin = vec3_to_array(self.origin)
+
+        planes = np.zeros((5, 4))
+        for k in range(4):
+            normal = vec3_to_array(corners[k].cross(corners[(k + 1) % 4]))
+            if normal @ vec3_to_array(center) < 0.0:
+                normal = -normal
+            planes[k, :3] = normal
+        planes[4, :3] = vec3_to_array(self.forward)
+        planes[:, 3] = -(planes[:, :3] @ origin)
+        return planes
+
     def rotate_around_axis(self, axis: Vector, angle_deg: float) -> None:
         angle_rad = radians(angle_deg)
         self.direction = self.direction.rotate_around_axis(axis, angle_rad).normalize()
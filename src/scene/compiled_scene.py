@@ -0,0 +1,585 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, fields, replace
+import numpy as np
+from src.geometry.geometry_hit import GeometryHit
+from src.geometry.primitives import Sphere, Plane, Triangle, Square, Quad, Box
+from src.geometry.ray import Ray
+from src.material.material.material import Material
+from src.math import Vertex, Vector
+from src.math.batch import batch_dot, batch_normalize, batch_face_forward
+from src.math.constants import EPS
+from src.scene.camera.camera import Camera
+from src.scene.camera.pinhole_camera import PinholeCamera
+from src.scene.light import Light, LightType
+from src.scene.light_tree import LightTree
+from src.scene.light_grid import LightGrid
+from src.scene.object import Object
+from src.scene.surface_interaction import SurfaceInteraction
+
+# upper bound of rays x primitives evaluated at once by a table kernel, keeps the temporary arrays small
+_MAX_PAIRS = 1 << 20
+# camera rays per screen tile of beam culling, consecutive rays of a row batch form one tile
+_BEAM_TILE_RAYS = 128
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True)
+class PrimitiveTable(ABC):
+    """
+    Struct-of-arrays storage of all world-space primitives of one type.
+    Rows are sorted by object id, so the first of equally near hits belongs to the lowest object id,
+    the same tie-breaking as testing the objects one by one.
+    """
+    object_ids: np.ndarray  # (M,) index of the owning object in CompiledScene.objects
+
+    def __len__(self) -> int:
+        return self.object_ids.shape[0]
+
+    def select(self, visible: np.ndarray) -> PrimitiveTable | None:
+        """
+        Table of only the rows whose object is visible.
+        :param visible: (number of scene objects,) bool mask
+        :return: self if all rows are visible, None if none is
+        """
+        rows = visible[self.object_ids]
+        if rows.all():
+            return self
+        if not rows.any():
+            return None
+        return replace(self, **{f.name: getattr(self, f.name)[rows] for f in fields(self)})
+
+    @abstractmethod
+    def distances(self, origins: np.ndarray, directions: np.ndarray, rows: slice, t_min: float, t_max: float) -> np.ndarray:
+        """
+        :return: (N, len(rows)) distances of every ray to every primitive in rows, inf on miss
+        """
+        ...
+
+    @abstractmethod
+    def normals(self, points: np.ndarray, directions: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        :param rows: (K,) table row hit by each ray
+        :return: (K, 3) unit normals facing against the rays
+        """
+        ...
+
+    def intersect(self, origins: np.ndarray, directions: np.ndarray, t_min: float, t_max: float
+                  ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Closest hit of every ray with the primitives of the table.
+        :return: (dist, object_ids, normals) - (N,) inf on miss, (N,) -1 on miss, (N, 3) zero on miss
+        """
+        n = origins.shape[0]
+        best = np.full(n, np.inf)
+        best_row = np.full(n, -1, dtype=np.int64)
+
+        chunk = max(1, _MAX_PAIRS // max(n, 1))
+        for start in range(0, len(self), chunk):
+            rows = slice(start, min(start + chunk, len(self)))
+            dist = self.distances(origins, directions, rows, t_min, t_max)
+            column = np.argmin(dist, axis=1)
+            nearest = dist[np.arange(n), column]
+            closer = nearest < best
+            best[closer] = nearest[closer]
+            best_row[closer] = start + column[closer]
+
+        hit = best_row >= 0
+        object_ids = np.where(hit, self.object_ids[np.maximum(best_row, 0)], -1)
+        normals = np.zeros((n, 3))
+        if hit.any():
+            points = origins[hit] + directions[hit] * best[hit][:, None]
+            normals[hit] = self.normals(points, directions[hit], best_row[hit])
+        return best, object_ids, normals
+
+
+@dataclass(frozen=True)
+class SphereTable(PrimitiveTable):
+    centers: np.ndarray = None  # (M, 3)
+    radii: np.ndarray = None    # (M,)
+
+    def distances(self, origins, directions, rows, t_min, t_max):
+        oc = origins[:, None, :] - self.centers[None, rows]
+        a = batch_dot(directions, directions)[:, None]
+        b = 2.0 * np.einsum("nmk,nk->nm", oc, directions)
+        c = np.einsum("nmk,nmk->nm", oc, oc) - self.radii[rows] ** 2
+
+        discriminant = b * b - 4 * a * c
+        sqrt_disc = np.sqrt(np.maximum(discriminant, 0.0))
+        root = (-b - sqrt_disc) / (2.0 * a)
+        far = (-b + sqrt_disc) / (2.0 * a)
+        root = np.where((root < t_min) | (root > t_max), far, root)
+
+        valid = (discriminant >= 0) & (root >= t_min) & (root <= t_max)
+        return np.where(valid, root, np.inf)
+
+    def normals(self, points, directions, rows):
+        return batch_face_forward(batch_normalize((points - self.centers[rows]) / self.radii[rows, None]), directions)
+
+
+@dataclass(frozen=True)
+class PlaneTable(PrimitiveTable):
+    points: np.ndarray = None        # (M, 3)
+    unit_normals: np.ndarray = None  # (M, 3)
+
+    def distances(self, origins, directions, rows, t_min, t_max):
+        normal = self.unit_normals[rows]
+        denom = directions @ normal.T
+        parallel = np.abs(denom) < 1e-6
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (batch_dot(self.points[rows], normal)[None, :] - origins @ normal.T) / np.where(parallel, 1.0, denom)
+        valid = ~parallel & (t >= t_min) & (t <= t_max)
+        return np.where(valid, t, np.inf)
+
+    def normals(self, points, directions, rows):
+        return batch_face_forward(self.unit_normals[rows], directions)
+
+
+@dataclass(frozen=True)
+class TriangleTable(PrimitiveTable):
+    v0: np.ndarray = None      # (M, 3)
+    edge_1: np.ndarray = None  # (M, 3)
+    edge_2: np.ndarray = None  # (M, 3)
+    unit_normals: np.ndarray = None  # (M, 3)
+
+    def distances(self, origins, directions, rows, t_min, t_max):
+        edge_1, edge_2 = self.edge_1[rows], self.edge_2[rows]
+        plane_vector = np.cross(directions[:, None, :], edge_2[None, :, :])
+        determinant = np.einsum("nmk,mk->nm", plane_vector, edge_1)
+        parallel = np.abs(determinant) < 1e-8
+        inv_det = 1.0 / np.where(parallel, 1.0, determinant)
+
+        vertex_to_origin = origins[:, None, :] - self.v0[None, rows]
+        u = np.einsum("nmk,nmk->nm", vertex_to_origin, plane_vector) * inv_det
+        q_vector = np.cross(vertex_to_origin, edge_1[None, :, :])
+        v = np.einsum("nk,nmk->nm", directions, q_vector) * inv_det
+        t = np.einsum("nmk,mk->nm", q_vector, edge_2) * inv_det
+
+        valid = (~parallel & (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0)
+                 & (t >= t_min) & (t <= t_max))
+        return np.where(valid, t, np.inf)
+
+    def normals(self, points, directions, rows):
+        return batch_face_forward(self.unit_normals[rows], directions)
+
+
+@dataclass(frozen=True)
+class QuadTable(PrimitiveTable):
+    corners: np.ndarray = None        # (M, 3)
+    unit_normals: np.ndarray = None   # (M, 3)
+    plane_offsets: np.ndarray = None  # (M,)
+    dual_u: np.ndarray = None         # (M, 3)
+    dual_v: np.ndarray = None         # (M, 3)
+
+    def distances(self, origins, directions, rows, t_min, t_max):
+        normal = self.unit_normals[rows]
+        denom = directions @ normal.T
+        parallel = np.abs(denom) < 1e-8
+        t = (self.plane_offsets[None, rows] - origins @ normal.T) / np.where(parallel, 1.0, denom)
+
+        local = origins[:, None, :] - self.corners[None, rows] + directions[:, None, :] * t[:, :, None]
+        a = np.einsum("nmk,mk->nm", local, self.dual_u[rows])
+        b = np.einsum("nmk,mk->nm", local, self.dual_v[rows])
+
+        valid = ~parallel & (t >= t_min) & (t <= t_max) & (a >= 0.0) & (a <= 1.0) & (b >= 0.0) & (b <= 1.0)
+        return np.where(valid, t, np.inf)
+
+    def normals(self, points, directions, rows):
+        return batch_face_forward(self.unit_normals[rows], directions)
+
+
+@dataclass(frozen=True)
+class BoxTable(PrimitiveTable):
+    lo: np.ndarray = None  # (M, 3)
+    hi: np.ndarray = None  # (M, 3)
+
+    def distances(self, origins, directions, rows, t_min, t_max):
+        lo, hi = self.lo[None, rows], self.hi[None, rows]
+        o = origins[:, None, :]
+        d = directions[:, None, :]
+
+        parallel = np.abs(d) < EPS
+        outside = np.any(parallel & ((o < lo) | (o > hi)), axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t0 = (lo - o) / d
+            t1 = (hi - o) / d
+        t0 = np.where(parallel, -np.inf, t0)
+        t1 = np.where(parallel, np.inf, t1)
+
+        tmin = np.max(np.minimum(t0, t1), axis=2)
+        tmax = np.min(np.maximum(t0, t1), axis=2)
+        valid = ~outside & ~(tmax < np.maximum(tmin, t_min)) & ~(tmin > t_max)
+        return np.where(valid, np.where(tmin >= t_min, tmin, tmax), np.inf)
+
+    def normals(self, points, directions, rows):
+        lo, hi = self.lo[rows], self.hi[rows]
+        # same face order as Box.normal_at
+        faces = [
+            (np.abs(points[:, 0] - lo[:, 0]) < EPS, (-1.0, 0.0, 0.0)),
+            (np.abs(points[:, 0] - hi[:, 0]) < EPS, (1.0, 0.0, 0.0)),
+            (np.abs(points[:, 1] - lo[:, 1]) < EPS, (0.0, -1.0, 0.0)),
+            (np.abs(points[:, 1] - hi[:, 1]) < EPS, (0.0, 1.0, 0.0)),
+            (np.abs(points[:, 2] - lo[:, 2]) < EPS, (0.0, 0.0, -1.0)),
+            (np.abs(points[:, 2] - hi[:, 2]) < EPS, (0.0, 0.0, 1.0)),
+        ]
+        normals = np.zeros_like(points)
+        assigned = np.zeros(points.shape[0], dtype=bool)
+        for on_face, face_normal in faces:
+            pick = on_face & ~assigned
+            normals[pick] = face_normal
+            assigned |= pick
+        return batch_face_forward(normals, directions)
+
+
+# light structures cached per set of lights are dropped beyond this many, shaders wrapping shaders can ask for many subsets
+_MAX_CACHED_LIGHT_SETS = 256
+
+
+def cached_light_structure(cache: dict, lights, build, *key):
+    """
+    Look up a light tree or grid built from exactly these light instances, building it on a miss.
+    Entries keep their lights alive, so the ids in the key cannot be reused by other lights.
+    :param cache: dict owned by the scene
+    :param lights: lights the structure is built from
+    :param build: function building the structure from a tuple of lights
+    :param key: extra key parts, e.g. the threshold of a grid
+    :return: cached or newly built structure
+    """
+    lights = tuple(lights)
+    key = (*key, *(id(light) for light in lights))
+    entry = cache.get(key)
+    if entry is None:
+        if len(cache) >= _MAX_CACHED_LIGHT_SETS:
+            cache.clear()
+        entry = cache[key] = (lights, build(lights))
+    return entry[1]
+
+
+def _vec(v) -> list[float]:
+    return [v.x, v.y, v.z]
+
+
+def build_tables(objects: tuple[Object, ...]) -> tuple[tuple[PrimitiveTable, ...], tuple[int, ...]]:
+    """
+    Sort world-space objects (identity transform) into struct-of-arrays tables by primitive type.
+    :return: (tables, ids of the objects that stay on Object.intersect_batch)
+    """
+    rows: dict[type, list] = {SphereTable: [], PlaneTable: [], TriangleTable: [], QuadTable: [], BoxTable: []}
+    fallback = []
+    for index, obj in enumerate(objects):
+        geometry = obj.geometry
+        if not obj.transform.is_identity:
+            fallback.append(index)
+        elif type(geometry) is Sphere:
+            rows[SphereTable].append((index, _vec(geometry.center), geometry.radius))
+        elif type(geometry) is Plane:
+            rows[PlaneTable].append((index, _vec(geometry.point), _vec(geometry.normal)))
+        elif type(geometry) in (Triangle, Square):
+            # a square is two triangles, tested in the same order as Square.intersect_batch
+            for tri in ((geometry,) if type(geometry) is Triangle else (geometry.tri1, geometry.tri2)):
+                rows[TriangleTable].append((index, tri.v0_array, tri.edge_1_array, tri.edge_2_array, tri.normal_array))
+        elif type(geometry) is Quad:
+            rows[QuadTable].append((index, geometry.corner_array, geometry.normal_array, geometry.plane_offset,
+                                    geometry.dual_u_array, geometry.dual_v_array))
+        elif type(geometry) is Box:
+            rows[BoxTable].append((index, geometry.lo, geometry.hi))
+        else:
+            fallback.append(index)
+
+    tables = []
+    for table_type, entries in rows.items():
+        if not entries:
+            continue
+        columns = [_readonly(np.array(column, dtype=np.int64 if k == 0 else np.float64)) for k, column in enumerate(zip(*entries))]
+        tables.append(table_type(*columns))
+    return tuple(tables), tuple(fallback)
+
+
+def _hits_bounds(origins: np.ndarray, directions: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """
+    Slab test of every ray against one (2, 3) box, a conservative filter before the exact intersection.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / directions
+        t0 = (bounds[0] - origins) * inv
+        t1 = (bounds[1] - origins) * inv
+    near, far = np.minimum(t0, t1), np.maximum(t0, t1)
+    # rays parallel to a slab give nan for origins on its planes, treat those as inside
+    near = np.max(np.where(np.isnan(near), -np.inf, near), axis=1)
+    far = np.min(np.where(np.isnan(far), np.inf, far), axis=1)
+    return (near <= far) & (far >= 0.0)
+
+
+@dataclass(frozen=True)
+class CompiledScene:
+    """
+    Immutable render-ready snapshot of a Scene, built by Scene.compile().
+     - objects: world-space objects in scene order (static transforms baked), indices match scene.objects
+     - tables: struct-of-arrays geometry per primitive type for intersect_batch
+     - bounds: (M, 2, 3) world bounding boxes, inf for unbounded objects; the acceleration structure used to
+       skip objects a batch of rays cannot hit
+     - materials / object_material_ids: distinct materials and the material index of every object
+     - light_positions / light_colors / light_intensities: light data as arrays, lights keeps the Light objects
+     - resolved skybox ready to answer background lookups
+    It offers the read-only part of the Scene interface used by integrators and shaders, so render loops
+    hand it to the integrator in place of the scene. Derived fields are excluded from equality,
+    so RenderCache keys of a snapshot only depend on the scene content.
+    """
+    camera: Camera
+    objects: tuple[Object, ...]
+    lights: tuple[Light, ...]
+    skybox: object = None
+    materials: tuple[Material, ...] = field(default=(), compare=False)
+    object_material_ids: np.ndarray = field(default=None, compare=False, repr=False)
+    light_positions: np.ndarray = field(default=None, compare=False, repr=False)
+    light_colors: np.ndarray = field(default=None, compare=False, repr=False)
+    light_intensities: np.ndarray = field(default=None, compare=False, repr=False)
+    tables: tuple[PrimitiveTable, ...] = field(default=(), compare=False, repr=False)
+    fallback: tuple[int, ...] = field(default=(), compare=False, repr=False)
+    bounds: np.ndarray = field(default=None, compare=False, repr=False)
+    resolved_skybox: object = field(default=None, compare=False, repr=False)
+    # origin terms of every object for the camera origin, computed on the first camera ray of a frame
+    _primary_terms: dict = field(default_factory=dict, init=False, compare=False, repr=False)
+    # light trees for many-light sampling and light grids for influence culling, built on first use per set of lights
+    _light_trees: dict = field(default_factory=dict, init=False, compare=False, repr=False)
+    _light_grids: dict = field(default_factory=dict, init=False, compare=False, repr=False)
+
+    @staticmethod
+    def build(camera: Camera, objects: tuple[Object, ...], lights: tuple[Light, ...], skybox, resolved_skybox,
+              geometry: tuple | None = None) -> CompiledScene:
+        """
+        Assemble a snapshot from compiled world-space objects.
+        :param geometry: (tables, fallback, bounds) of an earlier snapshot with the same objects, reused as is
+        """
+        if geometry is None:
+            tables, fallback = build_tables(objects)
+            bounds = np.array([
+                b if (b := obj.bounds()) is not None else [[-np.inf] * 3, [np.inf] * 3] for obj in objects
+            ], dtype=np.float64).reshape(len(objects), 2, 3)
+            # widen a little, so rounding in the transformed corners never culls a real hit
+            pad = 1e-7 * (1.0 + np.abs(np.where(np.isfinite(bounds), bounds, 0.0)).max(axis=1, keepdims=True))
+            bounds = bounds + np.array([-1.0, 1.0])[None, :, None] * pad
+            geometry = (tables, fallback, _readonly(bounds))
+        tables, fallback, bounds = geometry
+
+        material_index: dict[int, int] = {}
+        materials = []
+        for obj in objects:
+            if id(obj.material) not in material_index:
+                material_index[id(obj.material)] = len(materials)
+                materials.append(obj.material)
+        object_material_ids = np.array([material_index[id(obj.material)] for obj in objects], dtype=np.int64)
+
+        return CompiledScene(
+            camera=camera,
+            objects=objects,
+            lights=lights,
+            skybox=skybox,
+            materials=tuple(materials),
+            object_material_ids=_readonly(object_material_ids),
+            light_positions=_readonly(np.array([_vec(light.position) for light in lights], dtype=np.float64).reshape(-1, 3)),
+            light_colors=_readonly(np.array([light.color.as_rgb() for light in lights], dtype=np.float64).reshape(-1, 3)),
+            light_intensities=_readonly(np.array([light.intensity for light in lights], dtype=np.float64)),
+            tables=tables,
+            fallback=fallback,
+            bounds=bounds,
+            resolved_skybox=resolved_skybox,
+        )
+
+    @property
+    def geometry(self) -> tuple:
+        return self.tables, self.fallback, self.bounds
+
+    def same_geometry(self, other: CompiledScene | None) -> bool:
+        """
+        Check whether other was compiled from the same objects, so stored hits (object ids, points, material samples)
+        are still valid for this snapshot. Scene.compile reuses the geometry of an unchanged scene as is.
+        """
+        return other is not None and self.bounds is other.bounds and self.tables is other.tables
+
+    def get_objects(self) -> tuple[Object, ...]:
+        return self.objects
+
+    def background(self):
+        """
+        Skybox object resolved at compile time, see Scene.background.
+        """
+        return self.resolved_skybox
+
+    def material_ids(self) -> np.ndarray:
+        """
+        Material index of every object, see Scene.material_ids.
+        """
+        return self.object_material_ids
+
+    def primary_terms(self, origin: Vertex) -> list:
+        """
+        Origin terms (see Primitive.origin_terms) of every object for rays leaving origin, computed once and cached.
+        Objects that still have a transform get None and are intersected the usual way.
+        :param origin: camera origin
+        :return: one entry per object
+        """
+        key = (origin.x, origin.y, origin.z)
+        terms = self._primary_terms.get(key)
+        if terms is None:
+            terms = [obj.geometry.origin_terms(origin) if obj.transform.is_identity else None for obj in self.objects]
+            # the camera may move between frames of an animation, keep only the current origin
+            self._primary_terms.clear()
+            self._primary_terms[key] = terms
+        return terms
+
+    def intersect(self, ray: Ray) -> SurfaceInteraction | None:
+        """
+        Closest hit of a single ray, same result as Scene.intersect on the source scene.
+        Camera rays reuse the per-frame origin terms of primary_terms, so only the direction-dependent part runs per ray.
+        """
+        closest_hit = None
+        closest_distance = float('inf')
+
+        origin, camera_origin = ray.origin, self.camera.origin
+        if origin.x != camera_origin.x or origin.y != camera_origin.y or origin.z != camera_origin.z:
+            for obj in self.objects:
+                hit = obj.intersect(ray)
+                if hit and hit.geom.dist < closest_distance:
+                    closest_distance = hit.geom.dist
+                    closest_hit = hit
+            return closest_hit
+
+        # the terms only depend on the origin, so any ray from the camera position may use them
+        for obj, terms in zip(self.objects, self.primary_terms(camera_origin)):
+            hit = obj.intersect(ray) if terms is None else obj.intersect_from(ray, terms)
+            if hit and hit.geom.dist < closest_distance:
+                closest_distance = hit.geom.dist
+                closest_hit = hit
+        return closest_hit
+
+    def beam_visible(self, planes: np.ndarray) -> np.ndarray:
+        """
+        Conservative test of the object bounds against a beam, see PinholeCamera.beam_planes.
+        A box is culled if its corner furthest along some plane normal is still outside that plane.
+        :param planes: (P, 4) planes [nx, ny, nz, offset] facing into the beam
+        :return: (M,) bool mask of objects that may be hit by a ray of the beam
+        """
+        normals = planes[None, :, :3]
+        lo, hi = self.bounds[:, None, 0], self.bounds[:, None, 1]
+        with np.errstate(invalid="ignore"):
+            # 0 * inf of unbounded objects is nan, but only in the branch np.where discards
+            furthest = np.where(normals > 0, normals * hi, np.where(normals < 0, normals * lo, 0.0))
+        reach = furthest.sum(axis=-1) + planes[None, :, 3]
+        return np.all(reach >= -1e-9, axis=1)
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray
+                        ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Closest hit of a batch of rays, same contract as Scene.intersect_batch.
+        Primitive tables are intersected with one kernel per type; the remaining objects (transformed or custom
+        primitives) only get the rays that enter their bounding box.
+        Batches of camera rays (all leaving a pinhole camera's origin, like a rendered row) are split into tiles of
+        consecutive rays, and each tile is only tested against the objects inside its beam.
+        """
+        n = origins.shape[0]
+        camera = self.camera
+        if not isinstance(camera, PinholeCamera) or n < 2 or len(self.objects) < 2 \
+                or not np.array_equal(origins, np.broadcast_to([camera.origin.x, camera.origin.y, camera.origin.z], origins.shape)):
+            return self._intersect_batch(origins, directions)
+
+        u, v = camera.image_coords(directions)
+        if not np.all(np.isfinite(u) & np.isfinite(v)) or np.any(directions @ [camera.forward.x, camera.forward.y, camera.forward.z] <= 0.0):
+            return self._intersect_batch(origins, directions)
+
+        result = (np.full(n, np.inf), np.full(n, -1, dtype=np.int64), np.zeros((n, 3)), np.zeros((n, 3)))
+        for start in range(0, n, _BEAM_TILE_RAYS):
+            tile = slice(start, min(start + _BEAM_TILE_RAYS, n))
+            # a tiny margin keeps rays on the tile border inside the beam despite rounding
+            margin_u = 1e-9 * (1.0 + np.abs(u[tile]).max())
+            margin_v = 1e-9 * (1.0 + np.abs(v[tile]).max())
+            planes = camera.beam_planes(u[tile].min() - margin_u, u[tile].max() + margin_u,
+                                        v[tile].min() - margin_v, v[tile].max() + margin_v)
+            tile_result = self._intersect_batch(origins[tile], directions[tile], self.beam_visible(planes))
+            for out, values in zip(result, tile_result):
+                out[tile] = values
+        return result
+
+    def _intersect_batch(self, origins: np.ndarray, directions: np.ndarray, visible: np.ndarray | None = None
+                         ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :param visible: optional (M,) mask, objects outside it are skipped
+        """
+        n = origins.shape[0]
+        closest_distance = np.full(n, np.inf)
+        object_ids = np.full(n, -1, dtype=np.int64)
+        normals = np.zeros((n, 3))
+
+        def merge(dist, ids, hit_normals):
+            # the lower object id wins ties, as if all objects were tested in scene order
+            closer = (dist < closest_distance) | ((dist == closest_distance) & np.isfinite(dist) & (ids < object_ids))
+            closest_distance[closer] = dist[closer]
+            object_ids[closer] = ids[closer]
+            normals[closer] = hit_normals[closer]
+
+        for table in self.tables:
+            if visible is not None:
+                table = table.select(visible)
+                if table is None:
+                    continue
+            merge(*table.intersect(origins, directions, 0.001, float("inf")))
+
+        for index in self.fallback:
+            if visible is not None and not visible[index]:
+                continue
+            candidates = np.flatnonzero(_hits_bounds(origins, directions, self.bounds[index]))
+            if candidates.size == 0:
+                continue
+            dist = np.full(n, np.inf)
+            hit_normals = np.zeros((n, 3))
+            dist[candidates], _, hit_normals[candidates] = self.objects[index].intersect_batch(origins[candidates], directions[candidates])
+            merge(dist, np.full(n, index, dtype=np.int64), hit_normals)
+
+        hit = np.isfinite(closest_distance)
+        points = np.where(hit[:, None], origins + directions * np.where(hit, closest_distance, 0.0)[:, None], 0.0)
+        return closest_distance, object_ids, points, normals
+
+    def surface_interaction(self, object_id: int, dist: float, point: np.ndarray, normal: np.ndarray,
+                            direction: np.ndarray) -> SurfaceInteraction:
+        """
+        Build the SurfaceInteraction for one row of an intersect_batch result, see Scene.surface_interaction.
+        """
+        geom = GeometryHit(
+            dist=float(dist),
+            point=Vertex(float(point[0]), float(point[1]), float(point[2])),
+            normal=Vector(float(normal[0]), float(normal[1]), float(normal[2])),
+            front_face=float(normal @ direction) < 0.0,
+        )
+        return SurfaceInteraction(geom=geom, material=self.objects[object_id].material_at(geom))
+
+    # -------- light queries, same as on Scene --------
+
+    def get_all_lights(self) -> tuple[Light, ...]:
+        return self.lights
+
+    def get_point_lights(self) -> list[Light]:
+        return [light for light in self.lights if light.type == LightType.POINT]
+
+    def get_all_not_ambient_lights(self) -> list[Light]:
+        return [light for light in self.lights if light.type != LightType.AMBIENT]
+
+    def get_ambient_light(self) -> Light | None:
+        return next((light for light in self.lights if light.type == LightType.AMBIENT), None)
+
+    def light_tree(self, lights=None) -> LightTree:
+        """
+        Light tree over the lights of the snapshot (or the given subset of lights), built once on first use, see LightTree.
+        """
+        return cached_light_structure(self._light_trees, self.lights if lights is None else lights, LightTree.build)
+
+    def light_grid(self, threshold: float, lights=None) -> LightGrid:
+        """
+        Grid over the influence volumes of the lights of the snapshot (or the given subset of lights),
+        built once per threshold, see LightGrid.
+        """
+        return cached_light_structure(self._light_grids, self.lights if lights is None else lights,
+                                      lambda group: LightGrid.build(group, threshold), threshold)
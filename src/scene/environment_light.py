@@ -0,0 +1,135 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from math import pi
+import numpy as np
+
+from src.math import Vertex
+from src.material.color import Color
+from src.scene.light import Light, LightType
+
+
+@dataclass
+class EnvironmentLight(Light):
+    """
+    Lights the scene with a skybox: every direction of the sky is a distant light of the skybox's color.
+    Directions are drawn by importance: a lat-long map of the sky's luminance times sin(theta) (the area of a
+    lat-long texel on the sphere) is turned into a marginal CDF over rows and a conditional CDF per row,
+    so bright regions such as the sun get most of the samples and a few samples per hit converge.
+    The map has map_height x 2 * map_height texels, each averaging supersampling^2 lookups so small bright
+    features are not missed; the radiance of the chosen directions is looked up in the skybox itself.
+    Shaders that support it (BlinnPhongShader) trace samples shadow rays per hit. The light has no position,
+    so shaders that only handle lights with one (LambertShader, DotProductShader) leave it out.
+    """
+    skybox: object = None  # skybox object with colors_from_dirs, or a name / HDR path as for scene.skybox
+    intensity: float = 1.0
+    type: LightType = LightType.ENVIRONMENT
+    samples: int = 8
+    map_height: int = 128
+    supersampling: int = 4
+
+    def __post_init__(self):
+        if self.samples <= 0:
+            raise ValueError("Environment light samples must be a positive integer.")
+        if self.map_height <= 0 or self.supersampling <= 0:
+            raise ValueError("Environment map resolution and supersampling must be positive integers.")
+        if self.skybox is None or isinstance(self.skybox, str):
+            from src.scene.skybox import resolve_skybox
+            self.skybox = resolve_skybox(self.skybox)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Build the importance map and its CDFs from the skybox; call again after rotating or replacing the skybox.
+        weights[i, j] is the mean of luminance * sin(theta) over texel (i, j), row i covers theta in
+        [i, i + 1] * pi / map_height from straight up (+y), column j covers phi = atan2(z, x) in [j, j + 1] * pi / map_height.
+        """
+        h, w, k = self.map_height, 2 * self.map_height, self.supersampling
+        theta = (np.arange(h * k) + 0.5) / (h * k) * pi
+        phi = (np.arange(w * k) + 0.5) / (w * k) * 2.0 * pi
+        directions = _directions(theta[:, None], phi[None, :]).reshape(-1, 3)
+        rgb = np.asarray(self.skybox.colors_from_dirs(directions), dtype=np.float64)
+        luminance = np.maximum(rgb @ np.array([0.2126, 0.7152, 0.0722]), 0.0).reshape(h * k, w * k)
+        weights = (luminance * np.sin(theta)[:, None]).reshape(h, k, w, k).mean(axis=(1, 3))
+
+        row_sums = weights.sum(axis=1)
+        total = float(row_sums.sum())
+        if total <= 0.0:
+            # a black sky emits nothing, sample() returns zero pdfs
+            self.weights, self.total = weights, 0.0
+            self.marginal_cdf = np.linspace(1.0 / h, 1.0, h)
+            self.conditional_cdf = np.tile(np.linspace(1.0 / w, 1.0, w), (h, 1))
+            return
+        self.weights, self.total = weights, total
+        self.marginal_cdf = np.cumsum(row_sums) / total
+        self.marginal_cdf[-1] = 1.0
+        safe_rows = np.where(row_sums > 0.0, row_sums, 1.0)[:, None]
+        self.conditional_cdf = np.where(row_sums[:, None] > 0.0, np.cumsum(weights, axis=1) / safe_rows,
+                                        np.linspace(1.0 / w, 1.0, w)[None, :])
+        self.conditional_cdf[:, -1] = 1.0
+
+    def intensity_at(self, point: Vertex) -> float:
+        return self.intensity
+
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        return np.full(points.shape[0], float(self.intensity))
+
+    def get_color_at(self, point: Vertex) -> Color:
+        return self.color
+
+    def radiance(self, directions: np.ndarray) -> np.ndarray:
+        """
+        Sky color seen along directions, the shader scales it by the light's intensity and color.
+        :param directions: (N, 3) unit directions
+        :return: (N, 3) linear RGB
+        """
+        return np.asarray(self.skybox.colors_from_dirs(directions), dtype=np.float64)
+
+    def sample(self, uv: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Map unit-square samples to directions distributed like the importance map.
+        :param uv: (N, 2) samples in [0, 1)
+        :return: (directions, pdf) - (N, 3) unit directions and (N,) densities per solid angle, 0 for a black sky
+        """
+        h, w = self.weights.shape
+        u1, u2 = uv[:, 0], uv[:, 1]
+        row = np.minimum(np.searchsorted(self.marginal_cdf, u1, side="right"), h - 1)
+        row_lo = np.where(row > 0, self.marginal_cdf[row - 1], 0.0)
+        row_fraction = (u1 - row_lo) / np.maximum(self.marginal_cdf[row] - row_lo, 1e-300)
+
+        cdf = self.conditional_cdf[row]
+        column = np.minimum((cdf <= u2[:, None]).sum(axis=1), w - 1)
+        column_lo = np.where(column > 0, cdf[np.arange(row.size), column - 1], 0.0)
+        column_fraction = (u2 - column_lo) / np.maximum(cdf[np.arange(row.size), column] - column_lo, 1e-300)
+
+        theta = (row + np.clip(row_fraction, 0.0, 1.0)) / h * pi
+        phi = (column + np.clip(column_fraction, 0.0, 1.0)) / w * 2.0 * pi
+        return _directions(theta, phi), self._pdf(row, column, theta)
+
+    def pdf(self, directions: np.ndarray) -> np.ndarray:
+        """
+        Density per solid angle with which sample picks the given directions.
+        :param directions: (N, 3) unit directions
+        :return: (N,) densities
+        """
+        h, w = self.weights.shape
+        theta = np.arccos(np.clip(directions[:, 1], -1.0, 1.0))
+        phi = np.arctan2(directions[:, 2], directions[:, 0]) % (2.0 * pi)
+        row = np.minimum((theta / pi * h).astype(np.int64), h - 1)
+        column = np.minimum((phi / (2.0 * pi) * w).astype(np.int64), w - 1)
+        return self._pdf(row, column, theta)
+
+    def _pdf(self, row: np.ndarray, column: np.ndarray, theta: np.ndarray) -> np.ndarray:
+        if self.total <= 0.0:
+            return np.zeros(row.shape)
+        h, w = self.weights.shape
+        # density over the unit square is weights * h * w / total, the lat-long map stretches it by 2 pi^2 sin(theta)
+        density = self.weights[row, column] * (h * w / self.total)
+        return density / (2.0 * pi * pi * np.maximum(np.sin(theta), 1e-8))
+
+
+def _directions(theta: np.ndarray, phi: np.ndarray) -> np.ndarray:
+    """
+    Unit directions for polar angle theta from +y and azimuth phi = atan2(z, x).
+    """
+    sin_theta = np.sin(theta)
+    return np.stack(np.broadcast_arrays(sin_theta * np.cos(phi), np.cos(theta), sin_theta * np.sin(phi)), axis=-1)
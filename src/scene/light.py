@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+import numpy as np
 
 from src.material.color import Color
 from src.math import Vertex
+from src.geometry.primitives.quad import Quad
 from enum import Enum
 from src.math import Vector
 from abc import ABC, abstractmethod
@@ -16,6 +18,7 @@ class LightType(Enum):
     DIRECTIONAL = "directional"
     SPOT = "spot"
     AREA = "area"
+    ENVIRONMENT = "environment"
 
 
 @dataclass
@@ -54,6 +57,32 @@ class Light(ABC):
         """
         pass
 
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Vectorized intensity_at. The default calls intensity_at for every point.
+
+        Args:
+            points (np.ndarray): (N, 3) array of points.
+
+        Returns:
+            np.ndarray: (N,) intensities.
+        """
+        return np.array([self.intensity_at(Vertex(p[0], p[1], p[2])) for p in points], dtype=np.float64).reshape(-1)
+
+    def influence_radius(self, threshold: float) -> float:
+        """
+        Conservative radius of the light's influence: beyond it intensity_at stays at or below threshold.
+
+        Args:
+            threshold (float): Intensity below which the light is considered to contribute nothing.
+
+        Returns:
+            float: Radius around the light's position, inf for lights that do not fall off with distance.
+        """
+        if self.intensity <= 0.0:
+            return 0.0
+        return float('inf')
+
     def translate(self, translation: Vector) -> None:
         """
         Translate the light's position by a given vector.
@@ -75,6 +104,9 @@ class PointLight(Light):
     def intensity_at(self, point: Vertex) -> float:
         return self.intensity
 
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        return np.full(points.shape[0], float(self.intensity))
+
     def get_color_at(self, point: Vertex) -> Color:
         return self.color
 
@@ -93,6 +125,18 @@ class PointLightFalloff(Light):
         r2 = dx * dx + dy * dy + dz * dz
         return self.intensity / max(r2, 1e-6)
 
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        offset = points - np.array([self.position.x, self.position.y, self.position.z])
+        return self.intensity / np.maximum(np.einsum("ij,ij->i", offset, offset), 1e-6)
+
+    def influence_radius(self, threshold: float) -> float:
+        # intensity / r^2 <= threshold for r >= sqrt(intensity / threshold)
+        if self.intensity <= 0.0:
+            return 0.0
+        if threshold <= 0.0:
+            return float('inf')
+        return (self.intensity / threshold) ** 0.5
+
     def get_color_at(self, point: Vertex) -> Color:
         return self.color
 
@@ -108,6 +152,9 @@ class AmbientLight(Light):
         # Ambient light has constant intensity everywhere
         return self.intensity
 
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        return np.full(points.shape[0], float(self.intensity))
+
     def get_color_at(self, point: Vertex) -> Color:
         return self.color
 
@@ -123,6 +170,9 @@ class DirectionalLight(Light):
         # Directional light has constant intensity everywhere
         return self.intensity
 
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        return np.full(points.shape[0], float(self.intensity))
+
     def get_color_at(self, point: Vertex) -> Color:
         return self.color
 
@@ -153,5 +203,148 @@ class SpotLight(Light):
 
         return self.intensity * spot_effect
 
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        offset = points - np.array([self.position.x, self.position.y, self.position.z])
+        length = np.sqrt(np.einsum("ij,ij->i", offset, offset))
+        spot_effect = offset @ np.array([self.direction.x, self.direction.y, self.direction.z]) / np.where(length < 1e-8, 1.0, length)
+        return np.where((length < 1e-8) | (spot_effect <= cos(self.angle)), 0.0, self.intensity * spot_effect)
+
+    def get_color_at(self, point: Vertex) -> Color:
+        return self.color
+@dataclass
+class AreaLight(Light):
+    """
+    Light emitted from a surface instead of a single point, which casts soft shadows.
+    Shaders that support area lights (BlinnPhongShader) treat it as shadow_samples point lights spread over the
+    surface with a low-discrepancy pattern, each carrying intensity / shadow_samples. The shadow-ray budget adapts:
+    min_shadow_samples rays are traced first, and only points where they disagree (the penumbra) trace the rest,
+    fully lit and fully shadowed points assume the remaining samples agree. Other shaders see a point light at position.
+    """
+    intensity: float = 1.0
+    type: LightType = LightType.AREA
+    shadow_samples: int = 16
+    min_shadow_samples: int = 4
+
+    def __post_init__(self):
+        if self.shadow_samples <= 0 or self.min_shadow_samples <= 0:
+            raise ValueError("Area light sample counts must be positive integers.")
+
+    def intensity_at(self, point: Vertex) -> float:
+        return self.intensity
+
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        return np.full(points.shape[0], float(self.intensity))
+
     def get_color_at(self, point: Vertex) -> Color:
-        return self.color
\ No newline at end of file
+        return self.color
+
+    @abstractmethod
+    def sample_points(self, points: np.ndarray, uv: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Map unit-square samples to points on the light, as seen from the shaded points.
+
+        Args:
+            points (np.ndarray): (N, 3) shaded points.
+            uv (np.ndarray): (N, S, 2) sample coordinates in [0, 1).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (N, S, 3) points on the light and (N, S) emission weights in [0, 1].
+        """
+        pass
+
+
+@dataclass
+class RectAreaLight(AreaLight):
+    """
+    Rectangular area light centered at position and spanned by edge_u and edge_v, sampled through Quad.
+    It emits towards edge_u x edge_v (downwards for the defaults), or to both sides with two_sided;
+    every sample is weighted by the cosine between the light's normal and the direction to the shaded point.
+    """
+    edge_u: Vector = field(default_factory=lambda: Vector(1.0, 0.0, 0.0))
+    edge_v: Vector = field(default_factory=lambda: Vector(0.0, 0.0, 1.0))
+    two_sided: bool = False
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._quad_key = None
+        # builds the quad once, which also rejects parallel edges
+        _ = self.quad
+
+    @property
+    def quad(self) -> Quad:
+        """
+        Quad covering the light, rebuilt when the position or the edges changed.
+        """
+        key = (self.position.x, self.position.y, self.position.z, self.edge_u.x, self.edge_u.y, self.edge_u.z,
+               self.edge_v.x, self.edge_v.y, self.edge_v.z)
+        if key != self._quad_key:
+            self._quad = Quad(corner=self.position - self.edge_u * 0.5 - self.edge_v * 0.5, edge_u=self.edge_u, edge_v=self.edge_v)
+            self._quad_key = key
+        return self._quad
+
+    def intensity_at(self, point: Vertex) -> float:
+        if self.two_sided or self.quad.unit_normal.dot(point - self.position) > 0.0:
+            return self.intensity
+        return 0.0
+
+    def intensity_at_batch(self, points: np.ndarray) -> np.ndarray:
+        if self.two_sided:
+            return np.full(points.shape[0], float(self.intensity))
+        front = (points - self.quad.corner_array) @ self.quad.normal_array > 0.0
+        return np.where(front, float(self.intensity), 0.0)
+
+    def sample_points(self, points: np.ndarray, uv: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        quad = self.quad
+        samples = quad.sample_points(uv.reshape(-1, 2)).reshape(uv.shape[0], uv.shape[1], 3)
+        to_point = points[:, None, :] - samples
+        length = np.sqrt(np.einsum("nsk,nsk->ns", to_point, to_point))
+        cosine = to_point @ quad.normal_array / np.where(length > 0.0, length, 1.0)
+        weights = np.abs(cosine) if self.two_sided else np.maximum(cosine, 0.0)
+        return samples, weights
+
+
+@dataclass
+class SphereAreaLight(AreaLight):
+    """
+    Spherical area light of the given radius around position.
+    Samples are spread over the cap of the sphere visible from the shaded point, uniformly in solid angle,
+    so all of them are unoccluded by the light itself and carry the same weight.
+    """
+    radius: float = 0.5
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.radius <= 0.0:
+            raise ValueError("Sphere light radius must be positive.")
+
+    def sample_points(self, points: np.ndarray, uv: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        center = np.array([self.position.x, self.position.y, self.position.z])
+        r = self.radius
+        axis = center - points
+        d = np.sqrt(np.einsum("nk,nk->n", axis, axis))
+        outside = d > r
+        axis = axis / np.where(d > 0.0, d, 1.0)[:, None]
+        axis[d <= 0.0] = (0.0, 0.0, 1.0)
+
+        # frame around the direction to the center
+        helper = np.where(np.abs(axis[:, :1]) < 0.9, np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0]))
+        tangent = np.cross(helper, axis)
+        tangent /= np.linalg.norm(tangent, axis=1)[:, None]
+        bitangent = np.cross(axis, tangent)
+
+        # cone of directions towards the visible cap; points inside the light sample the whole sphere
+        sin_max2 = np.where(outside, (r / np.where(outside, d, 1.0)) ** 2, 1.0)
+        cos_max = np.where(outside, np.sqrt(np.maximum(0.0, 1.0 - sin_max2)), -1.0)
+        cos_theta = 1.0 - uv[:, :, 0] * (1.0 - cos_max[:, None])
+        sin_theta = np.sqrt(np.maximum(0.0, 1.0 - cos_theta * cos_theta))
+        phi = 2.0 * pi * uv[:, :, 1]
+        directions = ((np.cos(phi) * sin_theta)[:, :, None] * tangent[:, None, :]
+                      + (np.sin(phi) * sin_theta)[:, :, None] * bitangent[:, None, :]
+                      + cos_theta[:, :, None] * axis[:, None, :])
+
+        # outside: nearest intersection of the sampled direction with the sphere; inside: the sphere point in that direction
+        dd = d[:, None]
+        t = dd * cos_theta - np.sqrt(np.maximum(0.0, r * r - dd * dd * sin_theta * sin_theta))
+        samples = np.where(outside[:, None, None], points[:, None, :] + directions * t[:, :, None],
+                           center + directions * r)
+        return samples, np.ones(uv.shape[:2])
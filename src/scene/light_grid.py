@@ -0,0 +1,155 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from math import floor, isfinite
+import numpy as np
+
+from src.math import Vertex
+from src.scene.light import Light
+
+# grid cells per axis are capped, so a few huge influence spheres cannot blow up the cell lists
+_MAX_CELLS_PER_AXIS = 64
+
+
+@dataclass
+class LightGrid:
+    """
+    Uniform grid over the influence spheres of lights (see Light.influence_radius), to find the lights that can
+    affect a point without looking at all of them.
+    Lights with a finite influence radius (PointLightFalloff) are listed in every grid cell their sphere overlaps;
+    lights without one (PointLight, SpotLight, ambient, directional) are kept in unbounded and checked with
+    intensity_at, which is zero outside a spot light's cone. A light reaches a point where its intensity is
+    above threshold, so lights_at returns exactly the lights a shader has to evaluate there.
+     - bounded / unbounded: lights with and without a finite influence sphere
+     - cell_start / cell_lights: lights of grid cell c are bounded[cell_lights[cell_start[c]:cell_start[c + 1]]]
+    """
+    threshold: float = 0.0
+    bounded: tuple[Light, ...] = ()
+    unbounded: tuple[Light, ...] = ()
+    centers: np.ndarray = field(default=None, repr=False)
+    radii: np.ndarray = field(default=None, repr=False)
+    origin: np.ndarray = field(default=None, repr=False)  # min corner of the grid
+    cell_size: float = 1.0
+    dims: tuple[int, int, int] = (0, 0, 0)
+    cell_start: np.ndarray = field(default=None, repr=False)
+    cell_lights: np.ndarray = field(default=None, repr=False)
+
+    def __post_init__(self):
+        # plain lists for the scalar lookup
+        self._spheres = [] if self.centers is None else [
+            (x, y, z, r * r) for (x, y, z), r in zip(self.centers.tolist(), self.radii.tolist())]
+        self._cell_start = [] if self.cell_start is None else self.cell_start.tolist()
+        self._cell_lights = [] if self.cell_lights is None else self.cell_lights.tolist()
+
+    @staticmethod
+    def build(lights, threshold: float) -> LightGrid:
+        """
+        Bin the influence spheres of the lights into a uniform grid.
+        The cell size is the median influence diameter, so a typical sphere overlaps a few cells.
+        :param lights: all lights of the scene
+        :param threshold: intensity at and below which a light contributes nothing
+        :return: LightGrid
+        """
+        if threshold < 0.0:
+            raise ValueError("Light influence threshold must not be negative.")
+        radius_of = [(light, light.influence_radius(threshold)) for light in lights]
+        bounded = [(light, r) for light, r in radius_of if isfinite(r) and r > 0.0]
+        unbounded = tuple(light for light, r in radius_of if not isfinite(r))
+        if not bounded:
+            return LightGrid(threshold=threshold, unbounded=unbounded)
+
+        centers = np.array([[light.position.x, light.position.y, light.position.z] for light, _ in bounded])
+        radii = np.array([r for _, r in bounded])
+        lo = (centers - radii[:, None]).min(axis=0)
+        hi = (centers + radii[:, None]).max(axis=0)
+        cell_size = max(2.0 * float(np.median(radii)), float((hi - lo).max()) / _MAX_CELLS_PER_AXIS, 1e-9)
+        dims = np.maximum(np.ceil((hi - lo) / cell_size).astype(np.int64), 1)
+
+        # every light is listed in the cells of its sphere's bounding box
+        first = np.clip(np.floor((centers - radii[:, None] - lo) / cell_size).astype(np.int64), 0, dims - 1)
+        last = np.clip(np.floor((centers + radii[:, None] - lo) / cell_size).astype(np.int64), 0, dims - 1)
+        pairs_cell, pairs_light = [], []
+        for k in range(len(bounded)):
+            ix, iy, iz = (np.arange(first[k, a], last[k, a] + 1) for a in range(3))
+            cells = ((ix[:, None, None] * dims[1] + iy[None, :, None]) * dims[2] + iz[None, None, :]).ravel()
+            pairs_cell.append(cells)
+            pairs_light.append(np.full(cells.size, k))
+        pairs_cell = np.concatenate(pairs_cell)
+        pairs_light = np.concatenate(pairs_light)
+        order = np.argsort(pairs_cell, kind="stable")
+        cell_start = np.zeros(int(dims.prod()) + 1, dtype=np.int64)
+        np.add.at(cell_start, pairs_cell + 1, 1)
+
+        return LightGrid(
+            threshold=threshold,
+            bounded=tuple(light for light, _ in bounded),
+            unbounded=unbounded,
+            centers=centers,
+            radii=radii,
+            origin=lo,
+            cell_size=cell_size,
+            dims=(int(dims[0]), int(dims[1]), int(dims[2])),
+            cell_start=np.cumsum(cell_start),
+            cell_lights=pairs_light[order],
+        )
+
+    def lights_at(self, point: Vertex) -> list[Light]:
+        """
+        Lights whose intensity at point is above the threshold.
+        :param point: shaded point
+        :return: lights in scene order of their groups, unbounded lights first
+        """
+        lights = [light for light in self.unbounded if light.intensity_at(point) > self.threshold]
+        if not self._spheres:
+            return lights
+        px, py, pz = point.x, point.y, point.z
+        ox, oy, oz = self.origin.tolist()
+        nx, ny, nz = self.dims
+        ix = floor((px - ox) / self.cell_size)
+        iy = floor((py - oy) / self.cell_size)
+        iz = floor((pz - oz) / self.cell_size)
+        if not (0 <= ix < nx and 0 <= iy < ny and 0 <= iz < nz):
+            return lights
+        cell = (ix * ny + iy) * nz + iz
+        for k in self._cell_lights[self._cell_start[cell]:self._cell_start[cell + 1]]:
+            cx, cy, cz, r2 = self._spheres[k]
+            dx, dy, dz = px - cx, py - cy, pz - cz
+            if dx * dx + dy * dy + dz * dz < r2:
+                lights.append(self.bounded[k])
+        return lights
+
+    def lights_at_batch(self, points: np.ndarray) -> list[tuple[Light, np.ndarray]]:
+        """
+        Vectorized lights_at, grouped by light.
+        :param points: (N, 3) shaded points
+        :return: (light, rows) for every light that reaches at least one point, rows index into points
+        """
+        groups = []
+        for light in self.unbounded:
+            rows = np.flatnonzero(light.intensity_at_batch(points) > self.threshold)
+            if rows.size:
+                groups.append((light, rows))
+        if not self._spheres or points.shape[0] == 0:
+            return groups
+
+        dims = np.array(self.dims)
+        index = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        inside = np.all((index >= 0) & (index < dims), axis=1)
+        rows = np.flatnonzero(inside)
+        cells = (index[rows, 0] * dims[1] + index[rows, 1]) * dims[2] + index[rows, 2]
+
+        # (point, light) candidate pairs from the cell lists
+        counts = self.cell_start[cells + 1] - self.cell_start[cells]
+        pair_rows = np.repeat(rows, counts)
+        offsets = np.arange(pair_rows.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_lights = self.cell_lights[np.repeat(self.cell_start[cells], counts) + offsets]
+
+        offset = points[pair_rows] - self.centers[pair_lights]
+        reach = np.einsum("ij,ij->i", offset, offset) < self.radii[pair_lights] ** 2
+        pair_rows, pair_lights = pair_rows[reach], pair_lights[reach]
+
+        order = np.argsort(pair_lights, kind="stable")
+        pair_rows, pair_lights = pair_rows[order], pair_lights[order]
+        lights, starts = np.unique(pair_lights, return_index=True)
+        for k, rows in zip(lights, np.split(pair_rows, starts[1:])):
+            groups.append((self.bounded[k], rows))
+        return groups
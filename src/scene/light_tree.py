@@ -0,0 +1,193 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from math import sqrt
+import numpy as np
+
+from src.math import Vertex, Vector
+from src.scene.light import Light, PointLight, PointLightFalloff, SpotLight
+
+# lights the tree can sample, all of them emit from a single position
+TREE_LIGHT_TYPES = (PointLight, PointLightFalloff, SpotLight)
+
+
+def light_power(light: Light) -> float:
+    """
+    Scalar emitted power used to rank lights: intensity times the luminance of the light color.
+    """
+    r, g, b = light.color.as_rgb()
+    return max(light.intensity, 0.0) * max(0.2126 * r + 0.7152 * g + 0.0722 * b, 0.0)
+
+
+@dataclass
+class LightTree:
+    """
+    Binary tree over the positions of point and spot lights, for picking a few lights per hit instead of all of them.
+    Every node bounds its lights with a sphere and stores their total power, split into lights without falloff
+    (PointLight, SpotLight) and lights whose intensity falls off as 1 / r^2 (PointLightFalloff).
+    A light is sampled by walking down from the root, choosing each child with probability proportional to its
+    estimated contribution at the shaded point: power / distance^2 for falloff lights, times a bound on the cosine
+    between the surface normal and the directions into the child's sphere. Children behind the surface are never chosen.
+    Lights of other types (ambient, directional) are not in the tree and are kept in others for exact evaluation.
+     - lights: sampled lights, leaf k of the tree holds lights[k]
+     - others: lights that are always evaluated
+    """
+    lights: tuple[Light, ...] = ()
+    others: tuple[Light, ...] = ()
+    node_center: np.ndarray = field(default=None, repr=False)
+    node_radius: np.ndarray = field(default=None, repr=False)
+    node_power: np.ndarray = field(default=None, repr=False)          # lights without falloff
+    node_falloff_power: np.ndarray = field(default=None, repr=False)  # 1 / r^2 lights
+    node_children: np.ndarray = field(default=None, repr=False)       # (M, 2) left and right child, -1 for leaves
+    node_light: np.ndarray = field(default=None, repr=False)          # index into lights for leaves, -1 otherwise
+
+    def __post_init__(self):
+        # the same nodes as plain tuples, scalar sampling reads them without NumPy overhead
+        self._nodes = [] if self.node_center is None else list(zip(
+            self.node_center.tolist(), self.node_radius.tolist(), self.node_power.tolist(),
+            self.node_falloff_power.tolist(), self.node_children.tolist(), self.node_light.tolist()))
+
+    @staticmethod
+    def build(lights) -> LightTree:
+        """
+        Build the tree with median splits along the widest axis of the light positions.
+        :param lights: all lights of the scene
+        :return: LightTree
+        """
+        tree_lights = [light for light in lights if isinstance(light, TREE_LIGHT_TYPES)]
+        others = tuple(light for light in lights if not isinstance(light, TREE_LIGHT_TYPES))
+        if not tree_lights:
+            return LightTree(others=others)
+
+        positions = np.array([[light.position.x, light.position.y, light.position.z] for light in tree_lights])
+        power = np.array([light_power(light) for light in tree_lights])
+        falloff = np.array([isinstance(light, PointLightFalloff) for light in tree_lights])
+
+        count = 2 * len(tree_lights) - 1
+        center = np.zeros((count, 3))
+        radius = np.zeros(count)
+        node_power = np.zeros(count)
+        node_falloff_power = np.zeros(count)
+        children = np.full((count, 2), -1, dtype=np.int64)
+        node_light = np.full(count, -1, dtype=np.int64)
+        order = []
+
+        def build_node(members: np.ndarray) -> int:
+            node = build_node.next
+            build_node.next += 1
+            lo, hi = positions[members].min(axis=0), positions[members].max(axis=0)
+            center[node] = 0.5 * (lo + hi)
+            radius[node] = 0.5 * float(np.linalg.norm(hi - lo))
+            node_power[node] = power[members][~falloff[members]].sum()
+            node_falloff_power[node] = power[members][falloff[members]].sum()
+            if members.size == 1:
+                node_light[node] = len(order)
+                order.append(tree_lights[members[0]])
+                return node
+            axis = int(np.argmax(hi - lo))
+            middle = members.size // 2
+            members = members[np.argsort(positions[members, axis], kind="stable")]
+            children[node, 0] = build_node(members[:middle])
+            children[node, 1] = build_node(members[middle:])
+            return node
+
+        build_node.next = 0
+        build_node(np.arange(len(tree_lights)))
+
+        return LightTree(lights=tuple(order), others=others, node_center=center, node_radius=radius,
+                         node_power=node_power, node_falloff_power=node_falloff_power, node_children=children,
+                         node_light=node_light)
+
+    def _importance(self, node: int, px: float, py: float, pz: float, nx: float, ny: float, nz: float) -> float:
+        (cx, cy, cz), r, power, falloff_power, _, _ = self._nodes[node]
+        vx, vy, vz = cx - px, cy - py, cz - pz
+        d2 = vx * vx + vy * vy + vz * vz
+        importance = power + falloff_power / max(d2, r * r, 1e-6)
+        if d2 <= r * r:
+            return importance
+        # largest cosine between the normal and a direction into the node's bounding sphere
+        d = sqrt(d2)
+        cos_theta = (nx * vx + ny * vy + nz * vz) / d
+        sin_alpha = r / d
+        cos_alpha = sqrt(max(0.0, 1.0 - sin_alpha * sin_alpha))
+        if cos_theta >= cos_alpha:
+            return importance
+        cos_bound = cos_theta * cos_alpha + sqrt(max(0.0, 1.0 - cos_theta * cos_theta)) * sin_alpha
+        return importance * cos_bound if cos_bound > 0.0 else 0.0
+
+    def sample(self, point: Vertex, normal: Vector, u: float) -> tuple[int, float]:
+        """
+        Pick one light for a shaded point.
+        :param point: shaded point
+        :param normal: surface normal facing the viewer
+        :param u: uniform random number in [0, 1), reused for every level of the tree
+        :return: (index into lights, probability of that choice), (-1, 0.0) if no light can reach the point
+        """
+        if not self._nodes:
+            return -1, 0.0
+        px, py, pz, nx, ny, nz = point.x, point.y, point.z, normal.x, normal.y, normal.z
+        node, pdf = 0, 1.0
+        while True:
+            (left, right), light = self._nodes[node][4], self._nodes[node][5]
+            if light >= 0:
+                return (light, pdf) if self._importance(node, px, py, pz, nx, ny, nz) > 0.0 else (-1, 0.0)
+            w_left = self._importance(left, px, py, pz, nx, ny, nz)
+            w_right = self._importance(right, px, py, pz, nx, ny, nz)
+            total = w_left + w_right
+            if total <= 0.0:
+                return -1, 0.0
+            p_left = w_left / total
+            if u < p_left:
+                node, pdf, u = left, pdf * p_left, u / p_left
+            else:
+                node, pdf, u = right, pdf * (1.0 - p_left), (u - p_left) / (1.0 - p_left)
+
+    def _importance_batch(self, nodes: np.ndarray, points: np.ndarray, normals: np.ndarray) -> np.ndarray:
+        """
+        Vectorized _importance for one node per point.
+        """
+        v = self.node_center[nodes] - points
+        r2 = self.node_radius[nodes] ** 2
+        d2 = np.einsum("ij,ij->i", v, v)
+        importance = self.node_power[nodes] + self.node_falloff_power[nodes] / np.maximum(np.maximum(d2, r2), 1e-6)
+
+        d = np.sqrt(np.maximum(d2, 1e-300))
+        cos_theta = np.einsum("ij,ij->i", normals, v) / d
+        sin_alpha = np.minimum(np.sqrt(r2) / d, 1.0)
+        cos_alpha = np.sqrt(1.0 - sin_alpha * sin_alpha)
+        cos_bound = cos_theta * cos_alpha + np.sqrt(np.maximum(0.0, 1.0 - cos_theta * cos_theta)) * sin_alpha
+        cos_bound = np.where((d2 <= r2) | (cos_theta >= cos_alpha), 1.0, np.maximum(cos_bound, 0.0))
+        return importance * cos_bound
+
+    def sample_batch(self, points: np.ndarray, normals: np.ndarray, u: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized sample, all points walk down the tree together.
+        :param points: (N, 3) shaded points
+        :param normals: (N, 3) surface normals facing the viewer
+        :param u: (N,) uniform random numbers in [0, 1)
+        :return: (index into lights, probability) - (N,) ints with -1 where no light can reach, (N,) floats
+        """
+        n = points.shape[0]
+        if not self._nodes:
+            return np.full(n, -1, dtype=np.int64), np.zeros(n)
+        nodes = np.zeros(n, dtype=np.int64)
+        pdf = np.ones(n)
+        u = np.array(u, dtype=np.float64)
+        active = np.flatnonzero(self.node_light[nodes] < 0)
+        while active.size:
+            left, right = self.node_children[nodes[active], 0], self.node_children[nodes[active], 1]
+            w_left = self._importance_batch(left, points[active], normals[active])
+            w_right = self._importance_batch(right, points[active], normals[active])
+            total = w_left + w_right
+            p_left = np.divide(w_left, total, out=np.zeros_like(total), where=total > 0.0)
+            go_left = u[active] < p_left
+            chosen = np.where(go_left, p_left, 1.0 - p_left)
+            pdf[active] *= np.where(total > 0.0, chosen, 0.0)
+            u[active] = np.where(go_left, u[active] / np.where(go_left, p_left, 1.0),
+                                 (u[active] - p_left) / np.where(go_left, 1.0, np.maximum(1.0 - p_left, 1e-300)))
+            nodes[active] = np.where(go_left, left, right)
+            active = active[(total > 0.0) & (self.node_light[nodes[active]] < 0)]
+
+        # a single light at the root, or a leaf behind the surface
+        reachable = pdf > 0.0
+        reachable[reachable] = self._importance_batch(nodes[reachable], points[reachable], normals[reachable]) > 0.0
+        return np.where(reachable, self.node_light[nodes], -1), np.where(reachable, pdf, 0.0)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 from dataclasses import dataclass
+import numpy as np
 
 from src.math import Vertex
+from src.math.batch import batch_normalize
 from src.geometry.primitive import Primitive
+from src.geometry.geometry_hit import GeometryHit
 from src.material.material.material import Material
-from src.geometry.ray import Ray, transform_point
+from src.geometry.ray import Ray
 from src.scene.surface_interaction import SurfaceInteraction
-from src.scene.transform import Transform, transform_normal
+from src.scene.transform import Transform
 
 
 @dataclass
@@ -17,42 +20,150 @@ class Object:
     geometry: Primitive
     material: Material
     transform: Transform | None = None
+    static: bool = True  # False for objects whose transform is replaced between frames, they are never baked
 
     def __post_init__(self):
         if self.transform is None:
             self.transform = Transform.identity()
 
+    def baked(self) -> Object:
+        """
+        Copy of the object with its transform moved into world-space geometry, so intersections run in world space
+        without transforming rays. The copy gets a new world-space primitive (shared primitives are not modified)
+        and an identity transform; the object itself is left untouched. Scene.compile bakes through this.
+        :return: new object with an identity transform, or self if the transform cannot be baked
+        """
+        if self.transform.is_identity or not self.static:
+            return self
+        geometry = self.geometry.bake(self.transform)
+        if geometry is None:
+            return self
+        return Object(geometry=geometry, material=self.material, static=self.static)
+
+    def bounds(self) -> np.ndarray | None:
+        """
+        World-space axis-aligned bounding box, the corners of the geometry's box moved by the transform.
+        :return: (2, 3) array [min corner, max corner], or None for unbounded geometry
+        """
+        local = self.geometry.bounds()
+        if local is None:
+            return None
+        lo, hi = local
+        if self.transform.is_identity:
+            return np.array([[lo.x, lo.y, lo.z], [hi.x, hi.y, hi.z]])
+        corners = np.array([[x, y, z] for x in (lo.x, hi.x) for y in (lo.y, hi.y) for z in (lo.z, hi.z)])
+        matrix = self.transform.matrix
+        world = corners @ matrix[:3, :3].T + matrix[:3, 3]
+        return np.array([world.min(axis=0), world.max(axis=0)])
+
     def intersect(self, ray: Ray, t_min=0.001, t_max=float("inf")):
         """
         Intersect the ray with the object's geometry, applying inverse transformation if necessary.
         Transforms the ray into object local space, performs intersection there, then transforms
         the hit point and normal back to world space.
+        Identity and pure translation transforms skip the matrix work, other transforms use the
+        transform's precomputed float rows instead of NumPy.
         :param ray: Ray to intersect with the object
         :param t_min: minimum valid distance for intersection
         :param t_max: maximum valid distance for intersection
         :return: SurfaceInteraction if hit occurs, else None
         """
-        world_ray = ray
-        ray = ray.transformed(self.transform.inverse)
+        transform = self.transform
 
-        geom_hit = self.geometry.intersect(ray, t_min, t_max)
+        if transform.is_identity:
+            geom_hit = self.geometry.intersect(ray, t_min, t_max)
+            if geom_hit is None:
+                return None
+            geom_hit.normal = geom_hit.normal.normalize()
+            return SurfaceInteraction(geom=geom_hit, material=self.geometry.material_at(geom_hit, self.material))
+
+        if transform.is_translation:
+            # distances are unchanged by a translation, only the origin and the hit point move
+            offset = transform.translation
+            geom_hit = self.geometry.intersect(Ray(ray.origin - offset, ray.direction), t_min, t_max)
+            if geom_hit is None:
+                return None
+            material = self.geometry.material_at(geom_hit, self.material)
+            geom_hit.point = Vertex(geom_hit.point.x + offset.x, geom_hit.point.y + offset.y, geom_hit.point.z + offset.z)
+            geom_hit.normal = geom_hit.normal.normalize()
+            return SurfaceInteraction(geom=geom_hit, material=material)
+
+        local_ray = Ray(transform.apply_inverse_point(ray.origin), transform.apply_inverse_vector(ray.direction))
+
+        geom_hit = self.geometry.intersect(local_ray, t_min, t_max)
         if geom_hit is None:
             return None
+        material = self.geometry.material_at(geom_hit, self.material)
+
+        geom_hit.point = transform.apply_point(geom_hit.point)
+        geom_hit.dist = (geom_hit.point - ray.origin).norm()
+        geom_hit.normal = transform.apply_normal(geom_hit.normal)
+
+        return SurfaceInteraction(geom=geom_hit, material=material)
+
+    def intersect_from(self, ray: Ray, origin_terms, t_min=0.001, t_max=float("inf")) -> SurfaceInteraction | None:
+        """
+        Intersect a ray whose origin terms were precomputed with geometry.origin_terms(ray.origin), see Primitive.intersect_from.
+        Only valid for objects with an identity transform, whose geometry sees the world-space ray unchanged.
+        """
+        geom_hit = self.geometry.intersect_from(ray, origin_terms, t_min, t_max)
+        if geom_hit is None:
+            return None
+        geom_hit.normal = geom_hit.normal.normalize()
+        return SurfaceInteraction(geom=geom_hit, material=self.geometry.material_at(geom_hit, self.material))
+
+    def material_at(self, geom_hit: GeometryHit) -> Material:
+        """
+        Material of a world-space hit on the object, see Primitive.material_at.
+        Only geometry with per-element materials needs the hit, it is moved to local space when it carries no element index.
+        """
+        if not self.geometry.per_element_materials:
+            return self.material
+        if geom_hit.element is None and not self.transform.is_identity:
+            geom_hit = GeometryHit(dist=geom_hit.dist, point=self.transform.apply_inverse_point(geom_hit.point),
+                                   normal=geom_hit.normal, front_face=geom_hit.front_face)
+        return self.geometry.material_at(geom_hit, self.material)
+
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray, t_min=0.001, t_max=float("inf")
+                        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Batch version of intersect. Transforms all rays into object local space with one matrix product,
+        intersects them with the geometry's batch kernel and transforms hit points and normals back to world space.
+        :param origins: (N, 3) array of world-space ray origins
+        :param directions: (N, 3) array of normalized world-space ray directions
+        :param t_min: minimum valid distance for intersection
+        :param t_max: maximum valid distance for intersection
+        :return: (dist, points, normals) - (N,) world distances with inf on miss, (N, 3) world hit points and unit normals
+        """
+        if self.transform.is_identity:
+            dist, normals = self.geometry.intersect_batch(origins, directions, t_min, t_max)
+            points = origins + directions * np.where(np.isfinite(dist), dist, 0.0)[:, None]
+            return dist, points, batch_normalize(normals)
+
+        inverse = self.transform.inverse
+        local_origins = origins @ inverse[:3, :3].T + inverse[:3, 3]
+        # local ray directions are re-normalized, same as Ray does after transformed()
+        local_directions = batch_normalize(directions @ inverse[:3, :3].T)
+
+        local_dist, local_normals = self.geometry.intersect_batch(local_origins, local_directions, t_min, t_max)
+        hit = np.isfinite(local_dist)
 
-        geom_hit.point = transform_point(self.transform.matrix, geom_hit.point)
-        geom_hit.dist = (geom_hit.point - world_ray.origin).norm()
-        geom_hit.normal = transform_normal(self.transform.inverse_T, geom_hit.normal).normalize()
+        local_points = local_origins + local_directions * np.where(hit, local_dist, 0.0)[:, None]
+        matrix = self.transform.matrix
+        points = local_points @ matrix[:3, :3].T + matrix[:3, 3]
 
-        return SurfaceInteraction(geom=geom_hit, material=self.material)
+        dist = np.where(hit, np.linalg.norm(points - origins, axis=1), np.inf)
+        normals = batch_normalize(local_normals @ self.transform.inverse_T[:3, :3].T)
+        return dist, points, normals
 
     def normal_at(self, point: Vertex) -> Vertex:
         """
         Compute surface normal at a world-space point.
         Transforms point to local space, queries geometry, transforms normal back.
         """
-        local_point = transform_point(self.transform.inverse, point)
+        local_point = self.transform.apply_inverse_point(point)
         local_normal = self.geometry.normal_at(local_point)
-        return transform_normal(self.transform.inverse_T, local_normal).normalize()
+        return self.transform.apply_normal(local_normal)
 
     def translate(self, x: float, y: float, z: float) -> Object:
         self.transform = self.transform.combine(Transform.translate(x, y, z))
@@ -1,11 +1,16 @@
 from dataclasses import dataclass, field
+import numpy as np
 from src.geometry.ray import Ray
+from src.geometry.geometry_hit import GeometryHit
 from src.scene.camera.camera import Camera
 from src.scene.light import Light, LightType
 from src.math import Vector
 from src.math import Vertex
 from pathlib import Path
 from src.scene.object import Object
+from src.scene.compiled_scene import CompiledScene, cached_light_structure
+from src.scene.light_tree import LightTree
+from src.scene.light_grid import LightGrid
 from src.scene.surface_interaction import SurfaceInteraction
 
 
@@ -15,6 +20,15 @@ class Scene:
     lights: list[Light] = field(default_factory=list)
     objects: list[Object] = field(default_factory=list)
     skybox: str | None = None # path to skybox texture HDR or "black", "white", or "sky" for built-in options
+    # skybox object resolved from the skybox value above, see background()
+    _background: object = field(default=None, init=False, repr=False, compare=False)
+    _background_source: object = field(default=None, init=False, repr=False, compare=False)
+    # last snapshot of compile() and the compiled form of every object, see compile()
+    _compiled: CompiledScene | None = field(default=None, init=False, repr=False, compare=False)
+    _compiled_objects: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    # light trees of light_tree() keyed by the light instances they were built from, same for the grids of light_grid()
+    _light_trees: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _light_grids: dict = field(default_factory=dict, init=False, repr=False, compare=False)
 
 
     def __str__(self) -> str:
@@ -98,6 +112,131 @@ class Scene:
 
         return closest_hit
 
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray
+                        ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Intersect a batch of rays with the scene's objects, keeping the closest hit per ray.
+        Objects are tested in the same order as in intersect, so ties resolve to the same object.
+        :param origins: (N, 3) array of ray origins
+        :param directions: (N, 3) array of normalized ray directions
+        :return: (dist, object_ids, points, normals) - (N,) distances with inf on miss, (N,) indices into self.objects
+                 with -1 on miss, (N, 3) hit points and (N, 3) unit normals
+        """
+        n = origins.shape[0]
+        closest_distance = np.full(n, np.inf)
+        object_ids = np.full(n, -1, dtype=np.int64)
+        points = np.zeros((n, 3))
+        normals = np.zeros((n, 3))
+
+        for index, obj in enumerate(self.get_objects()):
+            dist, obj_points, obj_normals = obj.intersect_batch(origins, directions)
+            closer = dist < closest_distance
+            if not closer.any():
+                continue
+            closest_distance[closer] = dist[closer]
+            object_ids[closer] = index
+            points[closer] = obj_points[closer]
+            normals[closer] = obj_normals[closer]
+
+        return closest_distance, object_ids, points, normals
+
+    def surface_interaction(self, object_id: int, dist: float, point: np.ndarray, normal: np.ndarray,
+                            direction: np.ndarray) -> SurfaceInteraction:
+        """
+        Build the SurfaceInteraction for one row of an intersect_batch result, so batch hits can be shaded by any LocalShading.
+        :param object_id: index of the hit object in self.objects
+        :param dist: distance along the ray
+        :param point: (3,) hit point
+        :param normal: (3,) unit normal facing against the ray
+        :param direction: (3,) ray direction
+        :return: SurfaceInteraction equivalent to the one returned by intersect
+        """
+        geom = GeometryHit(
+            dist=float(dist),
+            point=Vertex(float(point[0]), float(point[1]), float(point[2])),
+            normal=Vector(float(normal[0]), float(normal[1]), float(normal[2])),
+            front_face=float(normal @ direction) < 0.0,
+        )
+        return SurfaceInteraction(geom=geom, material=self.objects[object_id].material_at(geom))
+
+    def compile(self, bake_transforms: bool = True) -> CompiledScene:
+        """
+        Build an immutable render-ready snapshot of the scene, see CompiledScene.
+        Recompilation is incremental: objects whose geometry, transform, material and static flag are the same
+        instances as last time reuse their compiled (baked) form, and the geometry tables are only rebuilt
+        when an object changed. Replacing any of them (which translate/scale/rotate do) is detected automatically;
+        after editing a primitive in place, call mark_dirty.
+        :param bake_transforms: bake transforms of static objects into world-space geometry, without modifying the scene
+        :return: CompiledScene
+        """
+        compiled_objects = {}
+        objects = []
+        # unbaked objects compile to themselves, so a changed transform or material is only seen in their state
+        rebuilt = False
+        for obj in self.get_objects():
+            state = (obj.geometry, obj.transform, obj.material, obj.static, bake_transforms)
+            entry = self._compiled_objects.get(id(obj))
+            if entry is None or entry[0] is not obj or any(a is not b for a, b in zip(entry[1], state)):
+                entry = (obj, state, obj.baked() if bake_transforms else obj)
+                rebuilt = True
+            compiled_objects[id(obj)] = entry
+            objects.append(entry[2])
+        self._compiled_objects = compiled_objects
+        objects = tuple(objects)
+
+        previous = self._compiled
+        unchanged = not rebuilt and previous is not None and len(previous.objects) == len(objects) and all(
+            a is b for a, b in zip(previous.objects, objects))
+        self._compiled = CompiledScene.build(
+            camera=self.camera,
+            objects=objects,
+            lights=tuple(self.lights),
+            skybox=self.skybox,
+            resolved_skybox=self.background(),
+            geometry=previous.geometry if unchanged else None,
+        )
+        return self._compiled
+
+    def mark_dirty(self, obj: Object | None = None) -> None:
+        """
+        Force compile() to rebuild an object (or all objects) that was edited in place, e.g. with Triangle.translate.
+        The cached invariants of the edited geometry are recomputed as well (see Primitive.refresh),
+        and the light tree and grids are rebuilt on next use, so lights moved in place are picked up too.
+        :param obj: edited object, None for the whole scene
+        """
+        if obj is None:
+            for edited in self.objects:
+                edited.geometry.refresh()
+            self._compiled_objects.clear()
+        else:
+            obj.geometry.refresh()
+            self._compiled_objects.pop(id(obj), None)
+        self._compiled = None
+        self._light_trees.clear()
+        self._light_grids.clear()
+
+    def material_ids(self) -> np.ndarray:
+        """
+        Number the distinct materials of the scene in order of first use.
+        Objects sharing one material instance get the same id.
+        :return: (len(objects),) int array, material id of every object
+        """
+        ids: dict[int, int] = {}
+        return np.array([ids.setdefault(id(obj.material), len(ids)) for obj in self.get_objects()], dtype=np.int64)
+
+    def background(self):
+        """
+        Skybox object for the current skybox value, resolved once instead of on every missed ray.
+        It is resolved again when scene.skybox is reassigned.
+        :return: object with color_from_dir(direction) and colors_from_dirs((N, 3) directions)
+        """
+        if self._background is None or self._background_source is not self.skybox:
+            # lazy import, skybox imports the top-level package
+            from src.scene.skybox import resolve_skybox
+            self._background = resolve_skybox(self.skybox)
+            self._background_source = self.skybox
+        return self._background
+
     def get_objects(self) -> list[Object]:
         """
         Get all objects in the scene.
@@ -230,6 +369,27 @@ class Scene:
                 return light
         return None
 
+    def light_tree(self, lights=None) -> LightTree:
+        """
+        Light tree for many-light sampling, see LightTree.
+        Trees are cached by the light instances they hold and rebuilt when lights are added or removed;
+        after moving a light in place, call mark_dirty.
+        Render loops sample from CompiledScene.light_tree, which is built fresh for every render.
+        :param lights: lights to build the tree over, the scene's lights if None
+        :return: LightTree
+        """
+        return cached_light_structure(self._light_trees, self.lights if lights is None else lights, LightTree.build)
+
+    def light_grid(self, threshold: float, lights=None) -> LightGrid:
+        """
+        Grid over the influence volumes of lights, see LightGrid. Cached like light_tree.
+        :param threshold: intensity at and below which a light contributes nothing
+        :param lights: lights to build the grid over, the scene's lights if None
+        :return: LightGrid
+        """
+        return cached_light_structure(self._light_grids, self.lights if lights is None else lights,
+                                      lambda group: LightGrid.build(group, threshold), threshold)
+
     def validate(self) -> None:
         """
         Validate the scene configuration.
@@ -1,148 +1,180 @@
 from __future__ import annotations
 import math
+import os
+from pathlib import Path
 import numpy as np
 from src import Color
 from src.math.vec3 import Vec3
+from src.math.batch import batch_normalize
+
+
+def _parse_hdr_header(raw: bytes) -> tuple[int, int, bool, bool, int]:
+    """
+    Parse the Radiance header and resolution line.
+    :param raw: whole file content
+    :return: (height, width, flip_y, flip_x, offset of the first scanline)
+    """
+    # header lines end with an empty line
+    end = raw.find(b"\n\n")
+    if end < 0:
+        raise Exception("End of file before HDR header")
+
+    header = raw[:end].decode("ascii", errors="ignore").splitlines()
+    # check first line for valid signature
+    if not header or header[0].strip() != "#?RADIANCE":
+        raise Exception("Not a valid HDR file.")
+
+    # after header, expect resolution line: -Y height +X width (or +Y -X) in format 4 tokens
+    res_end = raw.find(b"\n", end + 2)
+    if res_end < 0:
+        raise Exception("Unexpected data after HDR header.")
+    res = raw[end + 2:res_end].decode("ascii", errors="ignore").strip().split()
+
+    # sanity checks
+    if len(res) != 4:
+        raise Exception("Unexpected data after HDR header.")
+
+    if res[0] not in ("-Y", "+Y") or res[2] not in ("-X", "+X"):
+        raise Exception("Doesnt contain valid HDR resolution info.")
+
+    # flip flags for vertical and horizontal flip based on + or - in resolution line
+    return int(res[1]), int(res[3]), res[0] == "+Y", res[2] == "-X", res_end + 1
+
+
+def _decode_rle(raw: bytes, offset: int, hdr_height: int, hdr_width: int) -> np.ndarray:
+    """
+    Decode new-style RLE scanlines into an (H, 4, W) uint8 array of R, G, B, E planes.
+    Only the positions of the run count bytes are found in Python, since each one depends on the previous run;
+    run lengths, output positions and the byte copy itself are done with array operations.
+    """
+    # position of every count byte in raw
+    heads: list[int] = []
+    append = heads.append
+
+    pos = offset
+    size = len(raw)
+    try:
+        for _ in range(hdr_height):
+            # every scanline starts with 2, 2, width high byte, width low byte
+            if pos + 4 > size:
+                raise Exception("Header too short for scanline.")
+            if raw[pos] != 2 or raw[pos + 1] != 2:
+                raise Exception("HDR scanline not RLE encoded.")
+            if (raw[pos + 2] << 8 | raw[pos + 3]) != hdr_width:
+                raise Exception("HDR scanline width mismatch.")
+            pos += 4
+
+            # four channels (R, G, B, E), each RLE encoded over the full width
+            for _c in range(4):
+                x = 0
+                while x < hdr_width:
+                    count = raw[pos]
+                    append(pos)
+                    if count > 128:
+                        # 128-255 is a run: one value repeated count-128 times
+                        x += count - 128
+                        pos += 2
+                    else:
+                        # 0-128 is a literal of count values
+                        x += count
+                        pos += 1 + count
+                if x != hdr_width:
+                    raise Exception("HDR run longer than the scanline.")
+            if pos > size:
+                raise Exception("Unexpected EOF in scanline.")
+    except IndexError:
+        # a count byte past the end of the file
+        raise Exception("Unexpected EOF in scanline.")
+
+    data = np.frombuffer(raw, dtype=np.uint8)
+    heads_arr = np.asarray(heads, dtype=np.int64)
+    counts = data[heads_arr].astype(np.int64)
+    repeat = counts > 128
+    lengths = np.where(repeat, counts - 128, counts)
+
+    # offset of every output byte inside its run, 0 for repeated runs so they keep reading the same byte
+    out_starts = np.cumsum(lengths) - lengths
+    within = np.arange(int(lengths.sum()), dtype=np.int64) - np.repeat(out_starts, lengths)
+    within *= np.repeat(~repeat, lengths)
+    src_index = np.repeat(heads_arr + 1, lengths) + within
+
+    return data[src_index].reshape(hdr_height, 4, hdr_width)
 
 
 def hdr_to_ndarray(path: str) -> np.ndarray:
     """
     Reads and transforms an HDR image file to a numpy ndarray of shape (H, W, 3) with float32 RGB values. Handles RLE decoding
     and transforms from RGBE to linear RGB. Supports vertical and horizontal flipping based on HDR header info.
+    The file is read in one go and decoded with array operations, see _decode_rle.
     param path: Path to HDR image file
     return: numpy ndarray of shape (H, W, 3) with float32 RGB values
     """
     with open(path, "rb") as f:
-        # header buffer
-        header = []
-
-        # read header lines until empty line
-        i = 0
-        while True:
-            line = f.readline()
-            if not line:
-                raise Exception("End of file before HDR header")
-            # gets rid of non-ascii characters and trailing whitespace
-            line = line.decode("ascii", errors="ignore").strip()
-            # check first line for valid signature
-            if i == 0 and line != "#?RADIANCE":
-                raise Exception("Not a valid HDR file.")
-            # empty line indicates end of header
-            if line == "":
-                break
-            # store header lines
-            header.append(line)
-            i += 1
-
-        # after header, expect resolution line: -Y height +X width (or +Y -X) in format 4 tokens
-        res = f.readline().decode("ascii", errors="ignore").strip().split()
-
-        # sanity checks
-        if len(res) != 4:
-            raise Exception("Unexpected data after HDR header.")
-
-        if res[0] not in ("-Y", "+Y") or res[2] not in ("-X", "+X"):
-            raise Exception("Doesnt contain valid HDR resolution info.")
-
-        # gets hdr width and height can be in value from 1 to 65535
-        hdr_height = int(res[1])
-        hdr_width = int(res[3])
-
-        # flip flags for vertical and horizontal flip based on + or - in resolution line
-        flip_y = (res[0] == "+Y")
-        flip_x = (res[2] == "-X")
-
-        # allocate data array
-        data = np.zeros((hdr_height, hdr_width, 3), dtype=np.float32)
-
-        # scan each line of height
-        for y in range(hdr_height):
-            # read scanline header every time (4 bytes) starting with 2, 2
-            scan_head = f.read(4)
-
-            # sanity checks
-            if len(scan_head) != 4:
-                raise Exception("Header too short for scanline.")
+        raw = f.read()
 
-            # must be RLE encoded
-            if scan_head[0] != 2 or scan_head[1] != 2:
-                raise Exception("HDR scanline not RLE encoded.")
-
-            # second two bytes are width high byte, low byte (should match hdr_width)
-            w_hi, w_lo = scan_head[2], scan_head[3]
+    hdr_height, hdr_width, flip_y, flip_x, offset = _parse_hdr_header(raw)
 
-            # sanity check width match
-            if (w_hi << 8 | w_lo) != hdr_width:
-                raise Exception("HDR scanline width mismatch.")
+    # widths outside 8..32767 can't be RLE encoded and are stored as flat RGBE pixels
+    if 8 <= hdr_width <= 0x7fff and raw[offset:offset + 2] == b"\x02\x02":
+        rgbe = _decode_rle(raw, offset, hdr_height, hdr_width).transpose(0, 2, 1)
+    else:
+        flat = np.frombuffer(raw, dtype=np.uint8, count=hdr_height * hdr_width * 4, offset=offset)
+        rgbe = flat.reshape(hdr_height, hdr_width, 4)
 
-            # check all four channels (R, G, B, E) and decode each one
-            chan = [np.zeros(hdr_width, dtype=np.uint8) for _ in range(4)]  # for r, g, b, e
+    # hdr stores pixel = (R/256, G/256, B/256) * 2^(E-128), zero exponent means black
+    exponent = rgbe[..., 3].astype(np.int32)
+    scale = np.where(exponent > 0, np.ldexp(np.float32(1.0), exponent - 136), np.float32(0.0)).astype(np.float32)
+    data = rgbe[..., :3].astype(np.float32) * scale[..., None]
 
-            # hdr stores pixel = (R/256, G/256, B/256) * 2^(E-128) in 4 channels
-            # read each channel
-            for c in range(4):
-                x = 0
-                # decode until full width
-                while x < hdr_width:
+    # handle flipping if needed
+    if flip_y:
+        data = data[::-1]
+    if flip_x:
+        data = data[:, ::-1]
+    return np.ascontiguousarray(data)
 
-                    # read count byte
-                    count = f.read(1)
-                    if not count:
-                        raise Exception("Could not read count byte.")
-
-                    # get count value (0-255) and check for num_to_read or literal
-                    count = count[0]
-                    if count > 128:
-                        # 128-255 is a num_to_read so we read one value and repeat it count-128 times
-                        num_to_read = count - 128
-                        val_b = f.read(1)  # read the value what we repeat
-                        if not val_b:
-                            raise Exception("Unexpected EOF in num_to_read.")
-                        chan[c][x:x + num_to_read] = val_b[0]  # from x to x+num_to_read we set the values
-                        x += num_to_read
-                    else:
-                        # 0-128 is a literal, so we read count values directly into the channel
-                        num_to_read = count  # number of literal values to read
-                        vals = f.read(num_to_read)
-                        if len(vals) != num_to_read:
-                            raise Exception("Unexpected EOF in literal.")
-                        chan[c][x:x + num_to_read] = np.frombuffer(vals, dtype=np.uint8)
-                        x += num_to_read
-
-            # save one scanline of pixels to data array as float32
-            R = chan[0].astype(np.float32)
-            G = chan[1].astype(np.float32)
-            B = chan[2].astype(np.float32)
-            E = chan[3].astype(np.float32)
-
-            # convert from RGBE to float32 linear RGB
-            mask = (E > 0)  # avoid invalid ldexp for zero exponent
-            scale = np.zeros_like(E, dtype=np.float32)  # default scale is 0
-
-            scale[mask] = np.ldexp(1.0, (E[mask] - 136).astype(
-                np.int32))  # counts how many times to multiply by 2^(E-128)/256 = 2^(E-136) to get final scale for R,G,B
-            rgb_row = np.stack([R * scale, G * scale, B * scale],
-                               axis=-1)  # transform to RGB float32 row (H x 3, float32)
-
-            # handle flipping if needed
-            correct_y = hdr_height - 1 - y if flip_y else y
-
-            # handle horizontal flip if needed
-            if flip_x:
-                rgb_row = rgb_row[::-1, :]
-            data[correct_y, :, :] = rgb_row
 
+def load_hdr(path: str, use_cache: bool = True) -> np.ndarray:
+    """
+    Load an HDR image as an (H, W, 3) float32 array, decoding it only once.
+    The decoded array is saved as <path>.npy next to the source and later loads memory-map it,
+    so every process (e.g. render workers) maps the same read-only pages instead of decoding again.
+    The cache is rebuilt when the HDR file is newer, and skipped if the directory is not writable.
+    :param path: Path to HDR image file
+    :param use_cache: Read and write the .npy cache
+    :return: (H, W, 3) float32 array, read-only when memory-mapped
+    """
+    if not use_cache:
+        return hdr_to_ndarray(path)
+
+    cache_path = Path(f"{path}.npy")
+    try:
+        if cache_path.stat().st_mtime_ns >= Path(path).stat().st_mtime_ns:
+            return np.load(cache_path, mmap_mode="r")
+    except (OSError, ValueError):
+        pass
+
+    data = hdr_to_ndarray(path)
+    try:
+        # write under a temporary name first, so parallel workers never map a half written file
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            np.save(f, data)
+        os.replace(temp_path, cache_path)
+    except OSError:
         return data
+    return np.load(cache_path, mmap_mode="r")
 
 
 class SkyboxHDR:
     """
     Create a skybox from an HDR image file and can sample colors based on 3D direction vectors.
+    The decoded image is cached as a memory-mappable .npy next to the HDR file unless use_cache is False, see load_hdr.
     """
 
-    def __init__(self, path: str, yaw_deg: float = 90):
+    def __init__(self, path: str, yaw_deg: float = 90, use_cache: bool = True):
 
-        arr = hdr_to_ndarray(path)
+        arr = load_hdr(path, use_cache=use_cache)
         self.data = arr
         # image dimensions height, width
         self.h, self.w = arr.shape[:2]
@@ -207,6 +239,42 @@ class SkyboxHDR:
 
         return Color(float(c[0]), float(c[1]), float(c[2]))
 
+    def _dirs_to_uv(self, dirs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized _dir_to_uv for an (N, 3) array of directions.
+        :return: (u, v) arrays in [0, 1] range
+        """
+        dirs = batch_normalize(dirs)
+        x, y, z = dirs[:, 0], dirs[:, 1], dirs[:, 2]
+
+        # same yaw rotation as _dir_to_uv
+        cos_yaw = math.sin(self.yaw)
+        sin_yaw = math.cos(self.yaw)
+        x_rotated = cos_yaw * x + sin_yaw * z
+        z_rotated = -sin_yaw * x + cos_yaw * z
+        y_rotated = np.clip(y, -1.0, 1.0)
+
+        u = (0.5 + np.arctan2(z_rotated, x_rotated) / (2.0 * math.pi)) % 1.0
+        v = np.clip(0.5 - np.arcsin(y_rotated) / math.pi, 0.0, 1.0)
+        return u, v
+
+    def colors_from_dirs(self, dirs: np.ndarray) -> np.ndarray:
+        """
+        Batch version of color_from_dir with the same bilinear lookup.
+        :param dirs: (N, 3) array of directions
+        :return: (N, 3) array of linear RGB colors
+        """
+        u, v = self._dirs_to_uv(dirs)
+        return _bilinear(self.data, u * (self.w - 1), v * (self.h - 1))
+
+    def to_cube_map(self, face_size: int = 256) -> CubeMapSkybox:
+        """
+        Resample the lat-long image into a cube map, so lookups need no trigonometry.
+        :param face_size: edge length of each face in texels
+        :return: CubeMapSkybox showing the same environment
+        """
+        return CubeMapSkybox.from_skybox(self, face_size)
+
     def rotate_skybox(self, yaw_deg: float) -> None:
         """
         Rotate the skybox by a given yaw angle in degrees.
@@ -214,3 +282,151 @@ class SkyboxHDR:
         :return: None
         """
         self.yaw = math.radians(yaw_deg)
+
+
+
+def _bilinear(data: np.ndarray, float_x: np.ndarray, float_y: np.ndarray) -> np.ndarray:
+    """
+    Bilinear fetch of an (H, W, 3) image at float pixel coordinates, clamped to the image like SkyboxHDR.color_from_dir.
+    :return: (N, 3) float64 colors
+    """
+    h, w = data.shape[:2]
+    x0 = np.clip(float_x.astype(np.int64), 0, w - 1)
+    y0 = np.clip(float_y.astype(np.int64), 0, h - 1)
+    x1 = np.minimum(x0 + 1, w - 1)
+    y1 = np.minimum(y0 + 1, h - 1)
+    tx = (float_x - x0)[:, None]
+    ty = (float_y - y0)[:, None]
+
+    c0 = (1 - tx) * data[y0, x0] + tx * data[y0, x1]
+    c1 = (1 - tx) * data[y1, x0] + tx * data[y1, x1]
+    return (1 - ty) * c0 + ty * c1
+
+
+# cube face frames (major axis, s axis, t axis) in OpenGL order +X, -X, +Y, -Y, +Z, -Z
+_FACE_MAJOR = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]], dtype=np.float64)
+_FACE_S = np.array([[0, 0, -1], [0, 0, 1], [1, 0, 0], [1, 0, 0], [1, 0, 0], [-1, 0, 0]], dtype=np.float64)
+_FACE_T = np.array([[0, -1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1], [0, -1, 0], [0, -1, 0]], dtype=np.float64)
+
+
+class CubeMapSkybox:
+    """
+    Skybox stored as six square faces. A lookup picks the face of the largest direction component
+    and fetches a texel with two divisions, instead of atan2 / asin of the lat-long SkyboxHDR.
+    Create one with SkyboxHDR.to_cube_map and assign it to scene.skybox.
+    """
+
+    def __init__(self, faces: np.ndarray):
+        if faces.ndim != 4 or faces.shape[0] != 6 or faces.shape[1] != faces.shape[2]:
+            raise ValueError("Cube map faces must have shape (6, size, size, 3).")
+        self.faces = faces
+        self.size = faces.shape[1]
+
+    @classmethod
+    def from_skybox(cls, skybox: SkyboxHDR, face_size: int = 256) -> CubeMapSkybox:
+        """
+        Bake a cube map by sampling the lat-long skybox in the direction of every texel center.
+        """
+        if face_size <= 0:
+            raise ValueError("Cube map face size must be a positive integer.")
+        centers = (np.arange(face_size) + 0.5) / face_size * 2.0 - 1.0
+        tc, sc = np.meshgrid(centers, centers, indexing="ij")
+
+        faces = np.empty((6, face_size, face_size, 3), dtype=np.float32)
+        for f in range(6):
+            dirs = _FACE_MAJOR[f] + sc[..., None] * _FACE_S[f] + tc[..., None] * _FACE_T[f]
+            faces[f] = skybox.colors_from_dirs(dirs.reshape(-1, 3)).reshape(face_size, face_size, 3)
+        return cls(faces)
+
+    def colors_from_dirs(self, dirs: np.ndarray) -> np.ndarray:
+        """
+        :param dirs: (N, 3) array of directions
+        :return: (N, 3) array of linear RGB colors
+        """
+        axis = np.argmax(np.abs(dirs), axis=1)
+        rows = np.arange(dirs.shape[0])
+        positive = dirs[rows, axis] > 0.0
+        face = axis * 2 + (~positive)
+        major = np.abs(dirs[rows, axis])
+        major = np.where(major > 0.0, major, 1.0)
+
+        # face coordinates in [0, 1], then texel space with texel centers at integer + 0.5
+        u = (np.sum(dirs * _FACE_S[face], axis=1) / major + 1.0) * 0.5
+        v = (np.sum(dirs * _FACE_T[face], axis=1) / major + 1.0) * 0.5
+        float_x = np.clip(u * self.size - 0.5, 0.0, self.size - 1)
+        float_y = np.clip(v * self.size - 0.5, 0.0, self.size - 1)
+
+        x0 = float_x.astype(np.int64)
+        y0 = float_y.astype(np.int64)
+        x1 = np.minimum(x0 + 1, self.size - 1)
+        y1 = np.minimum(y0 + 1, self.size - 1)
+        tx = (float_x - x0)[:, None]
+        ty = (float_y - y0)[:, None]
+
+        c0 = (1 - tx) * self.faces[face, y0, x0] + tx * self.faces[face, y0, x1]
+        c1 = (1 - tx) * self.faces[face, y1, x0] + tx * self.faces[face, y1, x1]
+        return (1 - ty) * c0 + ty * c1
+
+    def color_from_dir(self, d: Vec3) -> Color:
+        c = self.colors_from_dirs(np.array([[d.x, d.y, d.z]], dtype=np.float64))[0]
+        return Color(float(c[0]), float(c[1]), float(c[2]))
+
+
+class SolidSkybox:
+    """
+    Background of one constant color, used for the "black" and "white" skybox names.
+    """
+
+    def __init__(self, color: Color):
+        self.color = color
+        self.rgb = np.asarray(color.as_rgb(), dtype=np.float64)
+
+    def color_from_dir(self, d: Vec3) -> Color:
+        return self.color
+
+    def colors_from_dirs(self, dirs: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(self.rgb, dirs.shape).copy()
+
+
+class GradientSkybox:
+    """
+    Default sky: white at the horizon below, blending to light blue straight up.
+    """
+    HORIZON = Color.custom_rgb(255, 255, 255)
+    ZENITH = Color.custom_rgb(100, 100, 255)
+
+    def color_from_dir(self, d: Vec3) -> Color:
+        return Color.background_color(d, skybox=None)
+
+    def colors_from_dirs(self, dirs: np.ndarray) -> np.ndarray:
+        y_axis = 0.5 * (batch_normalize(dirs)[:, 1:2] + 1.0)
+        horizon = np.asarray(self.HORIZON.as_rgb(), dtype=np.float64)
+        zenith = np.asarray(self.ZENITH.as_rgb(), dtype=np.float64)
+        return (1.0 - y_axis) * horizon + y_axis * zenith
+
+
+def resolve_skybox(skybox) -> SkyboxHDR | CubeMapSkybox | SolidSkybox | GradientSkybox:
+    """
+    Turn the value of scene.skybox into an object with color_from_dir / colors_from_dirs.
+    Names and HDR paths are handled like Color.background_color; HDR files are loaded once per process,
+    and a file that fails to load falls back to the gradient sky with a warning.
+    :param skybox: None, "black", "white", "sky", "default", a path to an HDR file or a skybox object
+    :return: skybox object
+    """
+    if skybox is None or skybox in ("sky", "default"):
+        return GradientSkybox()
+    if not isinstance(skybox, str):
+        return skybox
+    if skybox == "black":
+        return SolidSkybox(Color.custom_rgb(0, 0, 0))
+    if skybox == "white":
+        return SolidSkybox(Color.custom_rgb(255, 255, 255))
+
+    from src.material.color import _skybox_cache
+    try:
+        if skybox not in _skybox_cache:
+            _skybox_cache[skybox] = SkyboxHDR(skybox)
+        return _skybox_cache[skybox]
+    except Exception as e:
+        print(f"Warning: Failed to load skybox '{skybox}': {e}")
+        return GradientSkybox()
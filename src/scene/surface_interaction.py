@@ -2,12 +2,24 @@ from __future__ import annotations
 from dataclasses import dataclass
 from src.geometry.geometry_hit import GeometryHit
 from src.material.material.material import Material
+from src.material.material.material_sample import MaterialSample
 
 
 @dataclass
 class SurfaceInteraction:
     geom: GeometryHit
     material: Material
+    sample: MaterialSample | None = None  # cached result of material.sample(self), see material_sample()
+
+    def material_sample(self) -> MaterialSample:
+        """
+        Sample the material at this hit once and cache the result,
+        so shading every light or re-shading the same hit with another shader does not repeat procedural texture work.
+        :return: MaterialSample at the hit point
+        """
+        if self.sample is None:
+            self.sample = self.material.sample(self)
+        return self.sample
 
     def replace_material(self, new_material: Material) -> SurfaceInteraction:
         return SurfaceInteraction(geom=self.geom, material=new_material)
@@ -1,17 +1,105 @@
 from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
-from src.math import Vector
+from src.math import Vector, Vertex, Vec3
+
+
+def _affine_rows(matrix: np.ndarray) -> tuple[float, ...]:
+    """
+    Upper 3x4 part of a 4x4 affine matrix as 12 plain floats, row by row.
+    """
+    return tuple(float(value) for value in np.asarray(matrix, dtype=float)[:3, :4].ravel())
+
 
 @dataclass
 class Transform:
     """
     Represents an affine transformation with its matrix and cached inverse.
+    The matrices are also kept as plain float tuples, so transforming a single point, vector or normal
+    is a few float operations instead of building small NumPy arrays.
+    A Transform is treated as immutable: combine() and the constructors return new instances.
     """
     matrix: np.ndarray        # 4x4 matrix representing the transformation
     inverse: np.ndarray       # inverse of the matrix for transforming rays and points back to local space
     inverse_T: np.ndarray     # inverse transpose for transforming normals
 
+    def __post_init__(self):
+        self._matrix_rows = _affine_rows(self.matrix)
+        self._inverse_rows = _affine_rows(self.inverse)
+        self._inverse_T_rows = _affine_rows(self.inverse_T)
+
+        # special cases that let Object.intersect skip work entirely
+        linear_identity = np.array_equal(np.asarray(self.matrix)[:3, :3], np.eye(3))
+        self.is_translation = linear_identity and np.array_equal(np.asarray(self.matrix)[3], [0.0, 0.0, 0.0, 1.0])
+        self.is_identity = self.is_translation and not np.any(np.asarray(self.matrix)[:3, 3])
+
+        # shape of the linear part, decides which primitives can be baked into world space
+        linear = np.asarray(self.matrix, dtype=float)[:3, :3]
+        self.is_axis_aligned = not np.any(linear - np.diag(np.diag(linear)))
+        gram = linear @ linear.T
+        scale_sq = gram[0, 0]
+        self.uniform_scale: float | None = float(np.sqrt(scale_sq)) if np.allclose(gram, scale_sq * np.eye(3), rtol=1e-12, atol=1e-12) else None
+
+    @property
+    def is_similarity(self) -> bool:
+        """
+        True if the linear part is a rotation (or mirror) times one uniform scale, so spheres stay spheres.
+        """
+        return self.uniform_scale is not None
+
+    @property
+    def translation(self) -> Vector:
+        m = self._matrix_rows
+        return Vector(m[3], m[7], m[11])
+
+    def apply_point(self, p: Vec3) -> Vertex:
+        """
+        Transform a point from local to world space.
+        """
+        m = self._matrix_rows
+        x, y, z = p.x, p.y, p.z
+        return Vertex(
+            m[0] * x + m[1] * y + m[2] * z + m[3],
+            m[4] * x + m[5] * y + m[6] * z + m[7],
+            m[8] * x + m[9] * y + m[10] * z + m[11],
+        )
+
+    def apply_inverse_point(self, p: Vec3) -> Vertex:
+        """
+        Transform a point from world to local space.
+        """
+        m = self._inverse_rows
+        x, y, z = p.x, p.y, p.z
+        return Vertex(
+            m[0] * x + m[1] * y + m[2] * z + m[3],
+            m[4] * x + m[5] * y + m[6] * z + m[7],
+            m[8] * x + m[9] * y + m[10] * z + m[11],
+        )
+
+    def apply_inverse_vector(self, v: Vec3) -> Vector:
+        """
+        Transform a direction from world to local space (translation is ignored), not normalized.
+        """
+        m = self._inverse_rows
+        x, y, z = v.x, v.y, v.z
+        return Vector(
+            m[0] * x + m[1] * y + m[2] * z,
+            m[4] * x + m[5] * y + m[6] * z,
+            m[8] * x + m[9] * y + m[10] * z,
+        )
+
+    def apply_normal(self, n: Vec3) -> Vector:
+        """
+        Transform a normal from local to world space with the inverse transpose and normalize it.
+        """
+        m = self._inverse_T_rows
+        x, y, z = n.x, n.y, n.z
+        return Vector(
+            m[0] * x + m[1] * y + m[2] * z,
+            m[4] * x + m[5] * y + m[6] * z,
+            m[8] * x + m[9] * y + m[10] * z,
+        ).normalize()
+
     @staticmethod
     def identity():
         """
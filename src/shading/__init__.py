@@ -3,6 +3,8 @@ from .normal_shader import NormalShader
 from .depth_shader import DepthShader
 from .diff_shader import DiffShader, MaskMethod
 from .dot_product_shader import DotProductShader
+from .many_light_shader import ManyLightShader
+from .light_culling_shader import LightCullingShader
 from .local_shading import LocalShading, apply_noise_normal_perturbation
 from src.shading.helpers import in_shadow, light_dir_dist
 
@@ -13,6 +15,8 @@ __all__ = [
     "DiffShader",
     "MaskMethod",
     "DotProductShader",
+    "ManyLightShader",
+    "LightCullingShader",
     "LocalShading",
     "BlinnPhongShader",
     "apply_noise_normal_perturbation",
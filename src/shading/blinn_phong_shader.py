@@ -1,11 +1,14 @@
 from __future__ import annotations
+import numpy as np
 from .local_shading import LocalShading, apply_noise_normal_perturbation
 from src.scene.surface_interaction import SurfaceInteraction
 from src.material.color import Color
 from src.material.material import PhongMaterialSample
-from src.scene.light import Light, LightType
+from src.scene.light import Light, LightType, AreaLight
+from src.scene.environment_light import EnvironmentLight
 from src.math import Vector
-from src.shading.helpers import in_shadow, light_dir_dist
+from src.shading.helpers import in_shadow, light_dir_dist, in_shadow_batch, area_light_visibility, environment_light_visibility
+from src.math.batch import vec3_to_array, batch_dot, batch_normalize
 from src.scene.scene import Scene
 
 
@@ -30,6 +33,18 @@ class BlinnPhongShader(LocalShading):
         if light_intensity <= 0.0:
             return Color.custom_rgb(0, 0, 0)
 
+        if isinstance(light, (AreaLight, EnvironmentLight)):
+            # soft shadows, the light is sampled over its surface or over the sky
+            n = apply_noise_normal_perturbation(hit, ms.normal_noise, hit.normal.normalize())
+            v = view_dir.normalize()
+            terms_of = self._area_light_terms if isinstance(light, AreaLight) else self._environment_light_terms
+            terms = terms_of(
+                np.array([[hit.point.x, hit.point.y, hit.point.z]]), np.array([[hit.normal.x, hit.normal.y, hit.normal.z]]),
+                np.array([[n.x, n.y, n.z]]), np.array([[v.x, v.y, v.z]]),
+                np.array([ms.base_color.as_rgb()]), np.array([ms.spec_color.as_rgb()]), np.array([max(1.0, ms.shininess)]),
+                light, scene)
+            return Color(terms[0]) * light_intensity * light.get_color_at(hit.point)
+
         # test if the point is in shadow relative to this light; if so, skip diffuse and specular contributions
         light_direction, light_distance = light_dir_dist(hit, light)
 
@@ -64,6 +79,117 @@ class BlinnPhongShader(LocalShading):
             accum += self.shade(hit, light, view_dir, scene=scene)
         return accum
 
+    def shade_batch(self, hits: list[SurfaceInteraction], lights: list[Light], view_dirs: np.ndarray, scene: Scene | None = None) -> np.ndarray:
+        """
+        Vectorized shade_multiple_lights. Material samples and perturbed normals are gathered per hit,
+        then every light is evaluated for all hits at once with a single batch of shadow rays.
+        """
+        if scene is None:
+            raise ValueError("Scene must be provided for shading.")
+
+        n_hits = len(hits)
+        colors = np.zeros((n_hits, 3))
+        if n_hits == 0:
+            return colors
+
+        points = np.empty((n_hits, 3))
+        geom_normals = np.empty((n_hits, 3))
+        normals = np.empty((n_hits, 3))
+        base = np.empty((n_hits, 3))
+        spec = np.empty((n_hits, 3))
+        ambient = np.empty((n_hits, 3))
+        shininess = np.empty(n_hits)
+
+        for k, hit in enumerate(hits):
+            ms = self._get_phong_sample(hit)
+            n = hit.normal.normalize()
+            n_perturbed = apply_noise_normal_perturbation(hit, ms.normal_noise, n)
+
+            points[k] = (hit.point.x, hit.point.y, hit.point.z)
+            geom_normals[k] = (hit.normal.x, hit.normal.y, hit.normal.z)
+            normals[k] = (n_perturbed.x, n_perturbed.y, n_perturbed.z)
+            base[k] = ms.base_color.as_rgb()
+            spec[k] = ms.spec_color.as_rgb()
+            ambient[k] = ms.ambient_color.as_rgb()
+            shininess[k] = max(1.0, ms.shininess)
+
+        v = batch_normalize(view_dirs)
+
+        for light in lights:
+            intensity = light.intensity_at_batch(points)
+
+            if light.type == LightType.AMBIENT:
+                colors += intensity[:, None] * ambient
+                continue
+
+            if isinstance(light, (AreaLight, EnvironmentLight)):
+                rows = np.flatnonzero(intensity > 0.0)
+                if rows.size:
+                    terms_of = self._area_light_terms if isinstance(light, AreaLight) else self._environment_light_terms
+                    terms = terms_of(points[rows], geom_normals[rows], normals[rows], v[rows], base[rows],
+                                                   spec[rows], shininess[rows], light, scene)
+                    colors[rows] += terms * intensity[rows][:, None] * np.array(light.color.as_rgb())
+                continue
+
+            to_light = vec3_to_array(light.position) - points
+            distance = np.linalg.norm(to_light, axis=1)
+            l = to_light / np.where(distance > 0.0, distance, 1.0)[:, None]
+
+            ndotl = batch_dot(normals, l)
+            lit = (intensity > 0.0) & (ndotl > 0.0)
+            if lit.any():
+                lit[lit] = ~in_shadow_batch(points[lit], geom_normals[lit], l[lit], distance[lit], scene=scene)
+            if not lit.any():
+                continue
+
+            light_color = np.array([light.get_color_at(hits[k].point).as_rgb() for k in np.flatnonzero(lit)])
+
+            n_lit, l_lit, ndotl_lit = normals[lit], l[lit], ndotl[lit]
+            diffuse = base[lit] * ndotl_lit[:, None]
+            ndoth = np.maximum(0.0, batch_dot(n_lit, batch_normalize(l_lit + v[lit])))
+            specular = spec[lit] * (ndoth ** shininess[lit] * ndotl_lit)[:, None]
+
+            colors[lit] += (diffuse + specular) * intensity[lit][:, None] * light_color
+
+        return colors
+
+    @staticmethod
+    def _area_light_terms(points: np.ndarray, geom_normals: np.ndarray, normals: np.ndarray, view_dirs: np.ndarray,
+                          base: np.ndarray, spec: np.ndarray, shininess: np.ndarray, light: AreaLight, scene: Scene) -> np.ndarray:
+        """
+        Diffuse and specular terms of an area light averaged over its samples, with soft shadows
+        (see area_light_visibility); the caller multiplies by the light's intensity and color.
+        :return: (N, 3) array
+        """
+        directions, weights = area_light_visibility(points, geom_normals, normals, light, scene)
+        ndotl = np.maximum(np.einsum("nsk,nk->ns", directions, normals), 0.0)
+        halfway = directions + view_dirs[:, None, :]
+        halfway /= np.maximum(np.linalg.norm(halfway, axis=2), 1e-12)[:, :, None]
+        ndoth = np.maximum(np.einsum("nsk,nk->ns", halfway, normals), 0.0)
+        samples = light.shadow_samples
+        diffuse = (weights * ndotl).sum(axis=1) / samples
+        specular = (weights * ndoth ** shininess[:, None] * ndotl).sum(axis=1) / samples
+        return base * diffuse[:, None] + spec * specular[:, None]
+
+    @staticmethod
+    def _environment_light_terms(points: np.ndarray, geom_normals: np.ndarray, normals: np.ndarray, view_dirs: np.ndarray,
+                                 base: np.ndarray, spec: np.ndarray, shininess: np.ndarray, light: EnvironmentLight,
+                                 scene: Scene) -> np.ndarray:
+        """
+        Diffuse and specular terms of an environment light, a Monte Carlo estimate over its importance-sampled
+        directions (see environment_light_visibility); the caller multiplies by the light's intensity and color.
+        :return: (N, 3) array
+        """
+        directions, weights = environment_light_visibility(points, geom_normals, normals, light, scene)
+        ndotl = np.maximum(np.einsum("nsk,nk->ns", directions, normals), 0.0)
+        halfway = directions + view_dirs[:, None, :]
+        halfway /= np.maximum(np.linalg.norm(halfway, axis=2), 1e-12)[:, :, None]
+        ndoth = np.maximum(np.einsum("nsk,nk->ns", halfway, normals), 0.0)
+        samples = light.samples
+        diffuse = (weights * ndotl[:, :, None]).sum(axis=1) / samples
+        specular = (weights * (ndoth ** shininess[:, None] * ndotl)[:, :, None]).sum(axis=1) / samples
+        return base * diffuse + spec * specular
+
     @staticmethod
     def _lambert_from_sample(ms: PhongMaterialSample, n: Vector, l: Vector) -> Color:
         return ms.base_color * max(0.0, n.dot(l))
@@ -77,7 +203,7 @@ class BlinnPhongShader(LocalShading):
 
     @staticmethod
     def _get_phong_sample(hit: SurfaceInteraction) -> PhongMaterialSample:
-        sample = hit.material.sample(hit)
+        sample = hit.material_sample()
         if not isinstance(sample, PhongMaterialSample):
             raise TypeError("BlinnPhongShader requires PhongMaterialSample.")
         return sample
\ No newline at end of file
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from .local_shading import LocalShading
 from src.scene.surface_interaction import SurfaceInteraction
-from src.scene.light import Light
+from src.scene.light import Light, LightType
 from src.material.color import Color
 from src.math import Vector
 import math
@@ -13,6 +13,7 @@ class DotProductShader(LocalShading):
     """
     Object shader that colors based on the dot product between the normal and either the light direction or view direction.
     param use_light: If True, uses the light direction; otherwise uses the view direction.
+        Lights without a position (EnvironmentLight) fall back to the view direction.
     param frequency: Frequency of the sine wave applied to the dot product value for color variation.
     """
     use_light: bool = False
@@ -23,7 +24,7 @@ class DotProductShader(LocalShading):
         Shade based on the dot product between the normal and light/view direction.
         """
         norm = hit.geom.normal.normalize()
-        if self.use_light and light:
+        if self.use_light and light and light.type != LightType.ENVIRONMENT:
             light = (light.position - hit.geom.point).normalize()
             # measures how much the normal faces the light
             view = max(norm.dot(light), -1.0)
@@ -1,5 +1,8 @@
+import numpy as np
 from src.scene.scene import Scene
 from src.math import Vector
+from src.math.batch import batch_normalize
+from src.math.sampling import halton_2d, shading_rng
 from src.geometry.ray import Ray
 from src.scene.surface_interaction import SurfaceInteraction
 from src.scene.light import Light
@@ -43,6 +46,25 @@ def in_shadow(geometry_hit: SurfaceInteraction, light_direction: Vector, light_d
     return shadow_hit is not None and shadow_hit.geom.dist < light_distance
 
 
+def in_shadow_batch(points: np.ndarray, normals: np.ndarray, light_directions: np.ndarray, light_distances: np.ndarray,
+                    scene: Scene | None) -> np.ndarray:
+    """
+    Batch version of in_shadow. Traces all shadow rays with one Scene.intersect_batch call.
+    :param points: (N, 3) hit points
+    :param normals: (N, 3) geometric normals at the hit points
+    :param light_directions: (N, 3) unit directions to the light source
+    :param light_distances: (N,) distances to the light source
+    :param scene: Scene containing the objects to check for shadows
+    :return: (N,) bool array, true where the point is in shadow
+    """
+    if scene is None:
+        raise ValueError("Scene must not be None for shadow tracing.")
+
+    biased_origins = points + normals * _BIAS + light_directions * _BIAS
+    shadow_dist, _, _, _ = scene.intersect_batch(biased_origins, batch_normalize(light_directions))
+    return shadow_dist < light_distances
+
+
 def light_dir_dist(geometry_hit: SurfaceInteraction, light: Light) -> tuple[Vector, float]:
     """
     Compute the direction and distance from the hit point to the light source.
@@ -55,3 +77,79 @@ def light_dir_dist(geometry_hit: SurfaceInteraction, light: Light) -> tuple[Vect
     distance = to_light.norm()
     direction = to_light / distance if distance > 0 else Vector(0, 0, 0)
     return direction, distance
+
+
+def area_light_visibility(points: np.ndarray, geom_normals: np.ndarray, normals: np.ndarray, light,
+                          scene: Scene | None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sample an AreaLight from every point and trace the shadow rays with the light's adaptive budget:
+    the first min_shadow_samples samples of a point are traced, and only where they disagree (the penumbra)
+    are the remaining samples traced too; elsewhere they take the common visibility of the first ones.
+    Samples behind the surface or not emitting towards the point are never traced.
+    The pattern of every point gets its own random shift drawn from shading_rng, so seeded renders are reproducible.
+    :param points: (N, 3) hit points
+    :param geom_normals: (N, 3) geometric normals, used to offset the shadow rays
+    :param normals: (N, 3) shading normals, samples below them contribute nothing
+    :param light: AreaLight
+    :param scene: Scene containing the objects to check for shadows
+    :return: (directions, weights) - (N, S, 3) unit directions to the samples, (N, S) emission weights with
+             occluded samples set to 0
+    """
+    n, s = points.shape[0], light.shadow_samples
+    first = min(light.min_shadow_samples, s)
+    uv = halton_2d(s, shading_rng().random((n, 2)))
+    samples, weights = light.sample_points(points, uv)
+    to_light = samples - points[:, None, :]
+    distances = np.sqrt(np.einsum("nsk,nsk->ns", to_light, to_light))
+    directions = to_light / np.where(distances > 0.0, distances, 1.0)[:, :, None]
+    relevant = (weights > 0.0) & (distances > 0.0) & (np.einsum("nsk,nk->ns", directions, normals) > 0.0)
+
+    visible = np.zeros((n, s), dtype=bool)
+
+    def trace(mask: np.ndarray) -> None:
+        rows, cols = np.nonzero(mask)
+        if rows.size:
+            visible[rows, cols] = ~in_shadow_batch(points[rows], geom_normals[rows], directions[rows, cols],
+                                                   distances[rows, cols], scene=scene)
+
+    head = relevant.copy()
+    head[:, first:] = False
+    trace(head)
+    traced = head.sum(axis=1)
+    lit = (visible & head).sum(axis=1)
+    agree = (traced > 0) & ((lit == 0) | (lit == traced))
+
+    tail = relevant & ~head
+    trace(tail & ~agree[:, None])
+    visible |= tail & (agree & (lit == traced))[:, None]
+    return directions, np.where(relevant & visible, weights, 0.0)
+
+
+def environment_light_visibility(points: np.ndarray, geom_normals: np.ndarray, normals: np.ndarray, light,
+                                 scene: Scene | None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Importance-sample an EnvironmentLight from every point and trace a shadow ray to infinity for every sample.
+    Samples below the shading normal are never traced. The random shifts of the sample patterns come from shading_rng.
+    :param points: (N, 3) hit points
+    :param geom_normals: (N, 3) geometric normals, used to offset the shadow rays
+    :param normals: (N, 3) shading normals
+    :param light: EnvironmentLight
+    :param scene: Scene containing the objects to check for shadows
+    :return: (directions, weights) - (N, S, 3) unit sample directions, (N, S, 3) sky radiance / (pi * pdf)
+             with occluded samples set to 0, so a white sky of radiance 1 gives a diffuse term of 1
+    """
+    n, s = points.shape[0], light.samples
+    uv = halton_2d(s, shading_rng().random((n, 2)))
+    directions, pdf = light.sample(uv.reshape(-1, 2))
+    directions = directions.reshape(n, s, 3)
+    pdf = pdf.reshape(n, s)
+    relevant = (pdf > 0.0) & (np.einsum("nsk,nk->ns", directions, normals) > 0.0)
+
+    rows, cols = np.nonzero(relevant)
+    weights = np.zeros((n, s, 3))
+    if rows.size:
+        visible = ~in_shadow_batch(points[rows], geom_normals[rows], directions[rows, cols], np.full(rows.size, np.inf),
+                                   scene=scene)
+        rows, cols = rows[visible], cols[visible]
+        weights[rows, cols] = light.radiance(directions[rows, cols]) / (np.pi * pdf[rows, cols])[:, None]
+    return directions, weights
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from src.material.color import Color, clamp_color255
 from src.scene.surface_interaction import SurfaceInteraction
-from src.scene.light import Light
+from src.scene.light import Light, LightType
 from src.scene.scene import Scene
 from src.math import Vector
 from .local_shading import LocalShading
@@ -16,6 +16,10 @@ class LambertShader(LocalShading):
         view_dir: Vector,
         scene: Scene | None = None
     ) -> Color:
+        # an environment light has no position to shade towards
+        if light.type == LightType.ENVIRONMENT:
+            return Color.custom_rgb(0, 0, 0)
+
         material = hit.material
 
         n = hit.normal.normalize()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+from .local_shading import LocalShading
+from src.scene.surface_interaction import SurfaceInteraction
+from src.scene.light import Light
+from src.scene.light_grid import LightGrid
+from src.material.color import Color
+from src.math import Vector
+from src.scene.scene import Scene
+
+
+@dataclass
+class LightCullingShader(LocalShading):
+    """
+    Shades with another shader, but only with the lights that can affect each hit.
+    Lights whose intensity at the hit is at or below threshold (1 / r^2 lights beyond their influence radius,
+    spot lights outside their cone) are skipped before the base shader computes a direction, a distance or a shadow ray.
+    The lights passed in are indexed by a LightGrid over their influence spheres (cached by the scene, see
+    Scene.light_grid), so a hit only looks at the lights listed in its grid cell and the shader can wrap or be
+    wrapped by other shaders that hand it a subset of the lights.
+    Contributions below threshold are dropped, with threshold 0 the image is unchanged.
+    """
+    base: LocalShading
+    threshold: float = 1e-3
+
+    def __post_init__(self):
+        if self.threshold < 0.0:
+            raise ValueError("Light influence threshold must not be negative.")
+
+    def _grid(self, lights: list[Light], scene: Scene | None) -> LightGrid:
+        if scene is not None and hasattr(scene, "light_grid"):
+            return scene.light_grid(self.threshold, lights)
+        return LightGrid.build(lights, self.threshold)
+
+    def shade(self, hit: SurfaceInteraction, light: Light, view_dir: Vector, scene: Scene | None = None) -> Color:
+        if light.intensity_at(hit.point) <= self.threshold:
+            return Color.custom_rgb(0, 0, 0)
+        return self.base.shade(hit, light, view_dir, scene=scene)
+
+    def shade_multiple_lights(self, hit: SurfaceInteraction, lights: list[Light], view_dir: Vector, scene: Scene | None = None) -> Color:
+        return self.base.shade_multiple_lights(hit, self._grid(lights, scene).lights_at(hit.point), view_dir, scene=scene)
+
+    def shade_batch(self, hits: list[SurfaceInteraction], lights: list[Light], view_dirs: np.ndarray, scene: Scene | None = None) -> np.ndarray:
+        """
+        Vectorized shade_multiple_lights. Lights reaching the same set of hits are shaded together with one
+        base.shade_batch call, so lights that reach everything (ambient, lights without falloff) share a single call.
+        """
+        grid = self._grid(lights, scene)
+        colors = np.zeros((len(hits), 3))
+        if not hits:
+            return colors
+
+        # shade_batch of the base only helps when it is vectorized, otherwise shade every hit with its own lights
+        if type(self.base).shade_batch is LocalShading.shade_batch:
+            for k, hit in enumerate(hits):
+                d = view_dirs[k]
+                colors[k] = self.base.shade_multiple_lights(hit, grid.lights_at(hit.point), Vector(d[0], d[1], d[2]), scene=scene).as_rgb()
+            return colors
+
+        points = np.array([(hit.point.x, hit.point.y, hit.point.z) for hit in hits])
+        groups: dict[bytes, tuple[np.ndarray, list[Light]]] = {}
+        for light, rows in grid.lights_at_batch(points):
+            groups.setdefault(rows.tobytes(), (rows, []))[1].append(light)
+        for rows, group_lights in groups.values():
+            colors[rows] += self.base.shade_batch([hits[k] for k in rows], group_lights, view_dirs[rows], scene=scene)
+        return colors
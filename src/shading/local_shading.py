@@ -1,5 +1,6 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+import numpy as np
 
 from src.material.textures.noise.noise import Noise
 from src.shading.helpers import tangent_basis
@@ -56,4 +57,20 @@ class LocalShading(ABC):
 
     @abstractmethod
     def shade_multiple_lights(self, hit: SurfaceInteraction, lights: list[Light], view_dir: Vector, scene: Scene | None = None) -> Color:
-        ...
\ No newline at end of file
+        ...
+
+    def shade_batch(self, hits: list[SurfaceInteraction], lights: list[Light], view_dirs: np.ndarray, scene: Scene | None = None) -> np.ndarray:
+        """
+        Shade many hits at once. Used by batch integrators that trace whole ray arrays.
+        The default implementation calls shade_multiple_lights for every hit; shaders can override it with a vectorized version.
+        :param hits: surface interactions to shade
+        :param lights: lights illuminating the scene
+        :param view_dirs: (N, 3) array of directions from the hit points towards the viewer
+        :param scene: scene used for shadow rays
+        :return: (N, 3) array of linear RGB colors
+        """
+        colors = np.zeros((len(hits), 3))
+        for k, hit in enumerate(hits):
+            d = view_dirs[k]
+            colors[k] = self.shade_multiple_lights(hit, lights, Vector(d[0], d[1], d[2]), scene=scene).as_rgb()
+        return colors
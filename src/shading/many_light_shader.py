@@ -0,0 +1,87 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+from .local_shading import LocalShading
+from src.scene.surface_interaction import SurfaceInteraction
+from src.scene.light import Light
+from src.scene.light_tree import LightTree
+from src.material.color import Color
+from src.math import Vector
+from src.math.sampling import shading_rng
+from src.scene.scene import Scene
+
+
+@dataclass
+class ManyLightShader(LocalShading):
+    """
+    Stochastic many-light shading on top of another shader.
+    Instead of shading (and tracing a shadow ray for) every light at every hit, light_samples lights are picked
+    from the scene's LightTree with probability proportional to their estimated contribution, and each picked light
+    is shaded by the base shader and divided by its probability. The estimate is unbiased, its noise averages out
+    with samples per pixel. Lights the tree does not hold (ambient, directional) are always shaded exactly,
+    and with no more tree lights than light_samples all of them are shaded, the result is then the same as base.
+    The tree is built over the lights passed in (cached by the scene, see Scene.light_tree), so the shader can
+    wrap or be wrapped by other shaders that hand it a subset of the lights.
+    Random numbers come from shading_rng, so renders with RenderConfig.seed pick the same lights every time.
+    """
+    base: LocalShading
+    light_samples: int = 4
+
+    def __post_init__(self):
+        if self.light_samples <= 0:
+            raise ValueError("Light samples must be a positive integer.")
+
+    def _tree(self, lights: list[Light], scene: Scene | None) -> LightTree | None:
+        # the tree only holds some of the lights, with at most light_samples lights shading all of them is exact
+        if len(lights) <= self.light_samples:
+            return None
+        tree = scene.light_tree(lights) if scene is not None and hasattr(scene, "light_tree") else LightTree.build(lights)
+        return tree if len(tree.lights) > self.light_samples else None
+
+    def shade(self, hit: SurfaceInteraction, light: Light, view_dir: Vector, scene: Scene | None = None) -> Color:
+        return self.base.shade(hit, light, view_dir, scene=scene)
+
+    def shade_multiple_lights(self, hit: SurfaceInteraction, lights: list[Light], view_dir: Vector, scene: Scene | None = None) -> Color:
+        tree = self._tree(lights, scene)
+        if tree is None:
+            return self.base.shade_multiple_lights(hit, lights, view_dir, scene=scene)
+
+        color = self.base.shade_multiple_lights(hit, list(tree.others), view_dir, scene=scene)
+        for u in shading_rng().random(self.light_samples):
+            index, pdf = tree.sample(hit.point, hit.normal, float(u))
+            if index >= 0:
+                color += self.base.shade(hit, tree.lights[index], view_dir, scene=scene) * (1.0 / (self.light_samples * pdf))
+        return color
+
+    def shade_batch(self, hits: list[SurfaceInteraction], lights: list[Light], view_dirs: np.ndarray, scene: Scene | None = None) -> np.ndarray:
+        """
+        Vectorized shade_multiple_lights. All hits sample their lights at once, then every sampled light is shaded
+        for the hits that picked it with one base.shade_batch call, so shadow rays stay batched per light.
+        """
+        tree = self._tree(lights, scene)
+        if tree is None:
+            return self.base.shade_batch(hits, lights, view_dirs, scene=scene)
+
+        colors = self.base.shade_batch(hits, list(tree.others), view_dirs, scene=scene)
+        n_hits = len(hits)
+        if n_hits == 0:
+            return colors
+
+        points = np.array([(hit.point.x, hit.point.y, hit.point.z) for hit in hits])
+        normals = np.array([(hit.normal.x, hit.normal.y, hit.normal.z) for hit in hits])
+        rows = np.tile(np.arange(n_hits), self.light_samples)
+        picked, pdf = tree.sample_batch(points[rows], normals[rows], shading_rng().random(rows.size))
+        weights = 1.0 / (self.light_samples * np.where(picked >= 0, pdf, 1.0))
+
+        # the base shader's own shade_batch only helps when it is vectorized, otherwise shade per hit
+        vectorized = type(self.base).shade_batch is not LocalShading.shade_batch
+        for index in np.unique(picked[picked >= 0]):
+            samples = np.flatnonzero(picked == index)
+            light = tree.lights[index]
+            if vectorized:
+                shaded = self.base.shade_batch([hits[k] for k in rows[samples]], [light], view_dirs[rows[samples]], scene=scene)
+            else:
+                shaded = np.array([self.base.shade(hits[k], light, Vector(*view_dirs[k]), scene=scene).as_rgb() for k in rows[samples]])
+            np.add.at(colors, rows[samples], shaded * weights[samples][:, None])
+        return colors
@@ -5,7 +5,7 @@ import numpy as np
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from src import Camera, Sphere, Plane, Square, Triangle
+from src import Camera, Sphere, Plane, Square, Quad, Triangle
 from src.geometry.geometry_hit import GeometryHit
 from src.geometry.primitives import Box, Cylinder, Torus
 from src.scene.light import LightType, Light
@@ -783,6 +783,23 @@ class Visualizer:
                                         linewidth=0.8)
                 self.ax.add_collection3d(poly)
 
+            # QUAD
+            if isinstance(obj.geometry, Quad):
+                quad = obj.geometry
+                verts = np.array([
+                    _vertex_to_matplotlib(quad.corner),
+                    _vertex_to_matplotlib(quad.corner + quad.edge_u),
+                    _vertex_to_matplotlib(quad.corner + quad.edge_u + quad.edge_v),
+                    _vertex_to_matplotlib(quad.corner + quad.edge_v),
+                ])
+                color = obj.material.get_color()
+
+                verts = self._apply_transform(obj, verts)
+
+                poly = Poly3DCollection([verts.tolist()], alpha=opacity, facecolor=color, edgecolor=color,
+                                        linewidth=0.8)
+                self.ax.add_collection3d(poly)
+
             # TORUS
             if isinstance(obj.geometry, Torus):
                 center = np.array(_vertex_to_matplotlib(obj.geometry.center))
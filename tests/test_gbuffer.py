@@ -0,0 +1,53 @@
+import numpy as np
+
+from src import (
+    Scene, Object, PinholeCamera, PointLight, AmbientLight, Sphere, Plane, PhongMaterial, Vertex, Vector,
+    BlinnPhongShader, LinearRenderLoop, RenderConfig,
+)
+from src.io.resolution import CustomResolution
+
+
+def make_scene() -> Scene:
+    objects = [
+        Object(geometry=Sphere(center=Vertex(0, 0.5, 0), radius=1.0), material=PhongMaterial()),
+        Object(geometry=Sphere(center=Vertex(1.5, 0.0, -1), radius=0.5), material=PhongMaterial()),
+        Object(geometry=Plane(point=Vertex(0, -0.5, 0), normal=Vector(0, 1, 0)), material=PhongMaterial()),
+    ]
+    lights = [AmbientLight(intensity=0.1), PointLight(position=Vertex(2, 4, 3), intensity=1.0)]
+    camera = PinholeCamera(origin=Vertex(0, 1, 5), direction=Vector(0, -0.2, -1))
+    return Scene(camera=camera, lights=lights, objects=objects, skybox="black")
+
+
+def render(loop: LinearRenderLoop) -> np.ndarray:
+    loop.render_all_pixels()
+    return loop.framebuffer.copy()
+
+
+def make_loop(scene: Scene, g_buffer: bool) -> LinearRenderLoop:
+    config = RenderConfig(resolution=CustomResolution(16, 12), samples_per_pixel=1, seed=5, g_buffer=g_buffer)
+    return LinearRenderLoop(scene=scene, shading_model=BlinnPhongShader(), render_config=config)
+
+
+def test_gbuffer_is_dropped_after_moving_an_object():
+    scene = make_scene()
+    loop = make_loop(scene, g_buffer=True)
+    render(loop)
+    scene.objects[0].translate(0.7, 0.0, 0.0)
+    np.testing.assert_allclose(render(loop), render(make_loop(scene, g_buffer=False)), atol=1e-9)
+
+
+def test_gbuffer_is_dropped_after_removing_an_object():
+    scene = make_scene()
+    loop = make_loop(scene, g_buffer=True)
+    render(loop)
+    scene.remove_object(scene.objects[0])
+    np.testing.assert_allclose(render(loop), render(make_loop(scene, g_buffer=False)), atol=1e-9)
+
+
+def test_gbuffer_is_kept_for_an_unchanged_scene():
+    scene = make_scene()
+    loop = make_loop(scene, g_buffer=True)
+    first = render(loop)
+    gbuffer = loop.gbuffer
+    np.testing.assert_allclose(render(loop), first, atol=1e-9)
+    assert loop.gbuffer is gbuffer
@@ -0,0 +1,29 @@
+import numpy as np
+
+from src import Heightfield, Vertex, Vector
+from src.geometry.ray import Ray
+
+
+def grazing_rays(count: int, lo: float, hi: float, height: float, seed: int = 0):
+    # rays from above the terrain towards random points on it at the given height
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        origin = rng.uniform(-3.0, 3.0, 3)
+        origin[1] = height + abs(origin[1]) + 0.1
+        target = np.array([rng.uniform(lo, hi), height, rng.uniform(lo, hi)])
+        yield Ray(origin=Vertex(*origin), direction=Vector(*(target - origin)).normalize())
+
+
+def test_flat_heightfield_is_hit():
+    terrain = Heightfield(np.zeros((9, 9)), corner=Vertex(-1.0, 0.0, -1.0), width=2, depth=2)
+    hit = terrain.intersect(Ray(origin=Vertex(-3, 1, 0.1), direction=Vector(3, -1, 0).normalize()))
+    assert hit is not None
+    np.testing.assert_allclose([hit.point.x, hit.point.y, hit.point.z], [0.0, 0.0, 0.1], atol=1e-9)
+    assert all(terrain.intersect(ray) is not None for ray in grazing_rays(500, -0.99, 0.99, 0.0))
+
+
+def test_plateau_at_the_lowest_height_has_no_holes():
+    heights = np.zeros((33, 33))
+    heights[:, 16:] = np.linspace(0.0, 1.0, 17)[None, :] ** 2
+    terrain = Heightfield(heights, corner=Vertex(-1.0, 0.3, -1.0), width=2, depth=2)
+    assert all(terrain.intersect(ray) is not None for ray in grazing_rays(500, -0.99, -0.01, 0.3))
@@ -0,0 +1,19 @@
+import numpy as np
+
+from src import PostProcessConfig, ToneMapping
+from src.render.post_process.post_process_pipeline import post_process_pipeline
+
+
+def test_dithered_output_is_reproducible():
+    image = np.random.default_rng(1).random((8, 8, 3))
+    config = PostProcessConfig(enabled=True, dither=True)
+    first = post_process_pipeline(config, image, seed=3)
+    np.testing.assert_array_equal(post_process_pipeline(config, image, seed=3), first)
+    np.testing.assert_array_equal(post_process_pipeline(config, image), post_process_pipeline(config, image))
+
+
+def test_display_referred_pixels_are_not_tone_mapped_again():
+    pixels = np.arange(0, 256, 4, dtype=np.uint8).repeat(3).reshape(8, 8, 3)
+    config = PostProcessConfig(enabled=True, exposure=1.0, tone_mapping=ToneMapping.ACES, srgb=True)
+    out = post_process_pipeline(config, pixels / 255.0, display_referred=True)
+    np.testing.assert_array_equal(out, pixels)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from src import (
+    Scene, Object, PinholeCamera, AmbientLight, PointLightFalloff, Sphere, Plane, PhongMaterial, Vertex, Vector,
+    BlinnPhongShader, ManyLightShader, LightCullingShader, LinearRenderLoop, WavefrontIntegrator, RecursiveIntegrator,
+    RenderConfig,
+)
+from src.io.resolution import CustomResolution
+
+
+def make_scene() -> Scene:
+    rng = np.random.default_rng(3)
+    lights = [AmbientLight(intensity=0.1)]
+    for _ in range(8):
+        x, y, z = rng.uniform(-3.0, 3.0, 3)
+        lights.append(PointLightFalloff(position=Vertex(x, abs(y) + 1.0, z), intensity=2.0))
+    objects = [
+        Object(geometry=Sphere(center=Vertex(0, 0.5, 0), radius=1.0), material=PhongMaterial()),
+        Object(geometry=Plane(point=Vertex(0, -0.5, 0), normal=Vector(0, 1, 0)), material=PhongMaterial()),
+    ]
+    camera = PinholeCamera(origin=Vertex(0, 1, 5), direction=Vector(0, -0.2, -1))
+    return Scene(camera=camera, lights=lights, objects=objects, skybox="black")
+
+
+def render(shader, integrator_type, light_count: int | None = None) -> np.ndarray:
+    scene = make_scene()
+    config = RenderConfig(resolution=CustomResolution(16, 12), samples_per_pixel=1, seed=7)
+    # the integrator may shade with fewer lights than the scene has, the shaders must only use the ones passed in
+    lights = scene.lights[:light_count]
+    integrator = integrator_type(max_depth=2, scene=scene, lights=lights, shader=shader)
+    loop = LinearRenderLoop(scene=scene, shading_model=shader, integrator=integrator, render_config=config)
+    loop.render_all_pixels()
+    return loop.framebuffer
+
+
+@pytest.mark.parametrize("light_count", [None, 4])
+@pytest.mark.parametrize("integrator_type", [RecursiveIntegrator, WavefrontIntegrator])
+@pytest.mark.parametrize("make_shader", [
+    lambda base: ManyLightShader(base=LightCullingShader(base=base, threshold=0.0), light_samples=8),
+    lambda base: LightCullingShader(base=ManyLightShader(base=base, light_samples=8), threshold=0.0),
+])
+def test_nested_light_shaders_match_base(make_shader, integrator_type, light_count):
+    # threshold 0 culls nothing and light_samples covers every light, so the wrappers must be exact
+    expected = render(BlinnPhongShader(), integrator_type, light_count)
+    actual = render(make_shader(BlinnPhongShader()), integrator_type, light_count)
+    np.testing.assert_allclose(actual, expected, atol=1e-6)